@@ -1,81 +1,136 @@
 """Custom client handling, including NetsuiteStream base class."""
 
-import base64
-import hashlib
-import hmac
-import random
-from datetime import datetime
-from decimal import Decimal
-from time import time
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from time import perf_counter, sleep, time
+from types import SimpleNamespace
 from typing import Iterable, Optional
 
 import backoff
+import requests
+import urllib3
 from backports.cached_property import cached_property
+from lxml import etree
 from memoization import cached
 from pendulum import parse
-from singer import Transformer
-from singer_sdk import typing as th
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
 from singer_sdk.streams import Stream
-from zeep import Client
-from zeep.cache import SqliteCache
-from zeep.helpers import serialize_object
-from zeep.transports import Transport
 from zeep.exceptions import Fault
 
-from tap_netsuite.constants import REPLICATION_KEYS, RETRYABLE_ERRORS
+from tap_netsuite.constants import (
+    REPLICATION_KEYS,
+    RETRYABLE_ERRORS,
+    SCALAR_SEARCH_COLUMNS,
+)
+from tap_netsuite.dedup import MAX_BOUNDARY_RECORDS, BoundarySeen
 from tap_netsuite.exceptions import TypeNotFound
-
-
-class NetsuiteStream(Stream):
+from tap_netsuite.execution import OrderedOutput
+from tap_netsuite.fanout import TransactionFanOut
+from tap_netsuite.fingerprints import DELETED_AT, StreamFingerprints
+from tap_netsuite.instrumentation import StageStats, record_backoff
+from tap_netsuite.pagination import (
+    MIN_PAGE_SIZE,
+    PageSizer,
+    PipelineStats,
+    fetch_pages_in_order,
+    prefetch,
+)
+from tap_netsuite.registry import get_client
+from tap_netsuite.schema import SCALAR_TYPES
+from tap_netsuite.search_response import RecordListResponse
+from tap_netsuite.sharding import (
+    ID_PROBE_BISECTIONS,
+    ID_PROBE_START,
+    DateWindowPlanner,
+    IdRangePlanner,
+    run_windows,
+)
+from tap_netsuite.transform import CompiledTransformer
+from tap_netsuite.utils import suitetalk_url
+
+GET_ALL_TRIES = 5
+# errors reading a streamed response, retried like unexpected faults
+STREAM_ERRORS = (
+    requests.RequestException,
+    urllib3.exceptions.HTTPError,
+    etree.XMLSyntaxError,
+)
+
+
+class NetsuiteStream(OrderedOutput, Stream):
     """Stream class for Netsuite streams."""
 
     primary_keys = ["internalId"]
     search_type_name = None
     valid_requests = ["getAllResult", "searchResult", "searchMoreWithIdResult"]
+    # set when a search continued from a checkpoint instead of its first page
+    search_resumed = False
 
     @property
     def page_size(self):
+        if self.page_sizer:
+            return self.page_sizer.size
         return self.config.get("page_size", 500)
 
     @cached_property
-    def account(self):
-        return self.config["ns_account"].replace("_", "-")
+    def page_sizer(self):
+        """The adaptive page size, carried over from earlier runs, or None."""
+        if not self.config.get("adaptive_page_size"):
+            return None
+        return PageSizer.from_state(
+            self.stream_state.get("page_size"),
+            self.config.get("page_size", 500),
+            self.config.get("page_size_target_seconds", 30),
+            self.config.get("page_size_target_bytes", 5000000),
+        )
+
+    @property
+    def page_concurrency(self):
+        return self.config.get("page_concurrency", 1)
+
+    @property
+    def prefetch_pages(self):
+        return self.config.get("prefetch_pages", 1)
 
     @cached_property
-    def wsdl_url(self):
+    def prefetch_stats(self):
+        return PipelineStats()
+
+    @cached_property
+    def stages(self):
+        return StageStats()
+
+    @property
+    def date_window(self):
+        days = self.config.get("date_window_days")
+        return timedelta(days=days) if days else None
+
+    @property
+    def uses_transaction_fanout(self):
         return (
-            f"https://{self.account}.suitetalk.api.netsuite.com/"
-            "wsdl/v2022_2_0/netsuite.wsdl"
+            self.config.get("transaction_fanout", False)
+            and self.search_type_name == TransactionFanOut.search_type_name
         )
 
     @cached_property
-    def datacenter_url(self):
-        return (
-            f"https://{self.account}.suitetalk.api.netsuite.com/"
-            "services/NetSuitePort_2022_2"
+    def suitetalk(self):
+        return get_client(
+            self.config["ns_account"],
+            cache_wsdl=self.config.get("cache_wsdl", True),
+            http=self._tap.http,
+            base_url=suitetalk_url(self.config),
         )
 
     @property
     def client(self):
-        if self.config["cache_wsdl"]:
-            path = "cache.db"
-            timeout = 2592000
-            cache = SqliteCache(path=path, timeout=timeout)
-            transport = Transport(cache=cache)
-            return Client(self.wsdl_url, transport=transport)
-        return Client(self.wsdl_url)
+        return self.suitetalk.client
 
-    @cached_property
+    @property
     def service_proxy(self):
-        proxy_url = "{urn:platform_2022_2.webservices.netsuite.com}NetSuiteBinding"
-        return self.client.create_service(proxy_url, self.datacenter_url)
+        return self.suitetalk.service_proxy
 
     def search_client(self, type_name):
-        for ns_type in self.client.wsdl.types.types:
-            if ns_type.name and ns_type.name == type_name:
-                return ns_type
-        raise TypeNotFound(f"Type {type_name} not found in WSDL")
+        return self.suitetalk.get_type(type_name)
 
     @cached_property
     def ns_type(self):
@@ -86,74 +141,183 @@ class NetsuiteStream(Stream):
         search_type_name = self.search_type_name or self.name + "SearchBasic"
         return self.search_client(search_type_name)
 
-    def generate_token_passport(self):
-        consumer_key = self.config["ns_consumer_key"]
-        consumer_secret = self.config["ns_consumer_secret"]
-        token_key = self.config["ns_token_key"]
-        token_secret = self.config["ns_token_secret"]
-        account = self.config["ns_account"]
-
-        nonce = "".join([str(random.randint(0, 9)) for _ in range(20)])
-        timestamp = str(int(datetime.now().timestamp()))
-        key = f"{consumer_secret}&{token_secret}".encode(encoding="ascii")
-        msg = "&".join([account, consumer_key, token_key, nonce, timestamp])
-        msg = msg.encode(encoding="ascii")
-
-        # compute the signature
-        hashed_value = hmac.new(key, msg=msg, digestmod=hashlib.sha256)
-        dig = hashed_value.digest()
-        signature_value = base64.b64encode(dig).decode()
-
-        passport_signature = self.search_client("TokenPassportSignature")
-        signature = passport_signature(signature_value, algorithm="HMAC-SHA256")
-
-        passport = self.search_client("TokenPassport")
-        return passport(
-            account=account,
-            consumerKey=consumer_key,
-            token=token_key,
-            nonce=nonce,
-            timestamp=timestamp,
-            signature=signature,
+    @property
+    def search_prefix(self):
+        """The search family, e.g. ``Transaction`` for TransactionSearchBasic."""
+        search_type_name = self.search_type_name or self.name + "SearchBasic"
+        return search_type_name[: -len("SearchBasic")]
+
+    @cached_property
+    def selected_properties(self):
+        return [
+            name
+            for name in self.schema["properties"]
+            if self.mask.get(("properties", name), True)
+        ]
+
+    def is_sublist(self, name):
+        """Line-level lists like itemList, left out by bodyFieldsOnly searches."""
+        if not name.endswith("List") or name in ("customFieldList", "nullFieldList"):
+            return False
+        properties = self.schema["properties"][name].get("properties", {})
+        return any("array" in p.get("type", []) for p in properties.values())
+
+    @cached_property
+    def projection(self):
+        """How the search is narrowed to the selected properties.
+
+        Returns ``(mode, columns)``: ``search_columns`` runs an advanced
+        search returning only ``columns``, a mapping of field names to their
+        search column type, ``body_fields_only`` leaves out the sublists and
+        ``full`` returns whole records.
+        """
+        if (
+            not self.config.get("field_projection", True)
+            or self.record_type != "SearchRecordType"
+            or self.uses_transaction_fanout
+            or len(self.selected_properties) == len(self.schema["properties"])
+        ):
+            return "full", None
+        columns = self.projected_columns()
+        if columns:
+            return "search_columns", columns
+        if not any(self.is_sublist(name) for name in self.selected_properties):
+            return "body_fields_only", None
+        return "full", None
+
+    def projected_columns(self):
+        """Return the search columns of the selection, or None if it can't be."""
+        names = set(self.selected_properties) | set(self.primary_keys)
+        if self.replication_key:
+            names.add(self.replication_key)
+        if len(names) > self.config.get("search_columns_max", 25):
+            return None
+        try:
+            row_basic = self.search_client(f"{self.search_prefix}SearchRowBasic")
+        except TypeNotFound:
+            return None
+        column_types = {name: element.type.name for name, element in row_basic.elements}
+
+        columns = {}
+        for name in names:
+            column_type = column_types.get(name)
+            schema = self.schema["properties"].get(name, {})
+            types = schema.get("type", [])
+            if column_type == "SearchColumnSelectField":
+                # the ids returned as references; other references only carry
+                # their internalId, where records also have the name and type
+                fits = name in ("internalId", "externalId")
+            else:
+                fits = column_type in SCALAR_SEARCH_COLUMNS and not (
+                    "object" in types or "array" in types
+                )
+            if not fits:
+                return None
+            columns[name] = column_type
+        return columns
+
+    def build_projected_search(self, search_basic):
+        """Wrap a basic search in an advanced search of the projected columns."""
+        prefix = self.search_prefix
+        _, columns = self.projection
+        if hasattr(search_basic, "mainLine"):
+            # one row per transaction rather than per line
+            search_boolean = self.search_client("SearchBooleanField")
+            search_basic.mainLine = search_boolean(searchValue=True)
+        row_basic = self.search_client(f"{prefix}SearchRowBasic")(
+            **{name: [self.search_client(t)()] for name, t in columns.items()}
         )
+        return self.search_client(f"{prefix}SearchAdvanced")(
+            criteria=self.search_client(f"{prefix}Search")(basic=search_basic),
+            columns=self.search_client(f"{prefix}SearchRow")(basic=row_basic),
+        )
+
+    def page_records(self, result):
+        """Return the records of a search page, converting search rows."""
+        if getattr(result, "searchRowList", None) is None:
+            return result["recordList"]["record"]
+        return [self.row_record(row) for row in result.searchRowList.searchRow]
+
+    def row_record(self, row):
+        _, columns = self.projection
+        record = {}
+        for name in columns:
+            values = row.basic[name]
+            value = values[0].searchValue if values else None
+            if name in ("internalId", "externalId") and value is not None:
+                value = getattr(value, name, None) or value.internalId
+            record[name] = value
+        return record
+
+    def generate_token_passport(self):
+        return self.suitetalk.token_passport(self.config)
 
-    def build_headers(self, include_search_preferences: bool = False):
+    def build_headers(self, include_search_preferences: bool = False, page_size=None):
         soapheaders = {}
-        soapheaders["tokenPassport"] = self.generate_token_passport()
+        with self.stages.timed("token_signing"):
+            soapheaders["tokenPassport"] = self.generate_token_passport()
         if include_search_preferences:
             search_preferences = self.search_client("SearchPreferences")
             preferences = {
-                "bodyFieldsOnly": False,
-                "pageSize": self.page_size,
+                "bodyFieldsOnly": self.projection[0] == "body_fields_only",
+                "pageSize": page_size or self.page_size,
                 "returnSearchColumns": True,
             }
             soapheaders["searchPreferences"] = search_preferences(**preferences)
         return soapheaders
 
-    @backoff.on_exception(backoff.expo, RetriableAPIError, max_tries=5, factor=2)
-    def request(self, name, *args, **kwargs):
+    @backoff.on_exception(
+        backoff.expo,
+        RetriableAPIError,
+        max_tries=5,
+        factor=2,
+        on_backoff=record_backoff,
+    )
+    def request(self, name, *args, page_size=None, **kwargs):
         method = getattr(self.service_proxy, name)
         # call the service:
         is_search = name == "search"
-        headers = self.build_headers(include_search_preferences=is_search)
+        headers = self.build_headers(
+            include_search_preferences=is_search, page_size=page_size
+        )
+        # probes with their own page size say little about the stream's
+        is_probe = page_size is not None
 
         try:
-            request_start_time = time()
-            response = method(*args, _soapheaders=headers, **kwargs)
-            request_duration = time() - request_start_time
+            with self._tap.governor.slot() as wait_duration:
+                received = self.suitetalk.http.stats.received_by_thread()
+                request_start_time = time()
+                call_start = perf_counter()
+                response = method(*args, _soapheaders=headers, **kwargs)
+                self.record_call_stages(call_start, perf_counter())
+                request_duration = time() - request_start_time
+                received = self.suitetalk.http.stats.received_by_thread() - received
+            self.write_concurrency_wait_metric(wait_duration)
+            self.write_response_bytes_metric(received)
+            self.stages.count(bytes_received=received)
 
             response_body_attrs = list(vars(response.body)["__values__"].keys())
-            request_type = next(k for k in response_body_attrs if k in self.valid_requests)
+            request_type = next(
+                k for k in response_body_attrs if k in self.valid_requests
+            )
 
             result = getattr(response.body, request_type)
 
             if hasattr(result, "totalRecords"):
                 page_size = result.totalRecords
             elif result.totalPages == result.pageIndex:
-                page_size = result.totalRecords - (result.pageIndex - 1) * result.pageSize
+                page_size = (
+                    result.totalRecords - (result.pageIndex - 1) * result.pageSize
+                )
             else:
                 page_size = result.pageSize
 
+            records = self.page_length(result)
+            self.stages.count(pages=1, page_records=records)
+            if self.page_sizer and not is_probe:
+                self.page_sizer.observe(request_duration, received, records)
+                self.stream_state["page_size"] = self.page_sizer.to_state()
+
             request_status = "SUCCESS" if result.status.isSuccess else "ERROR"
             extra_tags = dict(page_size=page_size)
             metric = {
@@ -172,18 +336,176 @@ class NetsuiteStream(Stream):
         except Fault as fault:
             self.logger.error(f"Fault: {fault}")
             if "An unexpected error occurred" in str(fault):
-                raise RetriableAPIError("Retriable error due to unexpected fault.", fault)
+                # usually a page too large to build in time; a retried
+                # search asks for smaller pages
+                if self.page_sizer:
+                    self.page_sizer.fault()
+                    self.stream_state["page_size"] = self.page_sizer.to_state()
+                raise RetriableAPIError(
+                    "Retriable error due to unexpected fault.", fault
+                )
             else:
                 raise fault
 
+    def stream_request(self, name, *args, **kwargs):
+        """Like ``request``, but return a ``RecordListResponse`` of the body.
+
+        The response is returned once its status is read; its records are
+        parsed as they are downloaded. Errors reading the response, such as a
+        dropped connection or a body that isn't SOAP, raise
+        ``RetriableAPIError``.
+        """
+        method = getattr(self.service_proxy, name)
+        headers = self.build_headers()
+
+        request_start_time = time()
+        call_start = perf_counter()
+        try:
+            with self.client.settings(raw_response=True):
+                with self.client.transport.streaming():
+                    response = method(*args, _soapheaders=headers, **kwargs)
+            self.record_call_stages(call_start, perf_counter())
+            self.check_content_type(response)
+            response.raw.decode_content = True
+            result = RecordListResponse(response.raw, self.parse_record)
+        except STREAM_ERRORS as error:
+            raise RetriableAPIError(f"{name} response could not be read: {error}")
+        request_duration = time() - request_start_time
+
+        if result.fault:
+            result.close()
+            self.logger.error(f"Fault: {result.fault}")
+            if "An unexpected error occurred" in result.fault:
+                raise RetriableAPIError(
+                    "Retriable error due to unexpected fault.", result.fault
+                )
+            raise Fault(result.fault)
+
+        self.stages.count(pages=1, page_records=result.total_records)
+        metric = {
+            "type": "timer",
+            "metric": "request_duration",
+            "value": round(request_duration, 4),
+            "tags": {
+                "object": self.name,
+                "status": "SUCCESS" if result.is_success else "ERROR",
+            },
+        }
+        self._write_metric_log(
+            metric=metric, extra_tags=dict(page_size=result.total_records)
+        )
+
+        if not result.is_success:
+            result.close()
+            detail = result.status_detail
+            self.raise_for_status(
+                SimpleNamespace(code=detail.get("code"), message=detail.get("message"))
+            )
+        return result
+
+    @staticmethod
+    def check_content_type(response):
+        """Raise for error pages, such as those of proxies, rather than SOAP."""
+        content_type = response.headers.get("Content-Type", "")
+        if "xml" in content_type:
+            return
+        response.close()
+        message = f"HTTP {response.status_code} response of type {content_type!r}"
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetriableAPIError(message)
+        raise FatalAPIError(message)
+
+    def read_records(self, result):
+        try:
+            yield from result.records()
+        except STREAM_ERRORS as error:
+            raise RetriableAPIError(f"Response could not be read: {error}")
+        finally:
+            result.close()
+
+    def record_call_stages(self, start, end):
+        """Split the time of a zeep call into serialization, network, XML
+        parsing and building the response objects."""
+        post = self.client.transport.last_post()
+        if not post or post[0] < start:
+            return
+        post_start, post_end = post
+        self.stages.add("serialize", post_start - start)
+        self.stages.add("network", post_end - post_start)
+        parsed = self.suitetalk.ingress_timer.last_parsed()
+        if parsed and parsed >= post_end:
+            self.stages.add("xml_parse", parsed - post_end)
+            self.stages.add("deserialize", end - parsed)
+
+    def parse_record(self, element):
+        # streamed bodies are downloaded and parsed record by record
+        start = perf_counter()
+        record = self.suitetalk.parse_record(element)
+        self.stages.add("deserialize", perf_counter() - start)
+        return record
+
+    def page_length(self, result):
+        rows = getattr(result, "searchRowList", None)
+        if rows is not None:
+            return len(rows.searchRow)
+        records = result.recordList
+        return len(records.record) if records is not None else 0
+
+    def write_concurrency_wait_metric(self, wait_duration):
+        metric = {
+            "type": "timer",
+            "metric": "concurrency_wait",
+            "value": round(wait_duration, 4),
+            "tags": {"object": self.name},
+        }
+        self._write_metric_log(metric=metric, extra_tags=None)
+
+    def write_response_bytes_metric(self, received):
+        metric = {
+            "type": "counter",
+            "metric": "response_bytes",
+            "value": received,
+            "tags": {"object": self.name, "projection": self.projection[0]},
+        }
+        self._write_metric_log(metric=metric, extra_tags=None)
+
+    def write_sync_metrics(self):
+        metrics = chain(
+            self.prefetch_stats.metrics(self.name),
+            self.stages.metrics(self.name),
+        )
+        for metric in metrics:
+            self._write_metric_log(metric=metric, extra_tags=None)
+
     def get_all_records(self, context):
         type_name = self.name[0].lower() + self.name[1:]
         get_all_record = self.search_client("GetAllRecord")
         record = get_all_record(recordType=type_name)
-        response = self.request("getAll", record=record)
-
-        records = response["recordList"]["record"]
-        return serialize_object(records)
+        received = self.suitetalk.http.stats.received_by_thread()
+        emitted = 0
+        for tries in range(1, GET_ALL_TRIES + 1):
+            try:
+                # the slot is held until the body is downloaded
+                with self._tap.governor.slot() as wait_duration:
+                    self.write_concurrency_wait_metric(wait_duration)
+                    result = self.stream_request("getAll", record=record)
+                    # zeep objects are parsed one at a time and converted by
+                    # the record transformer, so the list is never held in
+                    # memory. Records emitted before a retry are skipped.
+                    for index, row in enumerate(self.read_records(result)):
+                        if index >= emitted:
+                            emitted += 1
+                            yield row
+                break
+            except RetriableAPIError:
+                if tries == GET_ALL_TRIES:
+                    raise
+                wait = 2**tries
+                record_backoff({"args": (self,), "wait": wait})
+                self.logger.warning(f"Retrying getAll of {self.name} in {wait}s.")
+                sleep(wait)
+        received = self.suitetalk.http.stats.received_by_thread() - received
+        self.stages.count(bytes_received=received)
 
     @cached
     def get_starting_time(self, context):
@@ -193,180 +515,475 @@ class NetsuiteStream(Stream):
         rep_key = self.get_starting_timestamp(context)
         return rep_key or start_date
 
-    def get_all_paginated(self, context):
-        # apply filters
+    def build_search(
+        self, start_date, end_date=None, record_type_filter=True, id_range=None
+    ):
         search_type = self.search_type()
         rk = self.replication_key
-        start_date = self.get_starting_time(context)
         if start_date and rk and hasattr(search_type, rk):
             search_date = self.search_client("SearchDateField")
-            search_date = search_date(searchValue=start_date, operator="onOrAfter")
+            if end_date:
+                # within is inclusive and compares to the minute; windows end on
+                # whole minutes, so a second early leaves that one to the next
+                search_date = search_date(
+                    searchValue=start_date,
+                    searchValue2=end_date - timedelta(seconds=1),
+                    operator="within",
+                )
+            else:
+                search_date = search_date(searchValue=start_date, operator="onOrAfter")
             setattr(search_type, rk, search_date)
-        if getattr(search_type, "recordType", None):
+        if id_range:
+            low, high = id_range
+            search_long = self.search_client("SearchLongField")
+            if high is None:
+                search_type.internalIdNumber = search_long(
+                    searchValue=low, operator="greaterThanOrEqualTo"
+                )
+            else:
+                # between is inclusive, like within
+                search_type.internalIdNumber = search_long(
+                    searchValue=low, searchValue2=high - 1, operator="between"
+                )
+        if isinstance(record_type_filter, list):
+            multi_select = self.search_client("SearchEnumMultiSelectField")
+            search_type.type = multi_select(
+                searchValue=record_type_filter, operator="anyOf"
+            )
+        elif record_type_filter and getattr(search_type, "recordType", None):
             search_string = self.search_client("SearchStringField")
             search_type.recordType = search_string(
                 searchValue=self.name, operator="contains"
             )
+        if self.projection[0] == "search_columns":
+            return self.build_projected_search(search_type)
+        return search_type
+
+    def search_pages(self, search_record):
+        """Yield the result of every page of a search, in page order."""
+        result = self.request("search", searchRecord=search_record)
+        return self.more_pages(result)
 
-        # request records
-        result = self.request("search", searchRecord=search_type)
+    def more_pages(self, result, search_id=None):
+        """Yield ``result`` and every page of its search that follows it."""
         total_pages = result.totalPages
         page_index = result.pageIndex
-        search_id = result.searchId
+        search_id = result.searchId or search_id
 
-        if total_pages == 0:
-            return []
+        if total_pages == 0 or page_index > total_pages:
+            return
+
+        yield result
+
+        def fetch_page(page):
+            return self.request("searchMoreWithId", searchId=search_id, pageIndex=page)
+
+        pages = range(page_index + 1, total_pages + 1)
+        pages = fetch_pages_in_order(fetch_page, pages, self.page_concurrency)
+        # the next pages download while this one is transformed and written
+        yield from prefetch(pages, self.prefetch_pages, self.prefetch_stats)
+
+    def search_records(self, start_date, record_type_filter=True, state=None):
+        """Yield the raw records of the stream's search from ``start_date``.
+
+        When ``date_window_days`` is set the search is split into replication
+        key windows, and with ``id_range_sharding`` backfills are split into
+        internal id ranges. Otherwise progress is checkpointed per page.
+        Checkpoints are kept in ``state`` if given. ``record_type_filter`` may
+        also be a list of TransactionType values to search for.
+        """
+        if self.date_window and start_date and self.replication_key:
+            yield from self.search_windows(start_date, record_type_filter, state)
+            return
 
-        for record in result["recordList"]["record"]:
-            yield serialize_object(record)
+        if self.uses_id_ranges(start_date):
+            yield from self.search_id_ranges(start_date, record_type_filter, state)
+            return
 
-        while total_pages > page_index:
-            next_page = page_index + 1
+        if state is None:
+            search_record = self.build_search(
+                start_date, record_type_filter=record_type_filter
+            )
+            for result in self.search_pages(search_record):
+                yield from self.page_records(result)
+            return
+
+        yield from self.search_resumable(start_date, record_type_filter, state)
+
+    def resume_pages(self, checkpoint):
+        """Continue a checkpointed search, or return None if it expired."""
+        search_id = checkpoint["searchId"]
+        page_index = checkpoint["pageIndex"] + 1
+        if page_index > checkpoint["totalPages"]:
+            return iter([])
+        try:
             result = self.request(
-                "searchMoreWithId", searchId=search_id, pageIndex=next_page
+                "searchMoreWithId", searchId=search_id, pageIndex=page_index
+            )
+        except (FatalAPIError, Fault) as error:
+            self.logger.info(f"Could not resume search {search_id}: {error}")
+            return None
+        return self.more_pages(result, search_id)
+
+    def search_resumable(self, start_date, record_type_filter, state):
+        """Search with a page checkpoint written to state after every page.
+
+        A rerun with the same search parameters continues from the page after
+        the checkpoint while its searchId is valid, and searches again from
+        the start once it has expired. Basic searches cannot be sorted, so the
+        records not yet seen could be anywhere in the results of a new search.
+        """
+        # a search id keeps the page size it was created with, so a checkpoint
+        # stays valid when the page size changes
+        params = {
+            "start": start_date.isoformat() if start_date else None,
+            "record_type_filter": record_type_filter,
+        }
+        _, columns = self.projection
+        if columns:
+            # a search id only returns the columns it was created with
+            params["columns"] = sorted(columns)
+        checkpoint = state.get("page_checkpoint")
+        if not checkpoint or checkpoint["search"] != params:
+            checkpoint = None
+
+        pages = self.resume_pages(checkpoint) if checkpoint else None
+        if pages is not None:
+            self.logger.info(
+                f"Resuming {self.name} search after page {checkpoint['pageIndex']}."
+            )
+            self.search_resumed = True
+            progress = checkpoint
+        else:
+            if checkpoint:
+                self.logger.info(f"Restarting expired {self.name} search.")
+            progress = {"search": params}
+            search_record = self.build_search(
+                start_date, record_type_filter=record_type_filter
+            )
+            pages = self.search_pages(search_record)
+
+        for result in pages:
+            yield from self.page_records(result)
+            progress.update(
+                searchId=result.searchId or progress.get("searchId"),
+                pageIndex=result.pageIndex,
+                totalPages=result.totalPages,
             )
-            page_index = result.pageIndex
+            state["page_checkpoint"] = progress
+            self._write_state_message()
+        state.pop("page_checkpoint", None)
+
+    def search_windows(self, start_date, record_type_filter=True, state=None):
+        start_date = datetime.fromtimestamp(start_date.timestamp(), timezone.utc)
+        end_date = datetime.now(timezone.utc)
+        checkpoint = (state or {}).get("window_checkpoint")
+        if checkpoint and parse(checkpoint["start"]) <= start_date:
+            resume_date = parse(checkpoint["completed_until"])
+            self.logger.info(f"Resuming {self.name} windows from {resume_date}.")
+            checkpoint_start = checkpoint["start"]
+            start_date = max(start_date, resume_date)
+        else:
+            checkpoint_start = start_date.isoformat()
+
+        target_records = self.config.get("window_target_records", 10000)
+        planner = DateWindowPlanner(
+            start_date, end_date, self.date_window, target_records
+        )
+
+        def fetch_window(window):
+            # the last window is left open so late changes aren't missed
+            window_end = window[1] if window[1] < end_date else None
+            search_record = self.build_search(
+                window[0], window_end, record_type_filter=record_type_filter
+            )
+            return self.planned_records(planner, window, search_record)
+
+        concurrency = self.config.get("window_concurrency", 1)
+        for window, records in run_windows(planner, fetch_window, concurrency):
+            yield from records
+            planner.complete(window)
+            if state is not None:
+                state["window_checkpoint"] = {
+                    "start": checkpoint_start,
+                    "completed_until": planner.completed_until().isoformat(),
+                }
+                self._write_state_message()
+        if state is not None:
+            state.pop("window_checkpoint", None)
+
+    def planned_records(self, planner, window, search_record):
+        """Records of the search of a planned window, or None if the planner
+        split the window after its first page."""
+        pages = self.search_pages(search_record)
+        first_page = next(pages, None)
+        total_records = first_page.totalRecords if first_page else 0
+        if not planner.observe(window, total_records):
+            pages.close()
+            return None
+        if first_page is None:
+            return []
+        return (
+            record
+            for result in chain([first_page], pages)
+            for record in self.page_records(result)
+        )
 
-            for record in result["recordList"]["record"]:
-                yield serialize_object(record)
+    def uses_id_ranges(self, start_date):
+        """If the search is a backfill to split into internal id ranges: a
+        search not filtered by date, or a first sync from ``start_date``."""
+        if not self.config.get("id_range_sharding"):
+            return False
+        if start_date and self.replication_key:
+            if self.stream_state.get("replication_key_value"):
+                return False
+        return hasattr(self.search_type(), "internalIdNumber")
+
+    def id_bounds(self, start_date, record_type_filter):
+        """Probe the search for its record count and an id above every one.
+
+        Each probe is a search for ids from a value asking for the smallest
+        page, doubling the value until nothing is found, then bisecting.
+        """
+
+        def count(low):
+            search_record = self.build_search(
+                start_date, record_type_filter=record_type_filter, id_range=(low, None)
+            )
+            result = self.request(
+                "search", searchRecord=search_record, page_size=MIN_PAGE_SIZE
+            )
+            return result.totalRecords or 0
+
+        total = count(0)
+        if not total:
+            return 0, 0
+        low, high = 0, ID_PROBE_START
+        while count(high):
+            low, high = high, high * 2
+        for _ in range(ID_PROBE_BISECTIONS):
+            middle = (low + high) // 2
+            if count(middle):
+                low = middle
+            else:
+                high = middle
+        return total, high
+
+    def search_id_ranges(self, start_date, record_type_filter=True, state=None):
+        """Search ``[low, high)`` ranges of internalIdNumber, sized to hold about
+        ``id_range_target_records`` records, ``id_range_concurrency`` at a time.
+
+        Completed ranges are checkpointed in state, so an interrupted backfill
+        resumes at the first unfinished range.
+        """
+        params = {
+            "start": start_date.isoformat() if start_date else None,
+            "record_type_filter": record_type_filter,
+        }
+        checkpoint = (state or {}).get("id_range_checkpoint")
+        resume_id = 0
+        if checkpoint and checkpoint["search"] == params:
+            resume_id = checkpoint["completed_until"]
+            self.logger.info(f"Resuming {self.name} id ranges from {resume_id}.")
+            self.search_resumed = True
+
+        total, end_id = self.id_bounds(start_date, record_type_filter)
+        if end_id <= resume_id:
+            end_id = resume_id + 1
+        target_records = self.config.get("id_range_target_records", 10000)
+        window = (end_id - resume_id) * target_records / max(total, 1)
+        planner = IdRangePlanner(resume_id, end_id, window, target_records)
+        self.logger.info(
+            f"Searching {self.name} by internal id up to {end_id}, "
+            f"{total} records in ranges of {planner.window} ids."
+        )
+
+        def fetch_range(id_range):
+            # the last range is left open so records created since are synced
+            high = id_range[1] if id_range[1] < end_id else None
+            search_record = self.build_search(
+                start_date,
+                record_type_filter=record_type_filter,
+                id_range=(id_range[0], high),
+            )
+            return self.planned_records(planner, id_range, search_record)
+
+        concurrency = self.config.get("id_range_concurrency", 1)
+        for id_range, records in run_windows(planner, fetch_range, concurrency):
+            yield from records
+            planner.complete(id_range)
+            if state is not None:
+                state["id_range_checkpoint"] = {
+                    "search": params,
+                    "completed_until": planner.completed_until(),
+                }
+                self._write_state_message()
+        if state is not None:
+            state.pop("id_range_checkpoint", None)
+
+    def get_all_paginated(self, context):
+        start_date = self.get_starting_time(context)
+        state = self.get_context_state(context)
+        yield from self.search_records(start_date, state=state)
 
     def get_records(self, context: Optional[dict]) -> Iterable[dict]:
+        if self.page_sizer and self.record_type != "GetAllRecordType":
+            # set before any request thread updates it
+            self.stream_state["page_size"] = self.page_sizer.to_state()
+            self.logger.info(f"{self.name}: searching with pages of {self.page_size}.")
+
         if self.record_type == "GetAllRecordType":
             response = self.get_all_records(context)
+        elif self.uses_transaction_fanout:
+            response = self._tap.transaction_fanout.get_records(self, context)
         elif self.record_type == "SearchRecordType":
+            mode, _ = self.projection
+            selected = len(self.selected_properties)
+            self.logger.info(
+                f"{self.name}: {selected} of {len(self.schema['properties'])} "
+                f"properties selected, searching with {mode} projection."
+            )
             response = self.get_all_paginated(context)
 
-        def pre_hook(data, _, schema):
-            if schema.get("format") == "date-time" and data:
-                data = data.isoformat()
-            return data
+        boundary = self.boundary_seen(context)
+        fingerprints = self.stream_fingerprints()
+        self.search_resumed = False
+        yield from self.changed_records(response, boundary, fingerprints)
+        if boundary:
+            self.get_context_state(context)["boundary_seen"] = boundary.to_state()
+        if fingerprints:
+            yield from self.save_fingerprints(fingerprints)
+        self.write_sync_metrics()
+
+    def changed_records(self, records, boundary=None, fingerprints=None):
+        """Transform ``records``, skipping those an earlier run emitted as is."""
+        rk = self.replication_key
+        transform_seconds = emit_seconds = 0.0
+        count = duplicates = 0
+        with self.record_transformer as transformer:
+            for record in records:
+                start = perf_counter()
+                record = transformer.transform(record)
+                transformed = perf_counter()
+                transform_seconds += transformed - start
+                modified = boundary and record.get(rk)
+                if modified and boundary.add(record.get("internalId"), modified):
+                    duplicates += 1
+                    continue
+                if fingerprints and not fingerprints.has_changed(record):
+                    continue
+                yield record
+                # the SDK writes the record before asking for the next one
+                emit_seconds += perf_counter() - transformed
+                count += 1
+        self.stages.add("transform", transform_seconds, count)
+        self.stages.add("emit", emit_seconds, count)
+        if boundary:
+            self.stages.count(boundary_duplicates=duplicates)
+
+    def save_fingerprints(self, fingerprints):
+        """Save the fingerprints once every record was written, and yield the
+        delete markers of the records no longer returned.
+
+        A resumed search did not return the records of the pages or id ranges
+        before its checkpoint, so they are not taken as deleted.
+        """
+        complete = not self.search_resumed
+        deleted = fingerprints.deleted() if complete else []
+        if self.config.get("fingerprint_deletes"):
+            deleted_at = datetime.now(timezone.utc).isoformat()
+            for internal_id in deleted:
+                yield {"internalId": internal_id, DELETED_AT: deleted_at}
+        fingerprints.save(prune=complete)
+        self.stages.count(
+            unchanged_records=fingerprints.unchanged, deleted_records=len(deleted)
+        )
+
+    def boundary_seen(self, context):
+        """Hashes of the records of the bookmark's minute, with boundary_dedup."""
+        if not (self.config.get("boundary_dedup") and self.replication_key):
+            return None
+        state = self.get_context_state(context)
+        # only a search from the bookmark returns the records of its minute
+        previous = None
+        if state.get("replication_key_value"):
+            previous = state.get("boundary_seen")
+        max_records = self.config.get(
+            "boundary_dedup_max_records", MAX_BOUNDARY_RECORDS
+        )
+        return BoundarySeen(previous, max_records)
+
+    @property
+    def uses_fingerprints(self):
+        if not self.config.get("fingerprint_store"):
+            return False
+        return self.record_type == "GetAllRecordType" or not self.replication_key
+
+    def stream_fingerprints(self):
+        """Hashes of the records the last run emitted, with fingerprint_store."""
+        if not self.uses_fingerprints:
+            return None
+        account = self.config["ns_account"].replace("_", "-").lower()
+        return StreamFingerprints(self._tap.fingerprints, f"{account}:{self.name}")
 
-        with Transformer(pre_hook=pre_hook) as transformer:
-            for record in response:
-                yield transformer.transform(record, self.schema)
+    @cached_property
+    def record_transformer(self):
+        return CompiledTransformer(self.schema, drop_nulls=True)
 
     @cached_property
     def schema(self):
+        schema = self.wsdl_schema()
+        if self.config.get("fingerprint_deletes") and self.uses_fingerprints:
+            properties = {**schema["properties"], DELETED_AT: SCALAR_TYPES[datetime]}
+            schema = {**schema, "properties": properties}
+        return schema
+
+    def wsdl_schema(self):
         if getattr(self._tap, "input_catalog"):
             streams = self._tap.input_catalog.to_dict()
             streams = (s for s in streams["streams"] if s["tap_stream_id"] == self.name)
             stream_catalog = next(streams, None)
             if stream_catalog:
                 return stream_catalog["schema"]
-        properties = self.unwrap_zeep(self.ns_type)
+
+        cache = self._tap.discovery_cache
+        cache_key = f"schema:{self.name}"
+        if cache_key in cache:
+            cached_schema = cache.get(cache_key)
+            if cached_schema is None:
+                raise TypeNotFound(f"Type {self.name} not found in WSDL")
+            if cached_schema["replication_key"]:
+                self.replication_key = cached_schema["replication_key"]
+            return cached_schema["schema"]
+
+        try:
+            properties = self.suitetalk.schema_builder.properties(self.ns_type)
+        except TypeNotFound:
+            cache.set(cache_key, None)
+            raise
         replication_key = next(
-            (p for p in properties if p.name.lower() in REPLICATION_KEYS), None
+            (name for name in properties if name.lower() in REPLICATION_KEYS), None
         )
         if replication_key:
-            self.replication_key = replication_key.name
-
-        return th.PropertiesList(*properties).to_dict()
-
-    def extract_type(self, type_obj):
-        type_cls = type_obj.type.accepted_types[0]
-
-        if hasattr(type_cls, "_xsd_type"):
-            field_name = type_cls._xsd_type.name
-            properties = self.unwrap_zeep(type_cls._xsd_type)
-
-            if field_name == 'CustomFieldList':
-                array_type = th.ArrayType(
-                    th.ObjectType(
-                        th.Property("internalId",th.StringType),
-                        th.Property("scriptId",th.StringType),
-                        th.Property("value",th.CustomType({"anyOf": [
-                                {
-                                    "type":["array","null"],
-                                    "items": { 
-                                        "properties": { 
-                                            "internalId": { 
-                                                "type":["string","null"]
-                                            },
-                                            "externalId": { 
-                                                "type":["string","null"]
-                                            },
-                                            "name": { 
-                                                "type":["string","null"]
-                                            },
-                                            "typeId": { 
-                                                "type":["string","null"]
-                                            }
-                                        },
-                                        "type":"object"
-                                    },
-                                },
-                                {
-                                    "type":"object",
-                                     "properties": { 
-                                            "internalId": { 
-                                                "type":["string","null"]
-                                            },
-                                            "externalId": { 
-                                                "type":["string","null"]
-                                            },
-                                            "name": { 
-                                                "type":["string","null"]
-                                            },
-                                            "typeId": { 
-                                                "type":["string","null"]
-                                            }
-                                    }
-                                }, 
-                                {
-                                    "type":["string","boolean","integer","number"]
-                                }
-
-                            ]
-                        })
-                        ),
-                    )
-                )
-                properties.append(th.Property("customField",array_type))
-
-            object = th.ObjectType(*properties)
-            if getattr(type_obj, "accepts_multiple", None):
-                object = th.ArrayType(object)
-            return th.Property(field_name, object)
-
-        if type_cls is str:
-            property = th.StringType
-        elif type_cls is bool:
-            property = th.BooleanType
-        elif type_cls is int:
-            property = th.IntegerType
-        elif type_cls is Decimal:
-            property = th.NumberType
-        elif type_cls is datetime:
-            property = th.DateTimeType
-        else:
-            self.logger.error(f"Unsupported type {type_cls}")
-            return None
-
-        return property
-
-    def unwrap_zeep(self, ns_schema_type):
-        properties = []
-        fields_list = ns_schema_type.attributes + ns_schema_type.elements
+            self.replication_key = replication_key
 
-        for field_name, type_obj in fields_list:
-            schema_type = self.extract_type(type_obj)
-            if type_obj.name in ["nullFieldList"]:
-                continue
-            if schema_type:
-                property = th.Property(field_name, schema_type)
-                properties.append(property)
-        return properties
+        schema = {"type": "object", "properties": dict(properties)}
+        cache.set(
+            cache_key,
+            {"schema": schema, "replication_key": self.replication_key},
+        )
+        return schema
 
     def validate_response(self, result) -> None:
         """Validate zeep response."""
         if not result.status.isSuccess:
-            status = result.status.statusDetail[0]
-            if status.code in RETRYABLE_ERRORS:
-                msg = self.response_error_message(status)
-                raise RetriableAPIError(msg, status)
-            else:
-                msg = self.response_error_message(status)
-                raise FatalAPIError(msg)
+            self.raise_for_status(result.status.statusDetail[0])
+
+    def raise_for_status(self, status) -> None:
+        msg = self.response_error_message(status)
+        if status.code in RETRYABLE_ERRORS:
+            raise RetriableAPIError(msg, status)
+        raise FatalAPIError(msg)
 
     def response_error_message(self, status) -> str:
         """Build error message for invalid http statuses."""
@@ -1,3 +1,5 @@
+API_VERSION = "2022_2"
+
 REPLICATION_KEYS = ["lastmodifieddate", "lastmoddate"]
 
 RETRYABLE_ERRORS = [
@@ -57,7 +59,9 @@ CUSTOM_SEARCH_FIELDS = {
 }
 
 ADVANCED_SEARCH_TYPES_AND_URNS = {
-    "CalendarEventSearchAdvanced": "scheduling_2025_1.activities.webservices.netsuite.com",
+    "CalendarEventSearchAdvanced": (
+        "scheduling_2025_1.activities.webservices.netsuite.com"
+    ),
     "TaskSearchAdvanced": "scheduling_2025_1.activities.webservices.netsuite.com",
     "PhoneCallSearchAdvanced": "scheduling_2025_1.activities.webservices.netsuite.com",
     "FileSearchAdvanced": "filecabinet_2025_1.documents.webservices.netsuite.com",
@@ -90,7 +94,19 @@ ADVANCED_SEARCH_TYPES_AND_URNS = {
     "CustomRecordSearchAdvanced": "customization_2025_1.setup.webservices.netsuite.com",
     "TimeBillSearchAdvanced": "employees_2025_1.lists.webservices.netsuite.com",
     "BudgetSearchAdvanced": "financial_2025_1.transactions.webservices.netsuite.com",
-    "AccountingTransactionSearchAdvanced": "sales_2025_1.transactions.webservices.netsuite.com",
+    "AccountingTransactionSearchAdvanced": (
+        "sales_2025_1.transactions.webservices.netsuite.com"
+    ),
     "OpportunitySearchAdvanced": "sales_2025_1.transactions.webservices.netsuite.com",
-    "TransactionSearchAdvanced": "sales_2025_1.transactions.webservices.netsuite.com"
+    "TransactionSearchAdvanced": "sales_2025_1.transactions.webservices.netsuite.com",
 }
+
+# search columns whose searchValue fits a scalar record field
+SCALAR_SEARCH_COLUMNS = [
+    "SearchColumnBooleanField",
+    "SearchColumnDateField",
+    "SearchColumnDoubleField",
+    "SearchColumnEnumSelectField",
+    "SearchColumnLongField",
+    "SearchColumnStringField",
+]
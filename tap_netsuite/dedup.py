@@ -0,0 +1,63 @@
+"""Skip the boundary records an incremental search returns again.
+
+Searches run ``onOrAfter`` the bookmark, and NetSuite compares dates to the
+minute, so every run returns the records modified in the bookmark's minute
+once more. ``BoundarySeen`` keeps a short hash of ``(internalId, replication
+key)`` for each record of the latest minute emitted, saved in the stream
+state, and tells which records of the next run were already emitted. A
+record modified again hashes differently and is emitted.
+"""
+
+import base64
+import hashlib
+
+DIGEST_SIZE = 8
+MAX_BOUNDARY_RECORDS = 10000
+
+
+def record_key(internal_id, modified):
+    key = f"{internal_id}|{modified}".encode()
+    return hashlib.blake2b(key, digest_size=DIGEST_SIZE).digest()
+
+
+def split_keys(data):
+    """Split the concatenated hashes of a saved state."""
+    for start in range(0, len(data), DIGEST_SIZE):
+        end = start + DIGEST_SIZE
+        yield data[start:end]
+
+
+class BoundarySeen:
+    """Hashes of the records emitted in the latest minute of a stream.
+
+    Dates are the UTC ISO strings of emitted records, so their first 16
+    characters are the minute and compare in time order. At most
+    ``max_records`` hashes are kept, the records past those are emitted again
+    by the next run.
+    """
+
+    def __init__(self, state=None, max_records=MAX_BOUNDARY_RECORDS):
+        self.max_records = max_records
+        self.minute = None
+        self.previous = set()
+        if state:
+            self.minute = state["minute"]
+            self.previous = set(split_keys(base64.b64decode(state["keys"])))
+        self.keys = set(self.previous)
+
+    def add(self, internal_id, modified):
+        """Keep a record of the stream, True if an earlier run emitted it."""
+        key = record_key(internal_id, modified)
+        minute = modified[:16]
+        if self.minute is None or minute > self.minute:
+            self.minute = minute
+            self.keys = set()
+        if minute == self.minute and len(self.keys) < self.max_records:
+            self.keys.add(key)
+        return key in self.previous
+
+    def to_state(self):
+        if self.minute is None:
+            return None
+        keys = base64.b64encode(b"".join(sorted(self.keys))).decode()
+        return {"minute": self.minute, "keys": keys}
@@ -0,0 +1,153 @@
+"""On-disk cache for discovered record types and generated stream schemas."""
+
+import json
+import logging
+import os
+import threading
+from time import time
+
+# bump whenever the shape of cached entries or generated schemas changes
+CACHE_FORMAT = 2
+# shared objects smaller than this are written out at every use
+MIN_SHARED_SIZE = 64
+REF_PREFIX = "#/$defs/"
+
+
+def count_uses(value, uses):
+    """Count the uses of the dicts in ``value`` into ``uses``, by id."""
+    if isinstance(value, dict):
+        seen = id(value) in uses
+        uses[id(value)] = uses.get(id(value), 0) + 1
+        if seen:
+            return
+        values = value.values()
+    elif isinstance(value, list):
+        values = value
+    else:
+        return
+    for item in values:
+        count_uses(item, uses)
+
+
+def share_objects(entries):
+    """Move dicts used more than once in ``entries`` to a table of shared
+    definitions, referenced as ``{"$ref": "#/$defs/<n>"}``.
+
+    Stream schemas share the properties of types like ``RecordRef`` in
+    memory, so they are written once rather than once per use.
+    """
+    uses = {}
+    count_uses(entries, uses)
+    defs = {}
+    names = {}
+
+    def encode(value, top=False):
+        if isinstance(value, list):
+            return [encode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        name = names.get(id(value))
+        if name is None:
+            encoded = {key: encode(item) for key, item in value.items()}
+            shared = not top and uses[id(value)] > 1
+            if not shared or len(json.dumps(encoded)) < MIN_SHARED_SIZE:
+                return encoded
+            name = names[id(value)] = str(len(defs))
+            defs[name] = encoded
+        return {"$ref": f"{REF_PREFIX}{name}"}
+
+    return encode(entries, top=True), defs
+
+
+def link_objects(entries, defs):
+    """Replace the references of ``share_objects`` with shared dicts."""
+    resolved = {}
+
+    def decode(value):
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if ref is not None and len(value) == 1 and ref.startswith(REF_PREFIX):
+                _, _, name = ref.rpartition("/")
+                if name not in resolved:
+                    resolved[name] = decode(defs[name])
+                return resolved[name]
+            return {key: decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [decode(item) for item in value]
+        return value
+
+    return decode(entries)
+
+
+class DiscoveryCache:
+    """JSON file cache keyed by account and SuiteTalk version, with a TTL."""
+
+    def __init__(self, directory, key, ttl, enabled=True, logger=None):
+        self.path = os.path.join(directory, f"discovery_{key}.json")
+        self.ttl = ttl
+        self.enabled = enabled
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._created_at = None
+        self._entries = self._load() if enabled else {}
+
+    def _load(self):
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except FileNotFoundError:
+            self.logger.info(f"Discovery cache miss: {self.path} not found.")
+            return {}
+        except ValueError:
+            self.logger.warning(f"Discovery cache miss: {self.path} is corrupt.")
+            return {}
+
+        age = time() - data.get("created_at", 0)
+        if data.get("format") != CACHE_FORMAT or age > self.ttl:
+            self.logger.info(f"Discovery cache miss: {self.path} is stale.")
+            return {}
+        self.logger.info(f"Discovery cache hit: {self.path} ({int(age)}s old).")
+        self._created_at = data["created_at"]
+        return link_objects(data["entries"], data.get("$defs", {}))
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get(self, name, default=None):
+        return self._entries.get(name, default)
+
+    def set(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[name] = value
+            self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        with self._lock:
+            self._created_at = self._created_at or time()
+            entries, defs = share_objects(self._entries)
+            data = {
+                "format": CACHE_FORMAT,
+                "created_at": self._created_at,
+                "$defs": defs,
+                "entries": entries,
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = False
+            self._created_at = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        self.logger.info(f"Discovery cache invalidated: {self.path}.")
@@ -0,0 +1,116 @@
+"""Sync several streams at once behind a single ordered message writer."""
+
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import singer
+from singer import StateMessage
+from singer.messages import format_message
+
+_STOP = object()
+
+
+class MessageWriter:
+    """Write the Singer messages of many threads to stdout from one thread.
+
+    Messages are serialized by ``write`` in the calling thread, so a STATE
+    message holds the state as of that call, after the records its stream
+    queued before it. The writer thread writes them in queue order and
+    flushes whenever the queue runs empty. At most ``max_queued`` messages
+    wait, so streams slow down to the pace of the target.
+    """
+
+    def __init__(self, max_queued=10000):
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._error = None
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error and not args[0]:
+            raise self._error
+
+    def write(self, message):
+        if self._error:
+            raise self._error
+        self._queue.put(format_message(message))
+
+    def _run(self):
+        while True:
+            lines = [self._queue.get()]
+            while lines[-1] is not _STOP:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = lines[-1] is _STOP
+            if stop:
+                lines.pop()
+            if lines and not self._error:
+                try:
+                    sys.stdout.write("\n".join(lines) + "\n")
+                    sys.stdout.flush()
+                except Exception as error:
+                    # keep draining so the streams fail instead of blocking
+                    self._error = error
+            if stop:
+                return
+
+
+class OrderedOutput:
+    """Send a stream's messages through the tap's ``message_writer`` while
+    streams sync concurrently, and straight to stdout otherwise."""
+
+    def _write_message(self, message):
+        writer = getattr(self._tap, "message_writer", None)
+        if writer is None:
+            singer.write_message(message)
+        else:
+            writer.write(message)
+
+    def _write_state_message(self):
+        self._write_message(StateMessage(value=self.tap_state))
+
+    def _write_schema_message(self):
+        for schema_message in self._generate_schema_messages():
+            self._write_message(schema_message)
+
+    def _write_record_message(self, record):
+        for record_message in self._generate_record_messages(record):
+            self._write_message(record_message)
+
+
+def sync_streams(streams, concurrency):
+    """Sync ``streams`` with up to ``concurrency`` of them at a time.
+
+    A stream starts as soon as a slot frees up. After an error no more
+    streams start, and it is raised once the running ones finish.
+    """
+
+    failed = threading.Event()
+
+    def sync(stream):
+        if failed.is_set():
+            return
+        try:
+            stream.sync()
+        except BaseException:
+            failed.set()
+            raise
+        stream.finalize_state_progress_markers()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(sync, stream) for stream in streams]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
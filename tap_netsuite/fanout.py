@@ -0,0 +1,122 @@
+"""One transaction search shared by every per-type transaction stream."""
+
+import os
+import pickle
+import tempfile
+import threading
+
+from zeep.helpers import serialize_object
+
+# TransactionType values not named after their record type
+TRANSACTION_TYPES = {
+    "InterCompanyJournalEntry": "_journal",
+    "JournalEntry": "_journal",
+    "StatisticalJournalEntry": "_statisticalJournal",
+}
+
+
+def record_type_name(record):
+    """Return the xsi:type name of a zeep record, e.g. ``Invoice``."""
+    xsd_type = getattr(record, "_xsd_type", None)
+    return xsd_type.name if xsd_type is not None else type(record).__name__
+
+
+def transaction_type(name):
+    """Return the TransactionType value of a record type, e.g. ``_invoice``."""
+    return TRANSACTION_TYPES.get(name, f"_{name[0].lower()}{name[1:]}")
+
+
+class TransactionFanOut:
+    """Run a single TransactionSearchBasic search for all transaction streams.
+
+    The first selected transaction stream to sync runs the search from the
+    earliest bookmark of all of them, for their transaction types. Records are
+    spooled to one temporary file per record type, and every stream replays
+    its own file when its turn comes, dropping records older than its own
+    bookmark. Memory stays flat regardless of the size of the window.
+
+    If the search fails, every stream waiting on it fails with the same error
+    rather than replaying a partial spool.
+    """
+
+    search_type_name = "TransactionSearchBasic"
+
+    def __init__(self, tap):
+        self.tap = tap
+        self._lock = threading.Lock()
+        self._spool_dir = None
+        self._spool_error = None
+
+    @property
+    def streams(self):
+        return [
+            stream
+            for stream in self.tap.streams.values()
+            if getattr(stream, "uses_transaction_fanout", False) and stream.selected
+        ]
+
+    def _spool_path(self, name):
+        return os.path.join(self._spool_dir.name, f"{name}.pickle")
+
+    def spool(self, searcher):
+        streams = self.streams
+        names = {stream.name for stream in streams}
+        start_dates = [stream.get_starting_time(None) for stream in streams]
+        start_date = None if None in start_dates else min(start_dates)
+
+        spool_dir = tempfile.TemporaryDirectory(prefix="tap-netsuite-")
+        spool_files = {}
+        counts = {}
+        try:
+            try:
+                types = sorted({transaction_type(name) for name in names})
+                records = searcher.search_records(start_date, record_type_filter=types)
+                for record in records:
+                    name = record_type_name(record)
+                    if name not in names:
+                        continue
+                    if name not in spool_files:
+                        path = os.path.join(spool_dir.name, f"{name}.pickle")
+                        spool_files[name] = open(path, "wb")
+                    pickle.dump(serialize_object(record), spool_files[name], -1)
+                    counts[name] = counts.get(name, 0) + 1
+            finally:
+                for spool_file in spool_files.values():
+                    spool_file.close()
+        except Exception:
+            spool_dir.cleanup()
+            raise
+        # only a complete spool is replayed
+        self._spool_dir = spool_dir
+        self.tap.logger.info(
+            f"Transaction search from {start_date} routed {counts} "
+            f"to {len(names)} streams."
+        )
+
+    def get_records(self, stream, context):
+        with self._lock:
+            if self._spool_error is not None:
+                raise self._spool_error
+            if self._spool_dir is None:
+                try:
+                    self.spool(stream)
+                except Exception as error:
+                    self._spool_error = error
+                    raise
+
+        path = self._spool_path(stream.name)
+        if not os.path.exists(path):
+            return
+
+        rk = stream.replication_key
+        start_date = stream.get_starting_time(context)
+        with open(path, "rb") as spool_file:
+            while True:
+                try:
+                    record = pickle.load(spool_file)
+                except EOFError:
+                    break
+                if start_date and rk and record.get(rk) and record[rk] < start_date:
+                    continue
+                yield record
+        os.remove(path)
@@ -0,0 +1,65 @@
+"""Account-wide limit on concurrent SuiteTalk requests."""
+
+import os
+import random
+import threading
+from contextlib import contextmanager
+from time import perf_counter, sleep
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+POLL_INTERVAL = 0.05
+
+
+class ConcurrencyGovernor:
+    """Limit in-flight requests for an account.
+
+    A semaphore bounds the requests of this process. When ``lock_dir`` is set,
+    each request also holds one of ``max_concurrency`` lock files, so every tap
+    process sharing that directory shares the same slots. File locks are
+    released by the OS if a process dies, so crashed runs never leak slots.
+    """
+
+    def __init__(self, max_concurrency, account, lock_dir=None, logger=None):
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._slot_paths = []
+        if lock_dir and fcntl is None:
+            if logger:
+                logger.warning("File locks unavailable, limiting this process only.")
+        elif lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+            self._slot_paths = [
+                os.path.join(lock_dir, f"{account}.slot{i}.lock")
+                for i in range(max_concurrency)
+            ]
+
+    def _acquire_file_slot(self):
+        while True:
+            for path in random.sample(self._slot_paths, len(self._slot_paths)):
+                slot_file = open(path, "a")
+                try:
+                    fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return slot_file
+                except OSError:
+                    slot_file.close()
+            sleep(POLL_INTERVAL * (1 + random.random()))
+
+    @contextmanager
+    def slot(self):
+        """Hold a request slot; yields the seconds spent waiting for it."""
+        start = perf_counter()
+        self._semaphore.acquire()
+        slot_file = None
+        try:
+            if self._slot_paths:
+                slot_file = self._acquire_file_slot()
+            yield perf_counter() - start
+        finally:
+            if slot_file:
+                fcntl.flock(slot_file, fcntl.LOCK_UN)
+                slot_file.close()
+            self._semaphore.release()
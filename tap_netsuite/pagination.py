@@ -0,0 +1,237 @@
+"""Helpers for fetching search result pages."""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+_DONE = object()
+
+# SuiteTalk's bounds on the pageSize search preference
+MIN_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 1000
+
+
+def fetch_pages_in_order(fetch_page, pages, concurrency=1):
+    """Yield ``fetch_page(page)`` for each page, in page order.
+
+    Up to ``concurrency`` pages are in flight at once, so at most that many
+    results are buffered while waiting for an earlier page to finish.
+    """
+    pages = iter(pages)
+    if concurrency <= 1:
+        for page in pages:
+            yield fetch_page(page)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    try:
+        for page in pages:
+            pending.append(executor.submit(fetch_page, page))
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            result = pending.popleft().result()
+            page = next(pages, _DONE)
+            if page is not _DONE:
+                pending.append(executor.submit(fetch_page, page))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class PipelineStats:
+    """Seconds spent on each side of the prefetch queues of a stream."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fetch_seconds = 0.0
+        self.fetch_blocked_seconds = 0.0
+        self.consume_wait_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def add(self, **seconds):
+        with self._lock:
+            for name, value in seconds.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def utilization(self):
+        """Share of the pipeline's lifetime each stage spent working."""
+        if not self.elapsed_seconds:
+            return {"fetch": 0.0, "consume": 0.0}
+        return {
+            "fetch": self.fetch_seconds / self.elapsed_seconds,
+            "consume": 1 - self.consume_wait_seconds / self.elapsed_seconds,
+        }
+
+    def metrics(self, object_name):
+        """Yield the busy time and utilization of each stage as timer metrics."""
+        if not self.elapsed_seconds:
+            return
+        busy = {
+            "fetch": self.fetch_seconds,
+            "consume": self.elapsed_seconds - self.consume_wait_seconds,
+        }
+        for stage, utilization in self.utilization().items():
+            yield {
+                "type": "timer",
+                "metric": f"prefetch_{stage}",
+                "value": round(busy[stage], 4),
+                "tags": {"object": object_name, "utilization": round(utilization, 3)},
+            }
+
+
+class PageSizer:
+    """Tune the page size of a stream's searches from the pages it gets.
+
+    ``observe`` rescales the size so a page takes about ``target_seconds`` and
+    ``target_bytes`` at the records/s and bytes/record just seen, moving at
+    most 2x per page and smoothing the estimates over pages. A fault halves
+    it, and it only grows again once the smoothed fault rate has decayed
+    below ``MAX_FAULT_RATE``. A search keeps the page size it was started
+    with, so a new size applies from the next search, or the retry of a
+    failed one. ``to_state`` and ``from_state`` carry it over to the next run.
+    """
+
+    SMOOTHING = 0.5
+    FAULT_SMOOTHING = 0.1
+    MAX_FAULT_RATE = 0.05
+
+    def __init__(self, size, target_seconds, target_bytes, fault_rate=0.0):
+        self._lock = threading.Lock()
+        self.estimate = float(self.clamp(size))
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.fault_rate = fault_rate
+
+    @staticmethod
+    def clamp(size):
+        return min(max(int(size), MIN_PAGE_SIZE), MAX_PAGE_SIZE)
+
+    @property
+    def size(self):
+        return self.clamp(round(self.estimate))
+
+    def observe(self, seconds, received, records):
+        """Learn from a page of ``records`` that took ``seconds`` and
+        ``received`` bytes."""
+        if records <= 0 or seconds <= 0:
+            return
+        target = self.target_seconds * records / seconds
+        if received:
+            target = min(target, self.target_bytes * records / received)
+        with self._lock:
+            self.fault_rate *= 1 - self.FAULT_SMOOTHING
+            if self.fault_rate > self.MAX_FAULT_RATE:
+                target = min(target, self.estimate)
+            target = min(max(target, self.estimate / 2), self.estimate * 2)
+            estimate = self.estimate + self.SMOOTHING * (target - self.estimate)
+            self.estimate = min(max(estimate, MIN_PAGE_SIZE), MAX_PAGE_SIZE)
+
+    def fault(self):
+        """Back off after a request failed, likely from the size of its page."""
+        with self._lock:
+            self.fault_rate += self.FAULT_SMOOTHING * (1 - self.fault_rate)
+            self.estimate = max(self.estimate / 2, MIN_PAGE_SIZE)
+
+    def to_state(self):
+        return {"size": self.size, "fault_rate": round(self.fault_rate, 4)}
+
+    @classmethod
+    def from_state(cls, state, size, target_seconds, target_bytes):
+        state = state or {}
+        return cls(
+            state.get("size", size),
+            target_seconds,
+            target_bytes,
+            fault_rate=state.get("fault_rate", 0.0),
+        )
+
+
+class Prefetcher(threading.Thread):
+    """Thread iterating ``items`` into a queue of up to ``depth`` entries.
+
+    Entries are ``(item, error)`` pairs, with ``_DONE`` as the item of the
+    last one.
+    """
+
+    def __init__(self, items, depth, stats):
+        super().__init__(daemon=True)
+        self.items = items
+        self.buffer = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.stats = stats
+
+    def put(self, entry):
+        start = perf_counter()
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(entry, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.stats.add(fetch_blocked_seconds=perf_counter() - start)
+
+    def fetch(self, iterator):
+        start = perf_counter()
+        try:
+            return next(iterator), None
+        except StopIteration:
+            return _DONE, None
+        except Exception as error:
+            return _DONE, error
+        finally:
+            self.stats.add(fetch_seconds=perf_counter() - start)
+
+    def run(self):
+        iterator = iter(self.items)
+        try:
+            while not self.stopped.is_set():
+                entry = self.fetch(iterator)
+                self.put(entry)
+                if entry[0] is _DONE:
+                    return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    def get(self):
+        """Return the next item, raising the error the producer stopped on."""
+        start = perf_counter()
+        item, error = self.buffer.get()
+        self.stats.add(consume_wait_seconds=perf_counter() - start)
+        if error is not None:
+            raise error
+        return item
+
+
+def prefetch(items, depth=1, stats=None):
+    """Yield ``items`` while a background thread produces up to ``depth`` ahead.
+
+    The next page is downloaded while the current one is transformed and
+    written. Errors of the producer are raised in order, once the items
+    before them are consumed. Closing the generator stops the producer.
+    """
+    if depth <= 0:
+        yield from items
+        return
+
+    stats = stats or PipelineStats()
+    producer = Prefetcher(items, depth, stats)
+    started = perf_counter()
+    producer.start()
+    try:
+        while True:
+            item = producer.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        producer.stopped.set()
+        producer.join()
+        stats.add(elapsed_seconds=perf_counter() - started)
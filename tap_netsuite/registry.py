@@ -0,0 +1,158 @@
+"""Process-wide registry of parsed SuiteTalk clients."""
+
+import base64
+import hashlib
+import hmac
+import random
+import threading
+from datetime import datetime
+
+from backports.cached_property import cached_property
+from zeep import Client
+from zeep.cache import SqliteCache
+
+from tap_netsuite.constants import API_VERSION
+from tap_netsuite.exceptions import TypeNotFound
+from tap_netsuite.instrumentation import IngressTimer
+from tap_netsuite.schema import SchemaBuilder
+from tap_netsuite.search_response import parse_record
+from tap_netsuite.transport import HttpTransport
+
+WSDL_CACHE_PATH = "cache.db"
+WSDL_CACHE_TIMEOUT = 2592000
+
+_lock = threading.Lock()
+_clients = {}
+
+
+class SuiteTalkClient:
+    """A parsed SuiteTalk WSDL and its service proxy for one account."""
+
+    def __init__(
+        self,
+        account,
+        api_version=API_VERSION,
+        cache_wsdl=True,
+        http=None,
+        base_url=None,
+    ):
+        self.account = account.replace("_", "-")
+        self.api_version = api_version
+        self.cache_wsdl = cache_wsdl
+        self.http = http or HttpTransport()
+        self.base_url = base_url or f"https://{self.account}.suitetalk.api.netsuite.com"
+        self.ingress_timer = IngressTimer()
+
+    @property
+    def wsdl_url(self):
+        return f"{self.base_url}/wsdl/v{self.api_version}_0/netsuite.wsdl"
+
+    @property
+    def datacenter_url(self):
+        return f"{self.base_url}/services/NetSuitePort_{self.api_version}"
+
+    @cached_property
+    def client(self):
+        cache = None
+        if self.cache_wsdl:
+            cache = SqliteCache(path=WSDL_CACHE_PATH, timeout=WSDL_CACHE_TIMEOUT)
+        return Client(
+            self.wsdl_url,
+            transport=self.http.zeep_transport(cache),
+            plugins=[self.ingress_timer],
+        )
+
+    @cached_property
+    def service_proxy(self):
+        binding = (
+            f"{{urn:platform_{self.api_version}.webservices.netsuite.com}}"
+            "NetSuiteBinding"
+        )
+        return self.client.create_service(binding, self.datacenter_url)
+
+    @cached_property
+    def schema_builder(self):
+        """JSON schemas of the WSDL types, shared by every stream."""
+        return SchemaBuilder()
+
+    @cached_property
+    def types(self):
+        """Index WSDL types by qualified ("{namespace}Name") and plain name."""
+        index = {}
+        for ns_type in self.client.wsdl.types.types:
+            if not ns_type.name:
+                continue
+            if ns_type.qname is not None:
+                index[ns_type.qname.text] = ns_type
+            # first match wins for plain names, like the former linear scan
+            index.setdefault(ns_type.name, ns_type)
+        return index
+
+    def get_type(self, type_name):
+        try:
+            return self.types[type_name]
+        except KeyError:
+            raise TypeNotFound(f"Type {type_name} not found in WSDL") from None
+
+    def parse_record(self, element):
+        return parse_record(element, self.client.wsdl.types)
+
+    def token_passport(self, config):
+        consumer_key = config["ns_consumer_key"]
+        consumer_secret = config["ns_consumer_secret"]
+        token_key = config["ns_token_key"]
+        token_secret = config["ns_token_secret"]
+        account = config["ns_account"]
+
+        nonce = "".join([str(random.randint(0, 9)) for _ in range(20)])
+        timestamp = str(int(datetime.now().timestamp()))
+        key = f"{consumer_secret}&{token_secret}".encode(encoding="ascii")
+        msg = "&".join([account, consumer_key, token_key, nonce, timestamp])
+        msg = msg.encode(encoding="ascii")
+
+        # compute the signature
+        hashed_value = hmac.new(key, msg=msg, digestmod=hashlib.sha256)
+        dig = hashed_value.digest()
+        signature_value = base64.b64encode(dig).decode()
+
+        passport_signature = self.get_type("TokenPassportSignature")
+        signature = passport_signature(signature_value, algorithm="HMAC-SHA256")
+
+        passport = self.get_type("TokenPassport")
+        return passport(
+            account=account,
+            consumerKey=consumer_key,
+            token=token_key,
+            nonce=nonce,
+            timestamp=timestamp,
+            signature=signature,
+        )
+
+
+def get_client(
+    account, api_version=API_VERSION, cache_wsdl=True, http=None, base_url=None
+):
+    """Return the shared client for an account, parsing the WSDL on first use.
+
+    Clients are shared by callers whose ``http`` transports have the same pool
+    size and timeouts, which then use the transport of the first one. Other
+    settings get a client of their own.
+    """
+    http_settings = http.settings if http else None
+    key = (account.replace("_", "-"), api_version, base_url, http_settings)
+    with _lock:
+        suitetalk = _clients.get(key)
+        if suitetalk is None:
+            suitetalk = SuiteTalkClient(
+                account, api_version, cache_wsdl, http, base_url
+            )
+            # parse while holding the lock so concurrent streams wait for it
+            suitetalk.service_proxy
+            suitetalk.types
+            _clients[key] = suitetalk
+        return suitetalk
+
+
+def clear_clients():
+    with _lock:
+        _clients.clear()
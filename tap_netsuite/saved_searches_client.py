@@ -1,50 +1,114 @@
-import requests
-import xmltodict
 import logging
+from contextlib import contextmanager
+from itertools import chain
+from time import perf_counter
 
+from backports.cached_property import cached_property
+from lxml import etree
 from pendulum import parse
 from singer_sdk import typing as th
 from singer_sdk.streams import Stream
-from netsuitesdk.internal.client import NetSuiteClient
+from zeep import xsd
 
-from tap_netsuite.utils import config_type, get_api_version_from_urn
+from tap_netsuite.execution import OrderedOutput
+from tap_netsuite.instrumentation import StageStats
+from tap_netsuite.pagination import PageSizer, PipelineStats, prefetch
+from tap_netsuite.registry import get_client
+from tap_netsuite.search_response import SearchResponse
+from tap_netsuite.utils import config_type, get_api_version_from_urn, suitetalk_url
 
 
-class SavedSearchesClient(Stream):
+class SavedSearchesClient(OrderedOutput, Stream):
     name = "saved_search"
     ns_type = "TransactionSearchAdvanced"
     ns_urn_type = "sales_2025_1.transactions.webservices.netsuite.com"
+    default_page_size = 1000
 
     def __init__(self, *args, **kwargs):
-        self.ns_client = NetSuiteClient(
-            account=self.config.get("ns_account"),
-            caching=True
-        )
-        self.ns_client.connect_tba(
-            consumer_key=self.config.get("ns_consumer_key"),
-            consumer_secret=self.config.get("ns_consumer_secret"),
-            token_key=self.config.get("ns_token_key"),
-            token_secret=self.config.get("ns_token_secret")
+        # the schema is fetched before Stream.__init__ sets these
+        self._tap = kwargs.get("tap") or args[0]
+        self.logger = self._tap.logger
+        self.suitetalk = get_client(
+            self.config["ns_account"],
+            cache_wsdl=self.config.get("cache_wsdl", True),
+            http=self._tap.http,
+            base_url=suitetalk_url(self.config),
         )
+        self._first_page = None
+        self.prefetch_stats = PipelineStats()
+        self.stages = StageStats()
         self._prepared_schema = self.prepare_schema()
         self._schema = self._prepared_schema
         self._downloaded_items = []
         kwargs["schema"] = self._prepared_schema
         super().__init__(*args, **kwargs)
 
+        replication_key = self.config.get("saved_search_replication_key")
+        if replication_key in self.schema["properties"]:
+            self.replication_key = replication_key
+        elif replication_key:
+            self.logger.warning(
+                f"{replication_key} is not a column of {self.name}, syncing it in full."
+            )
+
+    @property
+    def page_size(self):
+        if self.page_sizer:
+            return self.page_sizer.size
+        return self.default_page_size
+
+    @cached_property
+    def page_sizer(self):
+        """The adaptive page size, carried over from earlier runs, or None."""
+        if not self.config.get("adaptive_page_size"):
+            return None
+        return PageSizer.from_state(
+            self.stream_state.get("page_size"),
+            self.default_page_size,
+            self.config.get("page_size_target_seconds", 30),
+            self.config.get("page_size_target_bytes", 5000000),
+        )
+
+    @property
+    def is_incremental(self):
+        return bool(self.replication_key) and self.replication_method == "INCREMENTAL"
+
+    def get_search_start(self, search_id, bookmarks):
+        start = bookmarks.get(str(search_id)) or self.config.get("start_date")
+        return parse(start) if start else None
+
+    def _increment_stream_state(self, latest_record, *, context=None):
+        # rows with an empty replication column leave the bookmark as is
+        if self.replication_key and not latest_record.get(self.replication_key):
+            return
+        super()._increment_stream_state(latest_record, context=context)
+
     def prepare_schema(self):
         saved_search_ids = self.saved_searches.get(config_type(self.ns_type))
-        if saved_search_ids == None:
+        if saved_search_ids is None:
             return th.PropertiesList().to_dict()
 
         id = saved_search_ids[0]
-        records, _, _ = self.get_all_items_from_saved_searches(
-            saved_search_id=id,
-            saved_search_type=self.ns_type,
-            saved_search_type_urn=self.ns_urn_type,
-            page_size=1000
-        )
-        record = next(self._parse_response_to_json(records,find_max=True))
+        cache_key = f"saved_search_schema:{self.ns_type}:{id}"
+        schema = self._tap.discovery_cache.get(cache_key)
+        if schema is not None:
+            return schema
+
+        with self.request_slot():
+            (
+                search_response,
+                total_pages,
+                search_internal_id,
+            ) = self.get_all_items_from_saved_searches(
+                saved_search_id=id,
+                saved_search_type=self.ns_type,
+                saved_search_type_urn=self.ns_urn_type,
+                page_size=self.default_page_size,
+            )
+            records = list(self._parse_response_to_json(search_response))
+        # replayed by get_records instead of downloading the page again
+        self._first_page = (id, records, total_pages, search_internal_id)
+        record = max(records, key=len)
         fields = []
 
         for k, v in record.items():
@@ -54,126 +118,245 @@ class SavedSearchesClient(Stream):
             try:
                 parse(v)
                 fields.append(th.Property(k, th.DateTimeType))
-            except:
+            except Exception:
                 fields.append(th.Property(k, th.StringType))
 
-        fields.append(th.Property(k, th.CustomType({"type": ["array", "string", "object"]})))
-        return th.PropertiesList(*fields).to_dict()
+        fields.append(
+            th.Property(k, th.CustomType({"type": ["array", "string", "object"]}))
+        )
+        schema = th.PropertiesList(*fields).to_dict()
+        self._tap.discovery_cache.set(cache_key, schema)
+        return schema
 
     def get_records(self, context=None):
         saved_search_ids = self.saved_searches.get(config_type(self.ns_type), [])
+        bookmarks = {}
+        if self.is_incremental:
+            state = self.get_context_state(context)
+            bookmarks = state.setdefault("saved_search_bookmarks", {})
+        if self.page_sizer:
+            # set before the prefetch thread updates it
+            self.stream_state["page_size"] = self.page_sizer.to_state()
 
         for search_id in saved_search_ids:
-            page = 1
-            page_size = 1000
-            total_pages = 2
-            search_internal_id=None
-            saved_search_func = self.get_all_items_from_saved_searches
-
-            while page <= int(total_pages):
-                self.logger.info(f"Getting saved search {search_id} page {page}")
-
-                search_response, total_pages, search_internal_id = saved_search_func(
-                    saved_search_id=search_id,
-                    saved_search_type=self.ns_type,
-                    saved_search_type_urn=self.ns_urn_type,
-                    page=page,
-                    page_size=page_size,
-                    saved_search_internal_id=search_internal_id
-                )
-                for item in self._parse_response_to_json(search_response):
+            modified_after = None
+            high_water = None
+            if self.is_incremental:
+                modified_after = self.get_search_start(search_id, bookmarks)
+
+            # the next pages download while this one is written
+            pages = prefetch(
+                self.search_pages(search_id, modified_after),
+                self.config.get("prefetch_pages", 1),
+                self.prefetch_stats,
+            )
+            emit_seconds = 0.0
+            count = 0
+            for records in pages:
+                for item in records:
+                    value = (
+                        item.get(self.replication_key) if self.is_incremental else None
+                    )
+                    if value and (high_water is None or parse(value) > high_water[0]):
+                        high_water = (parse(value), value)
+                    start = perf_counter()
                     yield item
+                    emit_seconds += perf_counter() - start
+                    count += 1
+            self.stages.add("emit", emit_seconds, count)
 
-                page += 1
-                saved_search_func = self.get_all_items_from_saved_search_w_id
-
-    def _parse_search_response(self, response_xml, searchMoreWithId=False):
-        parsed_response = xmltodict.parse(response_xml)
-        if searchMoreWithId:
-            search_response = parsed_response["soapenv:Envelope"]["soapenv:Body"]["searchMoreWithIdResponse"]
-        else:
-            search_response = parsed_response["soapenv:Envelope"]["soapenv:Body"]["searchResponse"]
-        search_response = search_response["platformCore:searchResult"]
-        return search_response
-
-    def _parse_response_to_json(self, search_response,find_max=False):
-        modified_search_response = search_response["platformCore:searchRowList"]
-        records = modified_search_response["platformCore:searchRow"]
-        type_nickname = records[0]["@xsi:type"].split(":")[0]
-        formatted_records = []  # List to store all formatted records
-
-        for record in records:
-            formatted_record = {}
-
-            # Extract basic information
-            for k, v in record[f"{type_nickname}:basic"].items():
-                if k == "platformCommon:customFieldList":
-                    if isinstance(v["platformCore:customField"], dict):
-                        v["platformCore:customField"] = [v["platformCore:customField"]]
-
-                    formatted_record["customFieldList"] = [
-                        {
-                            k_.replace("@", "").split(":")[-1]: v_ for k_, v_ in n_v.items()
-                        } for n_v in v["platformCore:customField"]
-                    ]
-                    continue
-                if "@" in k:
-                    continue
+            # bookmark only searches that completed
+            if high_water:
+                bookmarks[str(search_id)] = high_water[1]
 
-                field = k.split(":")[1]
-                value = v.get("platformCore:searchValue")
-                if not value:
+        metrics = chain(
+            self.prefetch_stats.metrics(self.name),
+            self.stages.metrics(self.name),
+        )
+        for metric in metrics:
+            self._write_metric_log(metric=metric, extra_tags=None)
+
+    def search_pages(self, search_id, modified_after=None):
+        """Yield the records of each page of a saved search as a list."""
+        page = 1
+        # fixed for the search, later searches use the adapted size
+        page_size = self.page_size
+        total_pages = 2
+        search_internal_id = None
+        saved_search_func = self.get_all_items_from_saved_searches
+        replayed = False
+
+        # the page fetched for the schema had no date criterion
+        first_page = self._first_page
+        if first_page and first_page[0] == search_id and modified_after is None:
+            _, records, total_pages, search_internal_id = first_page
+            self._first_page = None
+            # a restarted search must page the same way as the replayed one
+            page_size = self.default_page_size
+            self.logger.info(f"Replaying saved search {search_id} page {page}")
+            yield records
+            page += 1
+            saved_search_func = self.get_all_items_from_saved_search_w_id
+            replayed = True
+
+        while page <= int(total_pages):
+            self.logger.info(f"Getting saved search {search_id} page {page}")
+
+            received = self._tap.http.stats.received_by_thread()
+            start = perf_counter()
+            # the slot is held until the body has been read
+            with self.request_slot():
+                try:
+                    (
+                        search_response,
+                        total_pages,
+                        search_internal_id,
+                    ) = saved_search_func(
+                        saved_search_id=search_id,
+                        saved_search_type=self.ns_type,
+                        saved_search_type_urn=self.ns_urn_type,
+                        page=page,
+                        page_size=page_size,
+                        saved_search_internal_id=search_internal_id,
+                        modified_after=modified_after,
+                    )
+                except Exception as error:
+                    if not replayed:
+                        if "An unexpected error occurred" in str(error):
+                            self.page_fault()
+                        raise
+                    # the search id of the replayed page may have expired
+                    # since discovery, search again for a fresh one
+                    replayed = False
+                    self.stages.count(retries=1)
+                    self.logger.warning(
+                        f"Restarting saved search {search_id} after page 1"
+                    )
+                    (
+                        search_response,
+                        total_pages,
+                        search_internal_id,
+                    ) = self.get_all_items_from_saved_searches(
+                        saved_search_id=search_id,
+                        saved_search_type=self.ns_type,
+                        saved_search_type_urn=self.ns_urn_type,
+                        page_size=page_size,
+                    )
+                    # its first page was replayed, release the connection
+                    search_response.close()
                     continue
-
-                if isinstance(value, dict):
-                    formatted_record[f"{field}Id"] = value["@internalId"]
-                else:
-                    formatted_record[field] = value
-
-            # Extract additional joins dynamically
-            for key, value in record.items():
-                if key.endswith("Join"):
-                    join_type = key.split(":")[1]  # Extract the join type (e.g., accountJoin)
-                    join_data = value
-                    if join_data:
-                        join_record = {}
-                        for join_key, join_value in join_data.items():
-                            if "@" in join_key:
-                                continue
-
-                            field = join_type+"."+join_key.split(":")[1]
-                            val = join_value.get("platformCore:searchValue")
-                            if isinstance(val,dict) and val:
-                                val_key, val =  next(iter(val.items()))
-                            # join_record[field] = val
-
-                            formatted_record[field] = val
-            if not find_max:
-                yield formatted_record
-            else:
-                formatted_records.append(formatted_record)
-        if find_max:
-            max_record = max(formatted_records, key=lambda x: len(x))
-            yield max_record
-
-
+                replayed = False
+                # rows are parsed as the rest of the body downloads
+                with self.stages.timed("xml_parse"):
+                    records = list(self._parse_response_to_json(search_response))
+            received = self._tap.http.stats.received_by_thread() - received
+            self.stages.count(
+                pages=1, page_records=len(records), bytes_received=received
+            )
+            if self.page_sizer:
+                self.page_sizer.observe(perf_counter() - start, received, len(records))
+                self.stream_state["page_size"] = self.page_sizer.to_state()
+            yield records
+
+            page += 1
+            saved_search_func = self.get_all_items_from_saved_search_w_id
+
+    def page_fault(self):
+        if self.page_sizer:
+            self.page_sizer.fault()
+            self.stream_state["page_size"] = self.page_sizer.to_state()
+
+    def _parse_search_response(self, response):
+        response.raw.decode_content = True
+        with self.stages.timed("xml_parse"):
+            return SearchResponse(response.raw)
+
+    def _parse_response_to_json(self, search_response, find_max=False):
+        return search_response.records(find_max=find_max)
+
+    @contextmanager
+    def request_slot(self):
+        """Hold a request slot while a response is requested and read.
+
+        Responses are streamed, so the slot must be held until the body has
+        been parsed, not only until the headers arrive.
+        """
+        with self._tap.governor.slot() as wait_duration:
+            metric = {
+                "type": "timer",
+                "metric": "concurrency_wait",
+                "value": round(wait_duration, 4),
+                "tags": {"object": self.name},
+            }
+            self._write_metric_log(metric=metric, extra_tags=None)
+            yield
+
+    def post(self, url, **kwargs):
+        # until the headers; the body is read while it is parsed
+        with self.stages.timed("network"):
+            return self._tap.http.post(url, **kwargs)
+
+    def _build_date_criteria(self, saved_search_type_urn, modified_after):
+        """Criteria on the replication column, added to the saved search's own.
+
+        The types are built in the namespaces of the saved search's API
+        version, which the client's WSDL may not be.
+        """
+        if modified_after is None:
+            return ""
+        api_version = get_api_version_from_urn(saved_search_type_urn)
+        core = f"urn:core_{api_version}.platform.webservices.netsuite.com"
+        common = f"urn:common_{api_version}.platform.webservices.netsuite.com"
+        search_date_field = xsd.ComplexType(
+            xsd.Sequence([xsd.Element(f"{{{core}}}searchValue", xsd.DateTime())]),
+            attributes=[xsd.Attribute("operator", xsd.String())],
+        )
+        basic = xsd.ComplexType(
+            xsd.Sequence(
+                [xsd.Element(f"{{{common}}}{self.replication_key}", search_date_field)]
+            )
+        )
+        search = xsd.ComplexType(
+            xsd.Sequence([xsd.Element(f"{{urn:{saved_search_type_urn}}}basic", basic)])
+        )
+        criteria = xsd.Element(f"{{urn:{saved_search_type_urn}}}criteria", search)
+        value = search(
+            basic=basic(
+                **{
+                    self.replication_key: search_date_field(
+                        searchValue=modified_after, operator="onOrAfter"
+                    )
+                }
+            )
+        )
+        parent = etree.Element("searchRecord")
+        criteria.render(parent, value)
+        return etree.tostring(parent[0], encoding="unicode")
 
     def get_all_items_from_saved_search_w_id(
-            self,
-            saved_search_id=1,
-            saved_search_type_urn="sales_2025_1.transactions.webservices.netsuite.com",
-            saved_search_type="TransactionSearchAdvanced",
-            page_size=1000,
-            page=1,
-            saved_search_internal_id=None
-        ):
+        self,
+        saved_search_id=1,
+        saved_search_type_urn="sales_2025_1.transactions.webservices.netsuite.com",
+        saved_search_type="TransactionSearchAdvanced",
+        page_size=1000,
+        page=1,
+        saved_search_internal_id=None,
+        modified_after=None,
+    ):
         api_version = get_api_version_from_urn(saved_search_type_urn)
-        url = f"https://{self.config['ns_account']}.suitetalk.api.netsuite.com/services/NetSuitePort_{api_version}"
-        oauth_creds = self.ns_client._build_soap_headers()
-        oauth_creds = oauth_creds["tokenPassport"]
-        base_request = f"""<soap:Envelope xmlns:platformFaults="urn:faults_{api_version}.platform.webservices.netsuite.com" xmlns:platformMsgs="urn:messages_{api_version}.platform.webservices.netsuite.com" xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:platform_{api_version}.webservices.netsuite.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+        url = f"{suitetalk_url(self.config)}/services/NetSuitePort_{api_version}"
+        with self.stages.timed("token_signing"):
+            oauth_creds = self.suitetalk.token_passport(self.config)
+        signature = oauth_creds["signature"]["_value_1"]
+        base_request = f"""<soap:Envelope
+            xmlns:platformFaults="urn:faults_{api_version}.platform.webservices.netsuite.com"
+            xmlns:platformMsgs="urn:messages_{api_version}.platform.webservices.netsuite.com"
+            xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+            xmlns:tns="urn:platform_{api_version}.webservices.netsuite.com"
+            xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
             <soap:Header>
-                <searchPreferences xmlns:ns7="urn:messages_{api_version}.platform.webservices.netsuite.com">
+                <searchPreferences
+                    xmlns:ns7="urn:messages_{api_version}.platform.webservices.netsuite.com">
                     <pageSize>{page_size}</pageSize>
                 </searchPreferences>
                 <tokenPassport>
@@ -182,7 +365,7 @@ class SavedSearchesClient(Stream):
                     <token>{oauth_creds["token"]}</token>
                     <nonce>{oauth_creds["nonce"]}</nonce>
                     <timestamp>{oauth_creds["timestamp"]}</timestamp>
-                    <signature algorithm="HMAC-SHA256">{oauth_creds["signature"]["_value_1"]}</signature>
+                    <signature algorithm="HMAC-SHA256">{signature}</signature>
                 </tokenPassport>
             </soap:Header>
             <soap:Body>
@@ -194,32 +377,52 @@ class SavedSearchesClient(Stream):
         </soap:Envelope>"""
 
         headers = {"SOAPAction": "searchMoreWithId", "Content-Type": "text/xml"}
-        logging.info(f"Getting saved search for type {self.ns_type}... Getting 1st page with Page Size: {page_size}")
-        res = requests.post(url, headers=headers, data=base_request)
-        if res.status_code >= 400 or 'isSuccess="false"' in res.text:
-            raise Exception(f"Failed to get saved search for type {self.ns_type} - {res.text}")
-
-        search_response = self._parse_search_response(res.text, searchMoreWithId=True)
-        total_pages = search_response["platformCore:totalPages"]
+        logging.info(
+            f"Getting saved search for type {self.ns_type}... "
+            f"Getting 1st page with Page Size: {page_size}"
+        )
+        res = self.post(url, headers=headers, data=base_request, stream=True)
+        if res.status_code >= 400:
+            raise Exception(
+                f"Failed to get saved search for type {self.ns_type} - {res.text}"
+            )
+
+        search_response = self._parse_search_response(res)
+        if not search_response.is_success:
+            search_response.close()
+            raise Exception(
+                f"Failed to get saved search for type {self.ns_type} - "
+                f"{search_response.status_detail}"
+            )
+        total_pages = search_response.total_pages
         return search_response, total_pages, saved_search_internal_id
 
     def get_all_items_from_saved_searches(
-            self,
-            saved_search_id=1,
-            saved_search_type_urn="sales_2025_1.transactions.webservices.netsuite.com",
-            saved_search_type="TransactionSearchAdvanced",
-            page_size=1000,
-            page=1,
-            saved_search_internal_id=None
-        ):
+        self,
+        saved_search_id=1,
+        saved_search_type_urn="sales_2025_1.transactions.webservices.netsuite.com",
+        saved_search_type="TransactionSearchAdvanced",
+        page_size=1000,
+        page=1,
+        saved_search_internal_id=None,
+        modified_after=None,
+    ):
         api_version = get_api_version_from_urn(saved_search_type_urn)
-        url = f"https://{self.config['ns_account']}.suitetalk.api.netsuite.com/services/NetSuitePort_{api_version}"
-        oauth_creds = self.ns_client._build_soap_headers()
-        oauth_creds = oauth_creds["tokenPassport"]
-
-        base_request = f"""<soap:Envelope xmlns:platformFaults="urn:faults_{api_version}.platform.webservices.netsuite.com" xmlns:platformMsgs="urn:messages_{api_version}.platform.webservices.netsuite.com" xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="urn:platform_{api_version}.webservices.netsuite.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+        url = f"{suitetalk_url(self.config)}/services/NetSuitePort_{api_version}"
+        with self.stages.timed("token_signing"):
+            oauth_creds = self.suitetalk.token_passport(self.config)
+        criteria = self._build_date_criteria(saved_search_type_urn, modified_after)
+
+        signature = oauth_creds["signature"]["_value_1"]
+        base_request = f"""<soap:Envelope
+            xmlns:platformFaults="urn:faults_{api_version}.platform.webservices.netsuite.com"
+            xmlns:platformMsgs="urn:messages_{api_version}.platform.webservices.netsuite.com"
+            xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+            xmlns:tns="urn:platform_{api_version}.webservices.netsuite.com"
+            xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
             <soap:Header>
-                <searchPreferences xmlns:ns7="urn:messages_{api_version}.platform.webservices.netsuite.com">
+                <searchPreferences
+                    xmlns:ns7="urn:messages_{api_version}.platform.webservices.netsuite.com">
                     <pageIndex>{page}</pageIndex>
                     <pageSize>{page_size}</pageSize>
                 </searchPreferences>
@@ -229,23 +432,36 @@ class SavedSearchesClient(Stream):
                     <token>{oauth_creds["token"]}</token>
                     <nonce>{oauth_creds["nonce"]}</nonce>
                     <timestamp>{oauth_creds["timestamp"]}</timestamp>
-                    <signature algorithm="HMAC-SHA256">{oauth_creds["signature"]["_value_1"]}</signature>
+                    <signature algorithm="HMAC-SHA256">{signature}</signature>
                 </tokenPassport>
             </soap:Header>
             <soap:Body>
                 <search>
-                    <searchRecord xmlns:q1="urn:{saved_search_type_urn}" xsi:type="q1:{saved_search_type}" savedSearchId="{saved_search_id}" />
+                    <searchRecord xmlns:q1="urn:{saved_search_type_urn}"
+                        xsi:type="q1:{saved_search_type}"
+                        savedSearchId="{saved_search_id}">{criteria}</searchRecord>
                 </search>
             </soap:Body>
         </soap:Envelope>"""
 
         headers = {"SOAPAction": "search", "Content-Type": "text/xml"}
-        logging.info(f"Getting saved search for type {self.ns_type}... Page: {page} and Page Size: {page_size}")
-        res = requests.post(url, headers=headers, data=base_request)
-        if res.status_code >= 400 or 'isSuccess="false"' in res.text:
-            raise Exception(f"Failed to get saved search for type {saved_search_type} - {res.text}")
-
-        search_response = self._parse_search_response(res.text)
-        total_pages = search_response["platformCore:totalPages"]
-        search_id = search_response["platformCore:searchId"]
+        logging.info(
+            f"Getting saved search for type {self.ns_type}... "
+            f"Page: {page} and Page Size: {page_size}"
+        )
+        res = self.post(url, headers=headers, data=base_request, stream=True)
+        if res.status_code >= 400:
+            raise Exception(
+                f"Failed to get saved search for type {saved_search_type} - {res.text}"
+            )
+
+        search_response = self._parse_search_response(res)
+        if not search_response.is_success:
+            search_response.close()
+            raise Exception(
+                f"Failed to get saved search for type {saved_search_type} - "
+                f"{search_response.status_detail}"
+            )
+        total_pages = search_response.total_pages
+        search_id = search_response.search_id
         return search_response, total_pages, search_id
@@ -0,0 +1,129 @@
+"""JSON schemas of SuiteTalk record types, generated from the zeep XSD types.
+
+``SchemaBuilder`` keeps the properties of every complex type it builds, so
+shared types such as ``RecordRef``, ``Address`` and ``CustomFieldList`` are
+generated once per WSDL rather than once per occurrence in every stream. The
+memoized property dicts are shared between the schemas that use them and must
+not be modified. A type reached again while it is being built, such as a
+folder holding folders, becomes an object of unknown properties. Where that
+cut falls depends on the type the build started from, so the types of a
+recursion are built again at every use rather than memoized.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+from singer_sdk import typing as th
+
+# zeep's list of fields sent empty, which the schemas leave out
+IGNORED_FIELDS = {"nullFieldList"}
+
+
+def nullable(type_helper):
+    return th.Property("value", type_helper).to_dict()["value"]
+
+
+SCALAR_TYPES = {
+    str: nullable(th.StringType),
+    bool: nullable(th.BooleanType),
+    int: nullable(th.IntegerType),
+    Decimal: nullable(th.NumberType),
+    datetime: nullable(th.DateTimeType),
+}
+
+CUSTOM_FIELD_REF = th.ObjectType(
+    th.Property("internalId", th.StringType),
+    th.Property("externalId", th.StringType),
+    th.Property("name", th.StringType),
+    th.Property("typeId", th.StringType),
+).type_dict
+CUSTOM_FIELD_VALUE = th.CustomType(
+    {
+        "anyOf": [
+            {"type": ["array", "null"], "items": CUSTOM_FIELD_REF},
+            CUSTOM_FIELD_REF,
+            {"type": ["string", "boolean", "integer", "number"]},
+        ]
+    }
+)
+# the value of a custom field is any of a list, a reference or a scalar
+CUSTOM_FIELD = nullable(
+    th.ArrayType(
+        th.ObjectType(
+            th.Property("internalId", th.StringType),
+            th.Property("scriptId", th.StringType),
+            th.Property("value", CUSTOM_FIELD_VALUE),
+        )
+    )
+)
+
+
+class SchemaBuilder:
+    """Build and memoize the JSON schema properties of zeep XSD types."""
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._properties = {}
+        self._building = set()
+        # recursive types cut off so far
+        self._cuts = 0
+        self.built = self.reused = 0
+
+    @staticmethod
+    def key(xsd_type):
+        return xsd_type.qname or id(xsd_type)
+
+    def properties(self, xsd_type):
+        """Return the properties of ``xsd_type`` by name, in XSD order."""
+        key = self.key(xsd_type)
+        with self._lock:
+            properties = self._properties.get(key)
+            if properties is not None:
+                self.reused += 1
+                return properties
+
+            cuts = self._cuts
+            self._building.add(key)
+            try:
+                properties = {}
+                for name, field in xsd_type.attributes + xsd_type.elements:
+                    if field.name in IGNORED_FIELDS:
+                        continue
+                    schema = self.field_schema(field)
+                    if schema is not None:
+                        properties[name] = schema
+                if xsd_type.name == "CustomFieldList":
+                    properties["customField"] = CUSTOM_FIELD
+            finally:
+                self._building.discard(key)
+            if self._cuts == cuts:
+                self._properties[key] = properties
+            self.built += 1
+            return properties
+
+    def field_schema(self, field):
+        type_cls = field.type.accepted_types[0]
+
+        xsd_type = getattr(type_cls, "_xsd_type", None)
+        if xsd_type is None:
+            schema = SCALAR_TYPES.get(type_cls)
+            if schema is None:
+                self.logger.error(f"Unsupported type {type_cls}")
+            return schema
+
+        key = self.key(xsd_type)
+        if key in self._building:
+            self.logger.debug(f"Recursive type {xsd_type.name}, left untyped.")
+            self._cuts += 1
+            properties = {}
+        else:
+            properties = self.properties(xsd_type)
+        if getattr(field, "accepts_multiple", None):
+            return {
+                "type": ["array", "null"],
+                "items": {"type": "object", "properties": properties},
+            }
+        return {"type": ["object", "null"], "properties": properties}
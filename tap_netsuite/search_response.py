@@ -0,0 +1,304 @@
+"""Incremental parsing of SOAP responses.
+
+Saved-search rows are flattened one ``searchRow`` at a time from an lxml
+``iterparse`` over the response bytes, instead of building a dict of the whole
+envelope with xmltodict and walking it again. Values keep the shape xmltodict
+gives them, so records are the same as those of the whole-document parser.
+
+``RecordListResponse`` does the same for the ``recordList`` of getAll, handing
+each ``record`` element to a parser such as zeep's.
+"""
+
+from lxml import etree
+
+XSI_TYPE = "{http://www.w3.org/2001/XMLSchema-instance}type"
+SEARCH_RESULT_FIELDS = [
+    "totalRecords",
+    "pageSize",
+    "totalPages",
+    "pageIndex",
+    "searchId",
+]
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def tag_name(element):
+    """Return the tag as written in the document, e.g. ``platformCore:status``."""
+    local = local_name(element.tag)
+    return f"{element.prefix}:{local}" if element.prefix else local
+
+
+def child_elements(element):
+    return (child for child in element if isinstance(child.tag, str))
+
+
+def xmltodict_attributes(element, parent_nsmap):
+    """Return the namespaces an element declares and its attributes, by ``@`` key."""
+    result = {}
+    nsmap = element.nsmap
+    for prefix, uri in nsmap.items():
+        if parent_nsmap.get(prefix) != uri:
+            result[f"@xmlns:{prefix}" if prefix else "@xmlns"] = uri
+    for key, value in element.attrib.items():
+        if key[0] == "{":
+            uri, key = key[1:].split("}", 1)
+            prefix = next((p for p, u in nsmap.items() if u == uri and p), None)
+            if prefix:
+                key = f"{prefix}:{key}"
+        result["@" + key] = value
+    return result
+
+
+def to_xmltodict(element, parent_nsmap):
+    """Convert an element the way ``xmltodict.parse`` does without namespaces."""
+    result = xmltodict_attributes(element, parent_nsmap)
+    nsmap = element.nsmap
+    for child in child_elements(element):
+        key = tag_name(child)
+        value = to_xmltodict(child, nsmap)
+        if key not in result:
+            result[key] = value
+        elif isinstance(result[key], list):
+            result[key].append(value)
+        else:
+            result[key] = [result[key], value]
+
+    text = element.text.strip() if element.text else None
+    if text:
+        if not result:
+            return text
+        result["#text"] = text
+    return result or None
+
+
+def search_value(column):
+    """Return the ``platformCore:searchValue`` of a column as xmltodict would."""
+    values = []
+    for child in child_elements(column):
+        if tag_name(child) != "platformCore:searchValue":
+            continue
+        if len(child) or child.attrib:
+            values.append(to_xmltodict(child, column.nsmap))
+        else:
+            values.append(child.text.strip() or None if child.text else None)
+    if len(values) > 1:
+        return values
+    return values[0] if values else None
+
+
+def parse_record(element, schema):
+    """Convert an element to the zeep object of its xsi:type in ``schema``."""
+    prefix, _, name = element.get(XSI_TYPE).rpartition(":")
+    qname = etree.QName(element.nsmap.get(prefix or None), name)
+    return schema.get_type(qname).parse_xmlelement(element, schema)
+
+
+def flatten_row(row, type_nickname):
+    """Flatten a searchRow element into a record of basic and joined columns."""
+    basic = None
+    joins = []
+    for child in child_elements(row):
+        name = tag_name(child)
+        if name == f"{type_nickname}:basic":
+            basic = child
+        elif name.endswith("Join"):
+            joins.append((name, child))
+    if basic is None:
+        raise KeyError(f"{type_nickname}:basic")
+
+    formatted_record = basic_columns(basic)
+    # Extract additional joins dynamically
+    for name, join in joins:
+        join_type = name.split(":")[1]  # Extract the join type (e.g., accountJoin)
+        for column in child_elements(join):
+            field = join_type + "." + tag_name(column).split(":")[1]
+            val = search_value(column)
+            if isinstance(val, dict) and val:
+                _, val = next(iter(val.items()))
+            formatted_record[field] = val
+    return formatted_record
+
+
+def basic_columns(basic):
+    """Return the non-empty columns of a row's ``basic`` element by field."""
+    formatted_record = {}
+    for column in child_elements(basic):
+        name = tag_name(column)
+        if name == "platformCommon:customFieldList":
+            formatted_record["customFieldList"] = [
+                {
+                    k.replace("@", "").split(":")[-1]: v
+                    for k, v in to_xmltodict(custom_field, column.nsmap).items()
+                }
+                for custom_field in child_elements(column)
+            ]
+            continue
+
+        field = name.split(":")[1]
+        value = search_value(column)
+        if not value:
+            continue
+
+        if isinstance(value, dict):
+            formatted_record[f"{field}Id"] = value["@internalId"]
+        else:
+            formatted_record[field] = value
+    return formatted_record
+
+
+class StreamedResponse:
+    """A response parsed from ``_source`` as it is read."""
+
+    def close(self):
+        """Release the connection of a response that isn't read to the end."""
+        close = getattr(self._source, "close", None)
+        if close:
+            close()
+
+
+class SearchResponse(StreamedResponse):
+    """Lazily parsed ``searchResult`` of a search or searchMoreWithId response.
+
+    The result header (``totalPages``, ``searchId``...) is read on creation,
+    which parses up to the first row; ``records`` then flattens and yields one
+    row at a time, freeing each element once it is converted.
+    """
+
+    def __init__(self, source):
+        tags = [f"{{*}}{name}" for name in SEARCH_RESULT_FIELDS]
+        tags += ["{*}status", "{*}statusDetail", "{*}searchRow"]
+        self._source = source
+        self._events = etree.iterparse(
+            source, tag=tags, huge_tree=True, remove_comments=True
+        )
+        self._first_row = None
+        self.header = {}
+        self.is_success = True
+        self.status_detail = {}
+        self._read_header()
+
+    def __getitem__(self, key):
+        return self.header[f"platformCore:{key}"]
+
+    @property
+    def total_pages(self):
+        return int(self.header.get("platformCore:totalPages") or 0)
+
+    @property
+    def search_id(self):
+        return self.header.get("platformCore:searchId")
+
+    def _read_header(self):
+        # the header precedes the rows, so it is complete at the first row
+        for _, element in self._events:
+            name = local_name(element.tag)
+            if name == "searchRow":
+                self._first_row = element
+                return
+            if name == "status":
+                self.is_success = element.get("isSuccess") != "false"
+            elif name == "statusDetail":
+                for detail in child_elements(element):
+                    self.status_detail[local_name(detail.tag)] = detail.text
+            elif name in SEARCH_RESULT_FIELDS:
+                self.header[tag_name(element)] = element.text
+
+    def _rows(self):
+        if self._first_row is not None:
+            yield self._first_row
+            self._first_row = None
+        for _, element in self._events:
+            if local_name(element.tag) == "searchRow":
+                yield element
+
+    def records(self, find_max=False):
+        """Yield the flattened records, or only the widest one if find_max."""
+        type_nickname = None
+        max_record = None
+        for row in self._rows():
+            if type_nickname is None:
+                type_nickname = row.get(XSI_TYPE).split(":")[0]
+            record = flatten_row(row, type_nickname)
+
+            # free rows once converted
+            row.clear()
+            parent = row.getparent()
+            while row.getprevious() is not None:
+                del parent[0]
+
+            if not find_max:
+                yield record
+            elif max_record is None or len(record) > len(max_record):
+                max_record = record
+        if max_record is not None:
+            yield max_record
+
+
+class RecordListResponse(StreamedResponse):
+    """Lazily parsed ``recordList`` result, such as that of getAll.
+
+    The status, ``totalRecords`` and any SOAP fault are read on creation;
+    ``records`` then converts each ``record`` element with ``parse_record``
+    as it is downloaded and frees it, so only one record is held at a time.
+    """
+
+    def __init__(self, source, parse_record):
+        tags = ["{*}status", "{*}statusDetail", "{*}totalRecords", "{*}record"]
+        tags.append("{*}faultstring")
+        self._source = source
+        self._events = etree.iterparse(
+            source, tag=tags, huge_tree=True, remove_comments=True
+        )
+        self._parse_record = parse_record
+        self._first_record = None
+        self.total_records = 0
+        self.is_success = True
+        self.status_detail = {}
+        self.fault = None
+        self._read_header()
+
+    def _is_record(self, element):
+        # nested fields may also be named record
+        parent = element.getparent()
+        return parent is not None and local_name(parent.tag) == "recordList"
+
+    def _read_header(self):
+        for _, element in self._events:
+            name = local_name(element.tag)
+            if name == "record":
+                if self._is_record(element):
+                    self._first_record = element
+                    return
+            elif name == "status":
+                self.is_success = element.get("isSuccess") != "false"
+            elif name == "statusDetail":
+                for detail in child_elements(element):
+                    self.status_detail[local_name(detail.tag)] = detail.text
+            elif name == "totalRecords":
+                self.total_records = int(element.text or 0)
+            elif name == "faultstring":
+                self.fault = element.text
+                self.is_success = False
+
+    def _elements(self):
+        if self._first_record is not None:
+            yield self._first_record
+            self._first_record = None
+        for _, element in self._events:
+            if local_name(element.tag) == "record" and self._is_record(element):
+                yield element
+
+    def records(self):
+        for element in self._elements():
+            record = self._parse_record(element)
+
+            # free records once converted
+            element.clear()
+            parent = element.getparent()
+            while element.getprevious() is not None:
+                del parent[0]
+
+            yield record
@@ -0,0 +1,154 @@
+"""Split large searches into replication-key windows or internal id ranges."""
+
+import threading
+from collections import deque
+from datetime import timedelta
+
+from tap_netsuite.pagination import fetch_pages_in_order
+
+MIN_WINDOW = timedelta(hours=1)
+MAX_WINDOW = timedelta(days=366)
+MIN_ID_RANGE = 1000
+# id bounds are probed from this id up, then narrowed down to 1/64 of the range
+ID_PROBE_START = 1024
+ID_PROBE_BISECTIONS = 6
+# handed to the pool while in-flight windows may still be split
+_PENDING = object()
+
+
+class DateWindowPlanner:
+    """Hand out ``[start, end)`` windows sized to hold about ``target_records``.
+
+    After the first page of each window is fetched, ``observe`` rescales the
+    size of the windows still to be planned from the window's ``totalRecords``
+    and asks for windows holding more than twice the target to be split in two.
+
+    NetSuite compares dates to the minute, so windows meet on whole minutes;
+    two windows meeting inside a minute would both return its records.
+    """
+
+    max_window = MAX_WINDOW
+
+    def __init__(self, start, end, window, target_records, min_window=MIN_WINDOW):
+        self.cursor = start
+        self.end = end
+        self.window = window
+        self.target_records = target_records
+        self.min_window = min_window
+        self._lock = threading.Lock()
+        self._split = deque()
+        self._in_flight = set()
+
+    def next_window(self):
+        with self._lock:
+            if self._split:
+                window = self._split.popleft()
+            elif self.cursor < self.end:
+                end = self.boundary(self.cursor + self.window)
+                window = (self.cursor, min(end, self.end))
+                self.cursor = window[1]
+            else:
+                return None
+            self._in_flight.add(window)
+            return window
+
+    def observe(self, window, total_records):
+        """Adapt the window size; return False if ``window`` was split instead."""
+        start, end = window
+        duration = end - start
+        with self._lock:
+            if total_records:
+                scaled = self.scale(duration, self.target_records / total_records)
+                self.window = min(max(scaled, self.min_window), self.max_window)
+            oversized = total_records > 2 * self.target_records
+            if oversized and duration > 2 * self.min_window:
+                middle = self.boundary(start + self.scale(duration, 0.5))
+                self._in_flight.discard(window)
+                self._split.extendleft([(middle, end), (start, middle)])
+                return False
+            return True
+
+    @staticmethod
+    def scale(duration, ratio):
+        return duration * ratio
+
+    @staticmethod
+    def boundary(point):
+        return point.replace(second=0, microsecond=0)
+
+    @property
+    def in_flight(self):
+        return bool(self._in_flight)
+
+    def complete(self, window):
+        with self._lock:
+            self._in_flight.discard(window)
+
+    def completed_until(self):
+        """Every window before this point has been fully processed."""
+        with self._lock:
+            pending = [w[0] for w in self._in_flight] + [w[0] for w in self._split]
+            return min(pending + [self.cursor])
+
+
+class IdRangePlanner(DateWindowPlanner):
+    """``DateWindowPlanner`` over ``[start, end)`` ranges of internal ids.
+
+    Ids are not spread evenly, as records are created in bursts and deleted,
+    so ranges are resized from the ``totalRecords`` of each range like date
+    windows, and an empty range doubles the size of the next ones.
+    """
+
+    max_window = 2**62
+
+    def __init__(self, start, end, window, target_records, min_window=MIN_ID_RANGE):
+        window = max(int(window), min_window)
+        super().__init__(start, end, window, target_records, min_window)
+
+    @staticmethod
+    def scale(duration, ratio):
+        return max(int(duration * ratio), 1)
+
+    @staticmethod
+    def boundary(point):
+        return point
+
+    def observe(self, window, total_records):
+        if not total_records:
+            with self._lock:
+                self.window = min(self.window * 2, self.max_window)
+        return super().observe(window, total_records)
+
+
+def run_windows(planner, fetch_window, concurrency=1):
+    """Yield ``(window, records)`` for every window the planner hands out.
+
+    ``fetch_window(window)`` returns an iterable of records, or None when the
+    window was split after its first page. With ``concurrency`` above one,
+    windows are fetched by a thread pool and each is materialized in memory
+    before it is yielded, in the order the windows were handed out.
+    """
+
+    def windows():
+        while True:
+            window = planner.next_window()
+            if window is not None:
+                yield window
+            elif concurrency > 1 and planner.in_flight:
+                # in-flight windows may still be split and requeued; this
+                # placeholder is resolved after the earlier windows finish
+                yield _PENDING
+            else:
+                return
+
+    def fetch(window):
+        if window is _PENDING:
+            return None, None
+        records = fetch_window(window)
+        if records is not None and concurrency > 1:
+            records = list(records)
+        return window, records
+
+    for window, records in fetch_pages_in_order(fetch, windows(), concurrency):
+        if records is not None:
+            yield window, records
@@ -1,18 +1,27 @@
 """Netsuite tap class."""
-import requests
-import logging
-
 from typing import List
 from xml.dom import minidom
 
+from backports.cached_property import cached_property
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th
 
 from tap_netsuite.client import NetsuiteStream
-from tap_netsuite.saved_searches_client import SavedSearchesClient
-from tap_netsuite.constants import CUSTOM_SEARCH_FIELDS, SEARCH_ONLY_FIELDS, ADVANCED_SEARCH_TYPES_AND_URNS
+from tap_netsuite.constants import (
+    ADVANCED_SEARCH_TYPES_AND_URNS,
+    API_VERSION,
+    CUSTOM_SEARCH_FIELDS,
+    SEARCH_ONLY_FIELDS,
+)
+from tap_netsuite.discovery_cache import DiscoveryCache
 from tap_netsuite.exceptions import TypeNotFound
-from tap_netsuite.utils import config_type
+from tap_netsuite.execution import MessageWriter, sync_streams
+from tap_netsuite.fanout import TransactionFanOut
+from tap_netsuite.fingerprints import FingerprintStore
+from tap_netsuite.governor import ConcurrencyGovernor
+from tap_netsuite.saved_searches_client import SavedSearchesClient
+from tap_netsuite.transport import HttpTransport
+from tap_netsuite.utils import config_type, suitetalk_url
 
 
 class TapNetsuite(Tap):
@@ -51,6 +60,14 @@ class TapNetsuite(Tap):
             required=True,
             description="The netsuite account code token secret",
         ),
+        th.Property(
+            "suitetalk_url",
+            th.StringType,
+            description=(
+                "Base URL of the SuiteTalk endpoints, such as a local mock "
+                "server; defaults to the account's suitetalk.api.netsuite.com"
+            ),
+        ),
         th.Property(
             "cache_wsdl",
             th.BooleanType,
@@ -62,8 +79,308 @@ class TapNetsuite(Tap):
             th.DateTimeType,
             description="The earliest record date to sync",
         ),
+        th.Property(
+            "saved_search_replication_key",
+            th.StringType,
+            description=(
+                "Date column of the saved searches, such as lastModifiedDate, "
+                "used to sync them incrementally"
+            ),
+        ),
+        th.Property(
+            "page_size",
+            th.IntegerType,
+            description=(
+                "Records per search page, 500 by default and 1000 for saved "
+                "searches. The starting size when adaptive_page_size is set"
+            ),
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Tune the page size of each stream from its response times, "
+                "sizes and faults, and keep it in the state for the next run"
+            ),
+        ),
+        th.Property(
+            "page_size_target_seconds",
+            th.NumberType,
+            default=30,
+            description="Seconds an adaptive page should take to download",
+        ),
+        th.Property(
+            "page_size_target_bytes",
+            th.IntegerType,
+            default=5000000,
+            description="Compressed bytes an adaptive page should hold at most",
+        ),
+        th.Property(
+            "page_concurrency",
+            th.IntegerType,
+            default=1,
+            description="How many searchMoreWithId pages to fetch in parallel",
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Pages downloaded ahead of the page being written; 0 fetches "
+                "pages only when they are needed"
+            ),
+        ),
+        th.Property(
+            "stream_concurrency",
+            th.IntegerType,
+            default=1,
+            description="How many streams to sync in parallel",
+        ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType,
+            default=5,
+            description="Account-wide limit of in-flight SuiteTalk requests",
+        ),
+        th.Property(
+            "concurrency_lock_dir",
+            th.StringType,
+            description=(
+                "Directory of lock files used to share max_concurrent_requests "
+                "between tap processes on the same host"
+            ),
+        ),
+        th.Property(
+            "http_pool_size",
+            th.IntegerType,
+            default=10,
+            description="Keep-alive connections pooled per SuiteTalk host",
+        ),
+        th.Property(
+            "http_connect_timeout",
+            th.NumberType,
+            default=30,
+            description="Seconds to wait for a SuiteTalk connection",
+        ),
+        th.Property(
+            "http_read_timeout",
+            th.NumberType,
+            default=300,
+            description="Seconds to wait for SuiteTalk response data",
+        ),
+        th.Property(
+            "field_projection",
+            th.BooleanType,
+            default=True,
+            description=(
+                "Narrow searches to the properties selected in the catalog, "
+                "leaving out sublists or using search columns"
+            ),
+        ),
+        th.Property(
+            "search_columns_max",
+            th.IntegerType,
+            default=25,
+            description=(
+                "Largest selection fetched with advanced search columns "
+                "instead of whole records"
+            ),
+        ),
+        th.Property(
+            "transaction_fanout",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Run one transaction search per sync and route its records to "
+                "the per-type transaction streams"
+            ),
+        ),
+        th.Property(
+            "date_window_days",
+            th.IntegerType,
+            description=(
+                "Split incremental searches into replication key windows of "
+                "this many days; windows then adapt to the record density"
+            ),
+        ),
+        th.Property(
+            "window_target_records",
+            th.IntegerType,
+            default=10000,
+            description="Number of records each date window should hold",
+        ),
+        th.Property(
+            "window_concurrency",
+            th.IntegerType,
+            default=1,
+            description="How many date windows to search in parallel",
+        ),
+        th.Property(
+            "id_range_sharding",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Split searches that are not filtered by date, such as full "
+                "backfills, into internal id ranges"
+            ),
+        ),
+        th.Property(
+            "id_range_target_records",
+            th.IntegerType,
+            default=10000,
+            description="Number of records each internal id range should hold",
+        ),
+        th.Property(
+            "id_range_concurrency",
+            th.IntegerType,
+            default=1,
+            description="How many internal id ranges to search in parallel",
+        ),
+        th.Property(
+            "boundary_dedup",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Skip the records of the bookmark's minute that the previous "
+                "run already emitted"
+            ),
+        ),
+        th.Property(
+            "boundary_dedup_max_records",
+            th.IntegerType,
+            default=10000,
+            description="Most records of the bookmark's minute kept in state",
+        ),
+        th.Property(
+            "fingerprint_store",
+            th.StringType,
+            description=(
+                "SQLite file of record hashes; getAll streams and streams "
+                "without a replication key then only emit changed records"
+            ),
+        ),
+        th.Property(
+            "fingerprint_deletes",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Emit a record with _sdc_deleted_at for the ids no longer "
+                "returned by fingerprinted streams"
+            ),
+        ),
+        th.Property(
+            "discovery_cache",
+            th.BooleanType,
+            default=True,
+            description="If discovered record types and schemas should be cached",
+        ),
+        th.Property(
+            "discovery_cache_dir",
+            th.StringType,
+            default=".discovery_cache",
+            description="Directory for the discovery cache files",
+        ),
+        th.Property(
+            "discovery_cache_ttl",
+            th.IntegerType,
+            default=2592000,
+            description="Seconds before the discovery cache is rebuilt",
+        ),
+        th.Property(
+            "refresh_discovery_cache",
+            th.BooleanType,
+            default=False,
+            description="Discard the discovery cache and rebuild it on this run",
+        ),
     ).to_dict()
 
+    # set while streams sync concurrently
+    message_writer = None
+
+    @cached_property
+    def governor(self):
+        account = self.config["ns_account"].replace("_", "-").lower()
+        return ConcurrencyGovernor(
+            self.config.get("max_concurrent_requests", 5),
+            account,
+            lock_dir=self.config.get("concurrency_lock_dir"),
+            logger=self.logger,
+        )
+
+    @cached_property
+    def http(self):
+        return HttpTransport(
+            pool_size=max(
+                self.config.get("http_pool_size", 10),
+                self.config.get("max_concurrent_requests", 5),
+            ),
+            connect_timeout=self.config.get("http_connect_timeout", 30),
+            read_timeout=self.config.get("http_read_timeout", 300),
+        )
+
+    @cached_property
+    def transaction_fanout(self):
+        return TransactionFanOut(self)
+
+    @cached_property
+    def fingerprints(self):
+        path = self.config.get("fingerprint_store")
+        return FingerprintStore(path) if path else None
+
+    @cached_property
+    def discovery_cache(self):
+        account = self.config["ns_account"].replace("_", "-").lower()
+        cache = DiscoveryCache(
+            self.config.get("discovery_cache_dir", ".discovery_cache"),
+            f"{account}_{API_VERSION}",
+            self.config.get("discovery_cache_ttl", 2592000),
+            enabled=self.config.get("discovery_cache", True),
+            logger=self.logger,
+        )
+        if self.config.get("refresh_discovery_cache"):
+            cache.invalidate()
+        return cache
+
+    def sync_all(self) -> None:
+        try:
+            self.sync_streams()
+        finally:
+            self.write_http_metrics()
+
+    def sync_streams(self):
+        concurrency = self.config.get("stream_concurrency", 1)
+        if concurrency <= 1:
+            super().sync_all()
+            return
+
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        streams = [
+            stream
+            for stream in self.streams.values()
+            if (stream.selected or stream.has_selected_descendents)
+            and not stream.parent_stream_type
+        ]
+        # built once here rather than by the first stream threads to use them
+        self.governor, self.http, self.transaction_fanout, self.fingerprints
+        self.logger.info(f"Syncing {len(streams)} streams, {concurrency} at a time.")
+        with MessageWriter() as writer:
+            self.message_writer = writer
+            try:
+                sync_streams(streams, concurrency)
+            finally:
+                self.message_writer = None
+
+    def write_http_metrics(self):
+        """Log the HTTP totals of the run, shared by all of its streams."""
+        level = self.config.get("metrics_log_level", "INFO").upper()
+        if level == "NONE":
+            return
+        log = self.logger.debug if level == "DEBUG" else self.logger.info
+        for metric in self.http.metrics():
+            log(f"INFO METRIC: {metric}")
+
     def extract_xml_types(self, xml: str, record_type: str) -> List[str]:
         types = []
         type_records = None
@@ -101,20 +418,33 @@ class TapNetsuite(Tap):
 
         return saved_searches
 
-    def discover_streams(self) -> List[Stream]:
-        """Return a list of discovered streams."""
+    def get_core_types(self):
+        core_types = self.discovery_cache.get("record_types")
+        if core_types is not None:
+            return core_types
 
-        account = self.config["ns_account"].replace("_", "-")
         url = (
-            f"https://{account}.suitetalk.api.netsuite.com/"
-            "xsd/platform/v2022_2_0/coreTypes.xsd"
+            f"{suitetalk_url(self.config)}/"
+            f"xsd/platform/v{API_VERSION}_0/coreTypes.xsd"
         )
-        response = requests.get(url)
+        response = self.http.get(url)
+        response.raise_for_status()
         types_xml = minidom.parseString(response.text)
 
         core_types = []
         core_types.extend(self.extract_xml_types(types_xml, "GetAllRecordType"))
         core_types.extend(self.extract_xml_types(types_xml, "SearchRecordType"))
+        if core_types:
+            self.discovery_cache.set("record_types", core_types)
+        else:
+            # cached, it would hide every stream until the cache expires
+            self.logger.warning(f"No record types found in {url}, not caching.")
+        return core_types
+
+    def discover_streams(self) -> List[Stream]:
+        """Return a list of discovered streams."""
+
+        core_types = list(self.get_core_types())
 
         for search_type, types in CUSTOM_SEARCH_FIELDS.items():
             for type_name in types:
@@ -135,15 +465,18 @@ class TapNetsuite(Tap):
         saved_searches = self.get_saved_searches_dict()
         for type_name, urn in ADVANCED_SEARCH_TYPES_AND_URNS.items():
             if saved_searches.get(config_type(type_name)):
-                yield type(type_name, (SavedSearchesClient,), {
-                    "name": type_name,
-                    "_config": self.config,
-                    "ns_type": type_name,
-                    "ns_urn_type": urn,
-                    "saved_searches": saved_searches
-                })(
-                    tap=self
-                )
+                yield type(
+                    type_name,
+                    (SavedSearchesClient,),
+                    {
+                        "name": type_name,
+                        "_config": self.config,
+                        "ns_type": type_name,
+                        "ns_urn_type": urn,
+                        "saved_searches": saved_searches,
+                    },
+                )(tap=self)
+        self.discovery_cache.save()
 
 
 if __name__ == "__main__":
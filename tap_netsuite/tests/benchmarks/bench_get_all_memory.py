@@ -0,0 +1,68 @@
+"""getAll memory benchmark: whole-response zeep objects vs streamed records.
+
+Scales the recorded Currency or State getAll response up to N records and
+reports records/s and peak RSS of converting every record, each run in its own
+process reading the response from disk. ``whole`` parses the envelope and
+keeps the record list, as zeep does; ``streamed`` is ``RecordListResponse``.
+
+    python -m tap_netsuite.tests.benchmarks.bench_get_all_memory --records 200000
+"""
+
+import argparse
+import resource
+import tempfile
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from tap_netsuite.tests.synthetic import (
+    get_all_response,
+    load_get_all_schema,
+    parse_whole,
+)
+
+
+def write_response(type_name, records, path):
+    Path(path).write_bytes(get_all_response(type_name, records))
+
+
+def run(name, path):
+    from tap_netsuite.search_response import RecordListResponse, parse_record
+
+    schema = load_get_all_schema()
+    start = perf_counter()
+    if name == "whole":
+        records = sum(1 for _ in parse_whole(Path(path).read_bytes(), schema))
+    else:
+        with open(path, "rb") as response:
+            response = RecordListResponse(
+                response, lambda element: parse_record(element, schema)
+            )
+            records = sum(1 for _ in response.records())
+    elapsed = perf_counter() - start
+    return records, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--type", choices=["Currency", "State"], default="Currency")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".xml") as response:
+        # built in another process, as peak RSS is inherited by spawned ones
+        with get_context("spawn").Pool(1) as pool:
+            pool.apply(write_response, (args.type, args.records, response.name))
+        print(f"{args.type}: {Path(response.name).stat().st_size / 1e6:.1f}MB response")
+
+        for name in ["whole", "streamed"]:
+            with get_context("spawn").Pool(1) as pool:
+                records, elapsed, rss = pool.apply(run, (name, response.name))
+            print(
+                f"{name}: {records / elapsed:,.0f} records/s, "
+                f"peak RSS {rss / 1024:.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Per-request header construction benchmark.
+
+Times token passport signing plus search preferences with the former linear
+scan over ``wsdl.types.types`` and with the type index.
+
+    python -m tap_netsuite.tests.benchmarks.bench_headers ACCOUNT -n 1000
+"""
+
+import argparse
+from time import perf_counter
+
+from tap_netsuite.registry import get_client
+
+HEADER_TYPES = ["TokenPassportSignature", "TokenPassport", "SearchPreferences"]
+
+
+def linear_scan(suitetalk, type_name):
+    for ns_type in suitetalk.client.wsdl.types.types:
+        if ns_type.name and ns_type.name == type_name:
+            return ns_type
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("account")
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    suitetalk = get_client(args.account)
+    print(f"{len(suitetalk.client.wsdl.types.types)} types in WSDL")
+    lookups = [
+        ("linear_scan", lambda name: linear_scan(suitetalk, name)),
+        ("index", suitetalk.get_type),
+    ]
+    for name, lookup in lookups:
+        start = perf_counter()
+        for _ in range(args.requests):
+            for type_name in HEADER_TYPES:
+                lookup(type_name)
+        elapsed = perf_counter() - start
+        print(f"{name}: {elapsed / args.requests * 1e6:.1f}us per request")
+
+
+if __name__ == "__main__":
+    main()
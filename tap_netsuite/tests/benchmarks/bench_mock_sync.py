@@ -0,0 +1,129 @@
+"""End-to-end sync benchmark against the local mock SuiteTalk server.
+
+Runs the tap on the Customer search stream, the Currency and State getAll
+streams, a saved search and all of them together, served by
+``MockSuiteTalk``, and reports the startup time to the first record,
+records/s, requests/s and peak RSS for each. Every run is a fresh process, so
+the WSDL is parsed again and peak RSS is that of the run; the median of
+``--repeat`` runs is printed. ``--stream-concurrency`` syncs the streams of a
+scenario in parallel.
+
+    python -m tap_netsuite.tests.benchmarks.bench_mock_sync --records 20000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import statistics
+import tempfile
+from multiprocessing import get_context
+from time import perf_counter
+
+from tap_netsuite.tests.mock_suitetalk import MockSuiteTalk, mock_config, select_streams
+
+SCENARIOS = {
+    "search": ["Customer"],
+    "get_all": ["Currency", "State"],
+    "saved_search": ["TransactionSearchAdvanced"],
+}
+SCENARIOS["all"] = [name for streams in SCENARIOS.values() for name in streams]
+
+
+class RecordCounter(io.TextIOBase):
+    """Stand-in for stdout counting the RECORD messages written to it."""
+
+    def __init__(self):
+        self.records = 0
+        self.first_record = None
+
+    def write(self, text):
+        records = text.count('{"type": "RECORD"')
+        if records and self.first_record is None:
+            self.first_record = perf_counter()
+        self.records += records
+        return len(text)
+
+
+def quiet():
+    """Send the logs of this process to /dev/null."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+    os.close(devnull)
+
+
+def discover(config):
+    from tap_netsuite.tap import TapNetsuite
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return TapNetsuite(config=config).catalog_dict
+
+
+def sync(config, catalog, streams=None, state=None):
+    """Run a sync; return the seconds to the first record and in total, the
+    number of records and peak RSS."""
+    from tap_netsuite.tap import TapNetsuite
+
+    if streams is not None:
+        catalog = select_streams(catalog, streams)
+    counter = RecordCounter()
+    start = perf_counter()
+    with contextlib.redirect_stdout(counter):
+        TapNetsuite(config=config, catalog=catalog, state=state).sync_all()
+    elapsed = perf_counter() - start
+    startup = (counter.first_record or perf_counter()) - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return startup, elapsed, counter.records, rss
+
+
+def in_process(func, *args):
+    # peak RSS is inherited by spawned processes, so the parent stays small
+    with get_context("spawn").Pool(1, initializer=quiet) as pool:
+        return pool.apply(func, args)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--get-all-records", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--stream-concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", choices=list(SCENARIOS), action="append")
+    args = parser.parse_args()
+
+    mock = MockSuiteTalk(
+        records=args.records,
+        get_all_records=args.get_all_records,
+        latency=args.latency,
+    )
+    with mock, tempfile.TemporaryDirectory() as cache_dir:
+        config = mock_config(
+            mock.url,
+            cache_dir,
+            page_size=args.page_size,
+            stream_concurrency=args.stream_concurrency,
+        )
+        catalog = in_process(discover, config)
+
+        for name in args.scenario or list(SCENARIOS):
+            runs = []
+            for _ in range(args.repeat):
+                requests = sum(mock.requests.values())
+                startup, elapsed, records, rss = in_process(
+                    sync, config, catalog, SCENARIOS[name]
+                )
+                requests = sum(mock.requests.values()) - requests
+                runs.append((startup, records / elapsed, requests / elapsed, rss))
+
+            startup, records, requests, rss = (statistics.median(r) for r in zip(*runs))
+            print(
+                f"{name}: startup {startup:.2f}s, {records:,.0f} records/s, "
+                f"{requests:,.1f} requests/s, peak RSS {rss / 1024:.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Saved-search response parsing benchmark: xmltodict vs incremental lxml.
+
+Builds a response of N rows from the recorded fixture (or takes a recorded
+response) and reports rows/s and peak RSS for each parser, each run in its
+own process reading the response from disk.
+
+    python -m tap_netsuite.tests.benchmarks.bench_saved_search_parse --rows 1000
+"""
+
+import argparse
+import resource
+import tempfile
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from tap_netsuite.tests.synthetic import parse_xmltodict, saved_search_response
+
+
+def run(name, path):
+    start = perf_counter()
+    if name == "xmltodict":
+        rows = sum(1 for _ in parse_xmltodict(Path(path).read_bytes()))
+    else:
+        from tap_netsuite.search_response import SearchResponse
+
+        with open(path, "rb") as response:
+            rows = sum(1 for _ in SearchResponse(response).records())
+    elapsed = perf_counter() - start
+    return rows, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--response", help="recorded response file to parse")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".xml") as response:
+        if args.response:
+            path = args.response
+        else:
+            response.write(saved_search_response(args.rows))
+            response.flush()
+            path = response.name
+        print(f"{Path(path).stat().st_size / 1e6:.1f}MB response")
+
+        for name in ["xmltodict", "incremental"]:
+            with get_context("spawn").Pool(1) as pool:
+                rows, elapsed, rss = pool.apply(run, (name, path))
+            print(f"{name}: {rows / elapsed:,.0f} rows/s, peak RSS {rss / 1024:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
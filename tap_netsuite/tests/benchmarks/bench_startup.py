@@ -0,0 +1,43 @@
+"""Startup benchmark for stream construction against a SuiteTalk WSDL.
+
+Compares the old behaviour, where every ``client`` access parsed the WSDL
+again, with the shared client registry.
+
+    python -m tap_netsuite.tests.benchmarks.bench_startup ACCOUNT --streams 20
+"""
+
+import argparse
+from time import perf_counter
+
+from tap_netsuite.registry import SuiteTalkClient, clear_clients, get_client
+
+# ns_type, search_type and service_proxy each used to build a new client
+ACCESSES_PER_STREAM = 3
+
+
+def per_access(account, streams, cache_wsdl):
+    for _ in range(streams * ACCESSES_PER_STREAM):
+        SuiteTalkClient(account, cache_wsdl=cache_wsdl).client
+
+
+def shared(account, streams, cache_wsdl):
+    clear_clients()
+    for _ in range(streams * ACCESSES_PER_STREAM):
+        get_client(account, cache_wsdl=cache_wsdl).client
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("account")
+    parser.add_argument("--streams", type=int, default=10)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    for name, func in [("per_access", per_access), ("shared", shared)]:
+        start = perf_counter()
+        func(args.account, args.streams, not args.no_cache)
+        print(f"{name}: {perf_counter() - start:.2f}s for {args.streams} streams")
+
+
+if __name__ == "__main__":
+    main()
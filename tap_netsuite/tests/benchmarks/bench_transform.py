@@ -0,0 +1,44 @@
+"""Record transformation benchmark: singer Transformer vs compiled schema.
+
+Transforms wide synthetic transaction records, with a nested itemList and
+customFieldList, through both transformers and checks the results match.
+
+    python -m tap_netsuite.tests.benchmarks.bench_transform -n 2000
+"""
+
+import argparse
+from copy import deepcopy
+from time import perf_counter
+
+from singer import Transformer
+
+from tap_netsuite.tests.synthetic import transaction, transaction_schema
+from tap_netsuite.transform import CompiledTransformer, datetime_pre_hook
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--records", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=10)
+    args = parser.parse_args()
+
+    schema = transaction_schema()
+    records = [transaction(i, args.lines) for i in range(args.records)]
+
+    start = perf_counter()
+    with Transformer(pre_hook=datetime_pre_hook) as transformer:
+        expected = [transformer.transform(r, deepcopy(schema)) for r in records]
+    generic = perf_counter() - start
+
+    start = perf_counter()
+    with CompiledTransformer(schema) as transformer:
+        compiled = [transformer.transform(r) for r in records]
+    elapsed = perf_counter() - start
+
+    assert compiled == expected
+    for name, seconds in [("singer Transformer", generic), ("compiled", elapsed)]:
+        print(f"{name}: {args.records / seconds:,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Fixtures running the tap against the mock SuiteTalk server."""
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from tap_netsuite.tap import TapNetsuite
+from tap_netsuite.tests.mock_suitetalk import MockSuiteTalk, select_streams
+
+
+@pytest.fixture
+def mock():
+    """25 records on pages of 10, and 7 getAll records."""
+    with MockSuiteTalk(records=25, get_all_records=7, page_size=10) as mock:
+        yield mock
+
+
+@pytest.fixture(scope="session")
+def selected_tap():
+    """Build a tap syncing ``streams`` of the discovered catalog."""
+
+    def selected_tap(config, streams, state=None, properties=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            catalog = TapNetsuite(config=config).catalog_dict
+        catalog = select_streams(catalog, streams, properties)
+        tap = TapNetsuite(config=config, catalog=catalog, state=state)
+        # builds the streams, saved searches search for their schema
+        tap.streams
+        return tap
+
+    return selected_tap
+
+
+@pytest.fixture(scope="session")
+def sync():
+    """Sync a tap, returning the messages it wrote."""
+
+    def sync(tap):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            tap.sync_all()
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    return sync
+
+
+@pytest.fixture(scope="session")
+def run_tap(selected_tap, sync):
+    """Sync ``streams`` with ``config``, returning the messages written."""
+
+    def run_tap(config, streams, state=None):
+        return sync(selected_tap(config, streams, state))
+
+    return run_tap
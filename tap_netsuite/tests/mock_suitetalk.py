@@ -0,0 +1,394 @@
+"""A local SuiteTalk SOAP endpoint serving synthetic records.
+
+Serves the trimmed WSDL and coreTypes.xsd in ``fixtures/mock_suitetalk`` and
+answers ``search``, ``searchMoreWithId``, ``getAll`` and saved-search requests,
+so the tap can run end to end without an account:
+
+    with MockSuiteTalk(records=5000, latency=0.05) as mock:
+        config["suitetalk_url"] = mock.url
+
+Customer searches return ``records`` records modified a minute apart from
+``START``, honouring ``onOrAfter`` and ``within`` lastModifiedDate criteria
+and ``greaterThanOrEqualTo`` and ``between`` internalIdNumber ones;
+getAll returns ``get_all_records`` Currency or State records and saved
+searches ``records`` rows of the recorded saved-search fixture, modified
+as the customers and honouring the same lastModifiedDate criteria. Customer
+advanced searches return rows of the requested columns. Pages hold the
+requested ``pageSize`` unless ``page_size`` is given.
+"""
+
+import gzip
+import itertools
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import sleep
+
+from lxml import etree
+
+from tap_netsuite.search_response import local_name
+
+FIXTURES = Path(__file__).parent / "fixtures"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+CORE = "urn:core_2022_2.platform.webservices.netsuite.com"
+MESSAGES = "urn:messages_2022_2.platform.webservices.netsuite.com"
+
+ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" \
+xmlns:xsd="http://www.w3.org/2001/XMLSchema" \
+xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<soapenv:Header><platformMsgs:documentInfo xmlns:platformMsgs="{messages}">\
+<platformMsgs:nsId>MOCK</platformMsgs:nsId></platformMsgs:documentInfo></soapenv:Header>
+<soapenv:Body><{operation}Response xmlns="{messages}">\
+<platformCore:{result} xmlns:platformCore="{core}">{content}</platformCore:{result}>\
+</{operation}Response></soapenv:Body>
+</soapenv:Envelope>"""
+
+CUSTOMER = (
+    '<platformCore:record internalId="{id}" xsi:type="listRel:Customer" '
+    'xmlns:listRel="urn:relationships_2022_2.lists.webservices.netsuite.com">'
+    "<listRel:entityId>CUST{id}</listRel:entityId>"
+    "<listRel:companyName>Customer {id} Inc.</listRel:companyName>"
+    "<listRel:email>billing{id}@example.com</listRel:email>"
+    "<listRel:isInactive>false</listRel:isInactive>"
+    "<listRel:balance>{balance}</listRel:balance>"
+    '<listRel:subsidiary internalId="1"><platformCore:name>Parent Company'
+    "</platformCore:name></listRel:subsidiary>"
+    "<listRel:dateCreated>2023-06-01T08:00:00.000-07:00</listRel:dateCreated>"
+    "<listRel:lastModifiedDate>{modified}</listRel:lastModifiedDate>"
+    "</platformCore:record>"
+)
+# the search columns of a Customer, as the values of its record above
+CUSTOMER_COLUMNS = {
+    "internalId": '<platformCore:searchValue internalId="{id}"/>',
+    "entityId": "<platformCore:searchValue>CUST{id}</platformCore:searchValue>",
+    "companyName": (
+        "<platformCore:searchValue>Customer {id} Inc.</platformCore:searchValue>"
+    ),
+    "email": (
+        "<platformCore:searchValue>billing{id}@example.com</platformCore:searchValue>"
+    ),
+    "isInactive": "<platformCore:searchValue>false</platformCore:searchValue>",
+    "balance": "<platformCore:searchValue>{balance}</platformCore:searchValue>",
+    "subsidiary": '<platformCore:searchValue internalId="1"/>',
+    "dateCreated": (
+        "<platformCore:searchValue>2023-06-01T08:00:00.000-07:00"
+        "</platformCore:searchValue>"
+    ),
+    "lastModifiedDate": (
+        "<platformCore:searchValue>{modified}</platformCore:searchValue>"
+    ),
+}
+CUSTOMER_ROW = (
+    '<platformCore:searchRow xsi:type="listRel:CustomerSearchRow" '
+    'xmlns:listRel="urn:relationships_2022_2.lists.webservices.netsuite.com" '
+    'xmlns:platformCommon="urn:common_2022_2.platform.webservices.netsuite.com">'
+    '<listRel:basic xsi:type="platformCommon:CustomerSearchRowBasic">{columns}'
+    "</listRel:basic></platformCore:searchRow>"
+)
+RECORD = re.compile(r"<platformCore:record .*?</platformCore:record>", re.S)
+ROW = re.compile(r"<platformCore:searchRow .*?</platformCore:searchRow>", re.S)
+ERROR_PAGE = b"<html><body>Service Unavailable</body></html>"
+
+
+def fixture_template(path, pattern):
+    match = pattern.search(path.read_text())
+    return match.group(0)
+
+
+class MockSuiteTalk:
+    def __init__(self, records=1000, get_all_records=250, page_size=None, latency=0.0):
+        self.records = records
+        self.get_all_records = get_all_records
+        self.page_size = page_size
+        self.latency = latency
+        self.requests = dict.fromkeys(["search", "searchMoreWithId", "getAll"], 0)
+        self._lock = threading.Lock()
+        self._search_ids = itertools.count(1)
+        self._searches = {}
+        self._errors = []
+        self._get_all = {
+            name: fixture_template(FIXTURES / f"get_all_{name}_response.xml", RECORD)
+            for name in ["currency", "state"]
+        }
+        row = fixture_template(FIXTURES / "saved_search_response.xml", ROW)
+        row = row.replace("INV-1", "INV-{id}")
+        self._row = row.replace("2024-05-01T10:00:00.000-07:00", "{modified}")
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self, port=0):
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self.handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                name = self.path.rsplit("/", 1)[-1]
+                if name not in ("netsuite.wsdl", "coreTypes.xsd"):
+                    self.reply(b"Not found", status=404)
+                    return
+                error = mock.take_error(name)
+                if error is None:
+                    self.reply((FIXTURES / "mock_suitetalk" / name).read_bytes())
+                else:
+                    self.reply(ERROR_PAGE, status=error, content_type="text/html")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                operation = self.headers.get("SOAPAction", "").strip('"')
+                sleep(mock.latency)
+                response = mock.respond(operation, etree.fromstring(body)).encode()
+                error = mock.take_error(operation)
+                if error is None:
+                    self.reply(response)
+                elif error == "truncate":
+                    # the connection drops halfway through the body
+                    self.reply(response, truncate=True)
+                    self.close_connection = True
+                else:
+                    self.reply(ERROR_PAGE, status=error, content_type="text/html")
+
+            def reply(self, body, status=200, content_type="text/xml", truncate=False):
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body[: len(body) // 2] if truncate else body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def fail(self, operation, error):
+        """Answer the next ``operation`` request with an HTML page of status
+        ``error``, or with half its body if ``error`` is "truncate".
+
+        ``operation`` may also name a served file, e.g. "coreTypes.xsd", which
+        only fails with a status."""
+        with self._lock:
+            self._errors.append((operation, error))
+
+    def take_error(self, operation):
+        with self._lock:
+            for index, (failed_operation, error) in enumerate(self._errors):
+                if failed_operation == operation:
+                    del self._errors[index]
+                    return error
+        return None
+
+    def respond(self, operation, envelope):
+        with self._lock:
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+        fields = {
+            local_name(e.tag): e for e in envelope.iter() if isinstance(e.tag, str)
+        }
+        if operation == "getAll":
+            return self.get_all(fields["record"].get("recordType"))
+        if operation == "search":
+            return self.search(fields)
+        if operation == "searchMoreWithId":
+            # saved searches send their search id as savedSearchId
+            search_id = fields.get("searchId", fields.get("savedSearchId")).text
+            return self.search_more(search_id, int(fields["pageIndex"].text))
+        return self.failure(
+            "search", "searchResult", "UNSUPPORTED_OPERATION", operation
+        )
+
+    def envelope(self, operation, result, content):
+        return ENVELOPE.format(
+            operation=operation,
+            result=result,
+            content=content,
+            messages=MESSAGES,
+            core=CORE,
+        )
+
+    def failure(self, operation, result, code, message):
+        status = (
+            '<platformCore:status isSuccess="false">'
+            '<platformCore:statusDetail type="ERROR">'
+            f"<platformCore:code>{code}</platformCore:code>"
+            f"<platformCore:message>{message}</platformCore:message>"
+            "</platformCore:statusDetail></platformCore:status>"
+        )
+        return self.envelope(operation, result, status)
+
+    def get_all(self, record_type):
+        template = self._get_all.get(record_type)
+        if template is None:
+            return self.failure(
+                "getAll", "getAllResult", "INVALID_RECORD_TYPE", record_type
+            )
+        records = "".join(
+            re.sub(r'internalId="-?\d+"', f'internalId="{i}"', template, count=1)
+            for i in range(1, self.get_all_records + 1)
+        )
+        total = self.get_all_records
+        content = (
+            '<platformCore:status isSuccess="true"/>'
+            f"<platformCore:totalRecords>{total}</platformCore:totalRecords>"
+            f"<platformCore:recordList>{records}</platformCore:recordList>"
+        )
+        return self.envelope("getAll", "getAllResult", content)
+
+    def search(self, fields):
+        page_size = self.page_size
+        if page_size is None and "pageSize" in fields:
+            page_size = int(fields["pageSize"].text)
+        page_size = page_size or 1000
+
+        saved = "searchRecord" in fields and fields["searchRecord"].get("savedSearchId")
+        columns = None
+        if "columns" in fields and not saved:
+            # advanced searches return rows of the requested columns
+            basic = fields["columns"][0]
+            columns = [local_name(e.tag) for e in basic if isinstance(e.tag, str)]
+            criteria = fields["criteria"]
+            fields = {
+                local_name(e.tag): e for e in criteria.iter() if isinstance(e.tag, str)
+            }
+
+        start, end = 0, self.records
+        criterion = fields.get("lastModifiedDate")
+        if criterion is not None:
+            values = [
+                datetime.fromisoformat(e.text)
+                for e in criterion
+                if local_name(e.tag) in ("searchValue", "searchValue2")
+            ]
+            start = self.record_index(values[0])
+            if criterion.get("operator") == "within":
+                end = min(self.record_index(values[1] + timedelta(seconds=1)), end)
+        criterion = fields.get("internalIdNumber")
+        if criterion is not None and not saved:
+            values = [
+                int(e.text)
+                for e in criterion
+                if local_name(e.tag) in ("searchValue", "searchValue2")
+            ]
+            # record i has internal id i + 1
+            start = max(start, min(values[0] - 1, self.records))
+            if criterion.get("operator") == "between":
+                end = max(min(values[1], end), 0)
+
+        search_id = f"MOCK_SEARCH_{next(self._search_ids)}"
+        with self._lock:
+            self._searches[search_id] = (
+                bool(saved),
+                start,
+                max(end, start),
+                page_size,
+                columns,
+            )
+        return self.search_more(search_id, 1, operation="search")
+
+    @staticmethod
+    def customer(i):
+        return {
+            "id": i,
+            "balance": f"{i * 1.5:.2f}",
+            "modified": (START + timedelta(minutes=i - 1)).isoformat(),
+        }
+
+    def customer_row(self, i, columns):
+        values = self.customer(i)
+        columns = "".join(
+            f"<platformCommon:{name}>{CUSTOMER_COLUMNS[name].format(**values)}"
+            f"</platformCommon:{name}>"
+            for name in columns
+            if name in CUSTOMER_COLUMNS
+        )
+        return CUSTOMER_ROW.format(columns=columns)
+
+    def record_index(self, value):
+        """Index of the first record modified on or after ``value``."""
+        minutes = (value - START).total_seconds() / 60
+        return max(0, min(self.records, -int(-minutes // 1)))
+
+    def search_more(self, search_id, page_index, operation="searchMoreWithId"):
+        search = self._searches.get(search_id)
+        if search is None:
+            return self.failure(operation, "searchResult", "INVALID_SEARCH", search_id)
+        saved, start, end, page_size, columns = search
+        total = end - start
+        total_pages = -(-total // page_size)
+        first = start + (page_index - 1) * page_size
+        ids = range(first + 1, min(first + page_size, end) + 1)
+        if saved:
+            rows = "".join(self._row.format(**self.customer(i)) for i in ids)
+            records = f"<platformCore:searchRowList>{rows}</platformCore:searchRowList>"
+        elif columns:
+            rows = "".join(self.customer_row(i, columns) for i in ids)
+            records = f"<platformCore:searchRowList>{rows}</platformCore:searchRowList>"
+        else:
+            records = "".join(CUSTOMER.format(**self.customer(i)) for i in ids)
+            records = f"<platformCore:recordList>{records}</platformCore:recordList>"
+        content = (
+            '<platformCore:status isSuccess="true"/>'
+            f"<platformCore:totalRecords>{total}</platformCore:totalRecords>"
+            f"<platformCore:pageSize>{page_size}</platformCore:pageSize>"
+            f"<platformCore:totalPages>{total_pages}</platformCore:totalPages>"
+            f"<platformCore:pageIndex>{page_index}</platformCore:pageIndex>"
+            f"<platformCore:searchId>{search_id}</platformCore:searchId>"
+            f"{records}"
+        )
+        return self.envelope(operation, "searchResult", content)
+
+
+def mock_config(url, cache_dir, **config):
+    """Config of a tap syncing from the mock at ``url``."""
+    return {
+        "ns_account": "TSTDRV1",
+        "ns_consumer_key": "consumer-key",
+        "ns_consumer_secret": "consumer-secret",
+        "ns_token_key": "token-key",
+        "ns_token_secret": "token-secret",
+        "suitetalk_url": url,
+        "cache_wsdl": False,
+        "discovery_cache_dir": cache_dir,
+        "start_date": "2024-01-01T00:00:00Z",
+        "saved_queries": [
+            {"type": "transaction_search_advanced", "id": "customsearch1"}
+        ],
+        **config,
+    }
+
+
+def select_streams(catalog, streams, properties=None):
+    """Select ``streams`` in ``catalog``, deselecting the others, and only
+    ``properties`` of them if given."""
+    for stream in catalog["streams"]:
+        for metadata in stream["metadata"]:
+            breadcrumb = metadata["breadcrumb"]
+            if breadcrumb == []:
+                metadata["metadata"]["selected"] = stream["tap_stream_id"] in streams
+            elif properties is not None and breadcrumb[0] == "properties":
+                metadata["metadata"]["selected"] = breadcrumb[1] in properties
+    return catalog
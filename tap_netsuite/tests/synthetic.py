@@ -0,0 +1,273 @@
+"""Synthetic records and responses shared by the tests and the benchmarks.
+
+Transaction records and their schema shaped like wide NetSuite transactions,
+the same records as zeep objects, recorded saved-search and getAll responses
+scaled up to any size, and the former whole-document parsers the incremental
+ones are checked against.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from lxml import etree
+from zeep import xsd
+from zeep.xsd import Schema
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SEARCH_ROW = re.compile(rb"<platformCore:searchRow .*?</platformCore:searchRow>", re.S)
+LIST_RECORD = re.compile(rb"<platformCore:record .*?</platformCore:record>", re.S)
+
+# the schema dicts singer_sdk.typing generates for optional properties
+STRING = {"type": ["string", "null"]}
+NUMBER = {"type": ["number", "null"]}
+INTEGER = {"type": ["integer", "null"]}
+BOOLEAN = {"type": ["boolean", "null"]}
+DATETIME = {"type": ["string", "null"], "format": "date-time"}
+
+
+def object_type(**properties):
+    return {"type": ["object", "null"], "properties": properties}
+
+
+def array_type(items):
+    return {"type": ["array", "null"], "items": items}
+
+
+REF = object_type(internalId=STRING, externalId=STRING, name=STRING, type=STRING)
+CUSTOM_FIELD_VALUE = {
+    "anyOf": [
+        {
+            "type": ["array", "null"],
+            "items": {
+                "type": "object",
+                "properties": {
+                    "internalId": {"type": ["string", "null"]},
+                    "name": {"type": ["string", "null"]},
+                },
+            },
+        },
+        {
+            "type": "object",
+            "properties": {
+                "internalId": {"type": ["string", "null"]},
+                "name": {"type": ["string", "null"]},
+            },
+        },
+        {"type": ["string", "boolean", "integer", "number"]},
+        "null",
+    ]
+}
+CUSTOM_FIELDS = object_type(
+    customField=array_type(
+        {
+            "type": "object",
+            "properties": {
+                "internalId": STRING,
+                "scriptId": STRING,
+                "value": CUSTOM_FIELD_VALUE,
+            },
+        }
+    )
+)
+LINE = {
+    "type": "object",
+    "properties": {
+        "line": INTEGER,
+        "item": REF,
+        "quantity": NUMBER,
+        "rate": STRING,
+        "amount": NUMBER,
+        "isClosed": BOOLEAN,
+        "expectedShipDate": DATETIME,
+        "customFieldList": CUSTOM_FIELDS,
+    },
+}
+
+
+def transaction_schema(width=60):
+    properties = {
+        "internalId": STRING,
+        "lastModifiedDate": DATETIME,
+        "entity": REF,
+        "itemList": object_type(item=array_type(LINE)),
+        "customFieldList": CUSTOM_FIELDS,
+    }
+    for i in range(width):
+        properties[f"field{i}"] = [STRING, NUMBER, DATETIME, BOOLEAN, REF][i % 5]
+    return {"type": "object", "properties": properties}
+
+
+def custom_fields(i):
+    return {
+        "customField": [
+            {"internalId": "1", "scriptId": "custbody_text", "value": f"text {i}"},
+            {"internalId": "2", "scriptId": "custbody_flag", "value": i % 2 == 0},
+            {
+                "internalId": "3",
+                "scriptId": "custbody_ref",
+                "value": {"internalId": str(i), "name": "ref", "typeId": "7"},
+            },
+            {
+                "internalId": "4",
+                "scriptId": "custbody_multi",
+                "value": [
+                    {"internalId": "1", "name": "a"},
+                    {"internalId": "2", "name": None},
+                ],
+            },
+            {"internalId": "5", "scriptId": "custbody_empty", "value": None},
+        ]
+    }
+
+
+def transaction(i, lines=10, width=60):
+    tz = timezone(timedelta(hours=-8))
+    modified = datetime(2023, 1, 1, 12, 30, 15, 250000, tzinfo=tz) + timedelta(
+        minutes=i
+    )
+    record = {
+        "internalId": str(i),
+        "lastModifiedDate": modified,
+        "entity": {
+            "internalId": "12",
+            "externalId": None,
+            "name": "Customer",
+            "type": None,
+        },
+        "itemList": {
+            "item": [
+                {
+                    "line": line,
+                    "item": {
+                        "internalId": str(line),
+                        "externalId": None,
+                        "name": "Widget",
+                        "type": None,
+                    },
+                    "quantity": Decimal("2.5"),
+                    "rate": "10.00",
+                    "amount": Decimal("25.00"),
+                    "isClosed": False,
+                    "expectedShipDate": modified + timedelta(days=line),
+                    "customFieldList": None,
+                }
+                for line in range(lines)
+            ]
+        },
+        "customFieldList": custom_fields(i),
+        "nullFieldList": None,
+    }
+    for f in range(width):
+        value = [f"value {f}", Decimal(f) / 3, modified, f % 2 == 0, None][f % 5]
+        record[f"field{f}"] = value if f % 7 else None
+    return record
+
+
+EMPTY_REF = {"internalId": None, "externalId": None, "name": None, "type": None}
+_types = {}
+
+
+def to_zeep(value):
+    """Build zeep objects with the fields of a dict record."""
+    if isinstance(value, dict):
+        keys = tuple(value)
+        if keys not in _types:
+            elements = [xsd.Element(key, xsd.AnyType()) for key in keys]
+            _types[keys] = xsd.ComplexType(xsd.Sequence(elements))
+        return _types[keys](**{key: to_zeep(v) for key, v in value.items()})
+    if isinstance(value, list):
+        return [to_zeep(v) for v in value]
+    return value
+
+
+def zeep_transaction(i, lines=10):
+    record = transaction(i, lines)
+    record["nullFieldList"] = {"name": ["memo", "otherRefNum"]}
+    for f in range(4, 60, 5):
+        record[f"field{f}"] = dict(EMPTY_REF)
+    return to_zeep(record)
+
+
+def saved_search_response(rows):
+    """The recorded saved-search response with its first row repeated ``rows`` times."""
+    document = (FIXTURES / "saved_search_response.xml").read_bytes()
+    matches = list(SEARCH_ROW.finditer(document))
+    row = matches[0].group(0)
+    start, end = matches[0].start(), matches[-1].end()
+    return document[:start] + row * rows + document[end:]
+
+
+def parse_xmltodict(document):  # noqa: C901
+    """The former whole-document parser of SavedSearchesClient, kept as is."""
+    import xmltodict
+
+    parsed_response = xmltodict.parse(document)
+    body = parsed_response["soapenv:Envelope"]["soapenv:Body"]
+    search_response = body.get("searchResponse") or body["searchMoreWithIdResponse"]
+    search_response = search_response["platformCore:searchResult"]
+    modified_search_response = search_response["platformCore:searchRowList"]
+    records = modified_search_response["platformCore:searchRow"]
+    type_nickname = records[0]["@xsi:type"].split(":")[0]
+
+    for record in records:
+        formatted_record = {}
+
+        for k, v in record[f"{type_nickname}:basic"].items():
+            if k == "platformCommon:customFieldList":
+                if isinstance(v["platformCore:customField"], dict):
+                    v["platformCore:customField"] = [v["platformCore:customField"]]
+
+                formatted_record["customFieldList"] = [
+                    {k_.replace("@", "").split(":")[-1]: v_ for k_, v_ in n_v.items()}
+                    for n_v in v["platformCore:customField"]
+                ]
+                continue
+            if "@" in k:
+                continue
+
+            field = k.split(":")[1]
+            value = v.get("platformCore:searchValue")
+            if not value:
+                continue
+
+            if isinstance(value, dict):
+                formatted_record[f"{field}Id"] = value["@internalId"]
+            else:
+                formatted_record[field] = value
+
+        for key, value in record.items():
+            if key.endswith("Join") and value:
+                join_type = key.split(":")[1]
+                for join_key, join_value in value.items():
+                    if "@" in join_key:
+                        continue
+                    field = join_type + "." + join_key.split(":")[1]
+                    val = join_value.get("platformCore:searchValue")
+                    if isinstance(val, dict) and val:
+                        _, val = next(iter(val.items()))
+                    formatted_record[field] = val
+        yield formatted_record
+
+
+def load_get_all_schema():
+    return Schema(etree.parse(str(FIXTURES / "get_all_types.xsd")).getroot())
+
+
+def get_all_response(type_name, records):
+    """A recorded getAll response with its first record repeated ``records`` times."""
+    document = (FIXTURES / f"get_all_{type_name.lower()}_response.xml").read_bytes()
+    matches = list(LIST_RECORD.finditer(document))
+    record = matches[0].group(0)
+    start, end = matches[0].start(), matches[-1].end()
+    return document[:start] + record * records + document[end:]
+
+
+def parse_whole(document, schema):
+    """Every record converted before the first is used, as zeep does."""
+    from tap_netsuite.search_response import local_name, parse_record
+
+    root = etree.fromstring(document, etree.XMLParser(huge_tree=True))
+    record_list = next(e for e in root.iter() if local_name(e.tag) == "recordList")
+    return [parse_record(element, schema) for element in record_list]
@@ -0,0 +1,54 @@
+"""Tests for skipping boundary records emitted by the previous run."""
+
+import base64
+import json
+
+from tap_netsuite.dedup import DIGEST_SIZE, BoundarySeen
+
+
+def run(previous, records, max_records=100):
+    seen = BoundarySeen(previous, max_records)
+    emitted = [r for r in records if not seen.add(*r)]
+    return emitted, json.loads(json.dumps(seen.to_state()))
+
+
+def test_only_records_of_the_latest_minute_are_kept():
+    records = [
+        ("1", "2024-01-01T00:23:10.000000Z"),
+        ("2", "2024-01-01T00:24:05.000000Z"),
+        ("3", "2024-01-01T00:24:50.000000Z"),
+    ]
+    emitted, state = run(None, records)
+    assert emitted == records
+    assert state["minute"] == "2024-01-01T00:24"
+
+    again = [
+        ("2", "2024-01-01T00:24:05.000000Z"),
+        ("3", "2024-01-01T00:24:50.000000Z"),
+        ("4", "2024-01-01T00:24:55.000000Z"),
+        # modified since, so emitted again
+        ("2", "2024-01-01T00:25:00.000000Z"),
+    ]
+    emitted, state = run(state, again)
+    assert emitted == again[2:]
+    assert state["minute"] == "2024-01-01T00:25"
+
+    emitted, _ = run(state, [("2", "2024-01-01T00:25:00.000000Z")])
+    assert emitted == []
+
+
+def test_skipped_records_stay_in_the_set():
+    records = [("1", "2024-01-01T00:24:00.000000Z")]
+    _, state = run(None, records)
+    emitted, state = run(state, records)
+    assert emitted == []
+    emitted, _ = run(state, records)
+    assert emitted == []
+
+
+def test_state_is_bounded():
+    records = [(str(i), "2024-01-01T00:24:00.000000Z") for i in range(50)]
+    _, state = run(None, records, max_records=10)
+    assert len(base64.b64decode(state["keys"])) == 10 * DIGEST_SIZE
+    emitted, _ = run(state, records, max_records=10)
+    assert len(emitted) == 40
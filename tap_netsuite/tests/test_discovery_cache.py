@@ -0,0 +1,121 @@
+"""Tests for the discovery cache."""
+
+import contextlib
+import io
+import json
+from pathlib import Path
+
+import pytest
+import requests
+
+from tap_netsuite import discovery_cache
+from tap_netsuite.discovery_cache import DiscoveryCache
+from tap_netsuite.tap import TapNetsuite
+from tap_netsuite.tests.mock_suitetalk import mock_config
+
+TYPES = [{"name": "Customer", "record_type": "SearchRecordType"}]
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache = DiscoveryCache(str(tmp_path), "tstdrv1_2022_2", ttl=60)
+    cache.set("record_types", TYPES)
+    cache.save()
+    return str(tmp_path)
+
+
+def test_hit_and_miss(cache_dir):
+    cache = DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60)
+    assert "record_types" in cache and cache.get("record_types") == TYPES
+    assert "schema:Customer" not in cache
+    assert cache.get("schema:Customer", {}) == {}
+
+
+def test_entries_expire(cache_dir, monkeypatch):
+    monkeypatch.setattr(discovery_cache, "time", lambda: 1e12)
+    assert (
+        DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60).get("record_types") is None
+    )
+    assert DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=1e12).get("record_types")
+
+
+def test_saving_keeps_creation_time(cache_dir):
+    path = Path(cache_dir) / "discovery_tstdrv1_2022_2.json"
+    created_at = json.loads(path.read_text())["created_at"]
+    cache = DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60)
+    cache.set("schema:Customer", {"schema": {}, "replication_key": None})
+    cache.save()
+    # entries added later expire with the rest of the file
+    assert json.loads(path.read_text())["created_at"] == created_at
+
+
+@pytest.mark.parametrize("key", ["tstdrv2_2022_2", "tstdrv1_2023_1"])
+def test_accounts_and_versions_are_cached_apart(cache_dir, key):
+    assert DiscoveryCache(cache_dir, key, ttl=60).get("record_types") is None
+
+
+def test_format_change_invalidates(cache_dir, monkeypatch):
+    monkeypatch.setattr(
+        discovery_cache, "CACHE_FORMAT", discovery_cache.CACHE_FORMAT + 1
+    )
+    assert (
+        DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60).get("record_types") is None
+    )
+
+
+def test_corrupt_file_is_a_miss(cache_dir):
+    (Path(cache_dir) / "discovery_tstdrv1_2022_2.json").write_text("{")
+    assert (
+        DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60).get("record_types") is None
+    )
+
+
+def test_disabled_cache(cache_dir):
+    cache = DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60, enabled=False)
+    assert cache.get("record_types") is None
+    cache.set("record_types", [])
+    assert cache.get("record_types") is None
+
+
+def test_invalidate(cache_dir):
+    cache = DiscoveryCache(cache_dir, "tstdrv1_2022_2", ttl=60)
+    cache.invalidate()
+    assert cache.get("record_types") is None
+    assert not (Path(cache_dir) / "discovery_tstdrv1_2022_2.json").exists()
+
+
+def test_tap_discovery_is_cached(mock, tmp_path):
+    def discover(**config):
+        config = mock_config(mock.url, str(tmp_path), **config)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return TapNetsuite(config=config).catalog_dict
+
+    catalog = discover()
+    searches = mock.requests["search"]
+    # the saved search's schema comes from the cache instead of a search
+    assert discover() == catalog
+    assert mock.requests["search"] == searches
+
+    assert discover(refresh_discovery_cache=True) == catalog
+    assert mock.requests["search"] == searches + 1
+
+
+def test_failed_type_fetch_is_not_cached(mock, tmp_path, monkeypatch):
+    def discover():
+        config = mock_config(mock.url, str(tmp_path))
+        with contextlib.redirect_stdout(io.StringIO()):
+            return TapNetsuite(config=config).catalog_dict
+
+    def cached_types():
+        return DiscoveryCache(str(tmp_path), "tstdrv1_2022_2", ttl=60).get(
+            "record_types"
+        )
+
+    mock.fail("coreTypes.xsd", 503)
+    with pytest.raises(requests.HTTPError):
+        discover()
+    assert cached_types() is None
+
+    monkeypatch.setattr(TapNetsuite, "extract_xml_types", lambda *args: [])
+    discover()
+    assert cached_types() is None
@@ -0,0 +1,69 @@
+"""Tests for concurrent stream syncs."""
+
+import contextlib
+import io
+import json
+import threading
+import time
+
+import pytest
+from singer import RecordMessage
+
+from tap_netsuite.execution import MessageWriter, sync_streams
+
+
+def test_writer_keeps_each_thread_in_order():
+    output = io.StringIO()
+
+    def write(writer, stream):
+        for i in range(500):
+            writer.write(RecordMessage(stream=stream, record={"i": i}))
+
+    with contextlib.redirect_stdout(output):
+        with MessageWriter(max_queued=10) as writer:
+            threads = [
+                threading.Thread(target=write, args=(writer, f"s{n}")) for n in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    seen = {}
+    for line in output.getvalue().splitlines():
+        message = json.loads(line)
+        seen.setdefault(message["stream"], []).append(message["record"]["i"])
+    assert seen == {f"s{n}": list(range(500)) for n in range(4)}
+
+
+class Stream:
+    def __init__(self, name, seconds, fail=False):
+        self.name = name
+        self.seconds = seconds
+        self.fail = fail
+        self.started = self.finished = None
+
+    def sync(self):
+        self.started = time.perf_counter()
+        time.sleep(self.seconds)
+        if self.fail:
+            raise ValueError(self.name)
+        self.finished = time.perf_counter()
+
+    def finalize_state_progress_markers(self):
+        pass
+
+
+def test_streams_start_when_a_slot_frees_up():
+    streams = [Stream("long", 0.3), Stream("a", 0.05), Stream("b", 0.05)]
+    sync_streams(streams, 2)
+    # b does not wait for the long stream ahead of it
+    assert streams[2].finished < streams[0].finished
+
+
+def test_errors_stop_later_streams():
+    streams = [Stream("slow", 0.2), Stream("broken", 0.01, fail=True), Stream("c", 0)]
+    with pytest.raises(ValueError, match="broken"):
+        sync_streams(streams, 2)
+    assert streams[0].finished is not None
+    assert streams[2].started is None
@@ -0,0 +1,96 @@
+"""Tests for routing a single transaction search to per-type streams."""
+
+import logging
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from tap_netsuite.fanout import TransactionFanOut, transaction_type
+
+
+class Record(dict):
+    def __init__(self, type_name, **fields):
+        super().__init__(**fields)
+        self._xsd_type = SimpleNamespace(name=type_name)
+
+
+def day(n):
+    return datetime(2024, 1, n, tzinfo=timezone.utc)
+
+
+class FakeStream:
+    uses_transaction_fanout = True
+    selected = True
+    replication_key = "lastModifiedDate"
+
+    def __init__(self, name, start_date, pages=None):
+        self.name = name
+        self.start_date = start_date
+        self.pages = pages
+        self.searches = []
+
+    def get_starting_time(self, context):
+        return self.start_date
+
+    def search_records(self, start_date, record_type_filter=True, state=None):
+        self.searches.append((start_date, record_type_filter))
+        for page in self.pages:
+            if isinstance(page, Exception):
+                raise page
+            yield from page
+
+
+def test_one_search_is_routed_by_type_and_bookmark():
+    pages = [
+        [Record("Invoice", internalId="1", lastModifiedDate=day(1))],
+        [
+            Record("JournalEntry", internalId="2", lastModifiedDate=day(2)),
+            Record("Invoice", internalId="3", lastModifiedDate=day(3)),
+            Record("CashSale", internalId="4", lastModifiedDate=day(3)),
+        ],
+    ]
+    invoice = FakeStream("Invoice", day(2), pages)
+    journal = FakeStream("JournalEntry", day(1))
+    tap = SimpleNamespace(
+        streams={"Invoice": invoice, "JournalEntry": journal},
+        logger=logging.getLogger("test"),
+    )
+    fanout = TransactionFanOut(tap)
+
+    invoices = list(fanout.get_records(invoice, None))
+    journals = list(fanout.get_records(journal, None))
+
+    assert invoice.searches == [(day(1), ["_invoice", "_journal"])]
+    assert journal.searches == []
+    assert [r["internalId"] for r in invoices] == ["3"]
+    assert [r["internalId"] for r in journals] == ["2"]
+
+
+def test_failed_search_fails_every_stream():
+    pages = [
+        [Record("JournalEntry", internalId="1", lastModifiedDate=day(1))],
+        RuntimeError("page 2 failed after retries"),
+        [Record("JournalEntry", internalId="2", lastModifiedDate=day(2))],
+    ]
+    invoice = FakeStream("Invoice", day(1), pages)
+    journal = FakeStream("JournalEntry", day(1))
+    tap = SimpleNamespace(
+        streams={"Invoice": invoice, "JournalEntry": journal},
+        logger=logging.getLogger("test"),
+    )
+    fanout = TransactionFanOut(tap)
+
+    with pytest.raises(RuntimeError, match="page 2 failed"):
+        list(fanout.get_records(invoice, None))
+    # the partial spool is not replayed and the search is not run again
+    with pytest.raises(RuntimeError, match="page 2 failed"):
+        list(fanout.get_records(journal, None))
+    assert len(invoice.searches) == 1 and journal.searches == []
+
+
+def test_transaction_types():
+    assert transaction_type("Invoice") == "_invoice"
+    assert transaction_type("VendorReturnAuthorization") == "_vendorReturnAuthorization"
+    assert transaction_type("JournalEntry") == "_journal"
+    assert transaction_type("StatisticalJournalEntry") == "_statisticalJournal"
@@ -0,0 +1,36 @@
+"""Tests for the record fingerprint store."""
+
+from tap_netsuite.fingerprints import FingerprintStore, StreamFingerprints
+
+
+def sync(store, records, stream="Currency"):
+    fingerprints = StreamFingerprints(store, stream)
+    emitted = [r for r in records if fingerprints.has_changed(r)]
+    deleted = fingerprints.deleted()
+    fingerprints.save()
+    return emitted, deleted
+
+
+def test_only_changed_records_are_emitted(tmp_path):
+    store = FingerprintStore(str(tmp_path / "state" / "fingerprints.db"))
+    records = [{"internalId": str(i), "name": f"c{i}"} for i in range(5)]
+    assert sync(store, records) == (records, [])
+    assert sync(store, records) == ([], [])
+
+    # key order does not change the fingerprint
+    changed = [{"name": "c0", "internalId": "0"}, {"internalId": "1", "name": "x"}]
+    new = {"internalId": "9", "name": "c9"}
+    emitted, deleted = sync(store, changed + records[2:4] + [new])
+    assert emitted == [changed[1], new]
+    assert deleted == ["4"]
+    assert sync(store, records[:4], stream="State") == (records[:4], [])
+    assert store.load("Currency").keys() == {"0", "1", "2", "3", "9"}
+
+
+def test_unsaved_syncs_are_discarded(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.db"))
+    records = [{"internalId": "1"}, {"name": "no id"}]
+    fingerprints = StreamFingerprints(store, "Currency")
+    assert all(fingerprints.has_changed(r) for r in records)
+    assert sync(store, records) == (records, [])
+    assert sync(store, records) == (records[1:], [])
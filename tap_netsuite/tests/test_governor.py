@@ -0,0 +1,52 @@
+"""Tests for the account-wide concurrency governor."""
+
+import threading
+import time
+
+import pytest
+
+from tap_netsuite.governor import ConcurrencyGovernor
+
+
+def run_requests(governors, requests_per_governor=6):
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def request(governor):
+        with governor.slot():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+
+    threads = [
+        threading.Thread(target=request, args=(governor,))
+        for governor in governors
+        for _ in range(requests_per_governor)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return peak[0]
+
+
+def test_local_limit():
+    assert run_requests([ConcurrencyGovernor(2, "acct")]) <= 2
+
+
+def test_lock_dir_is_shared_between_governors(tmp_path):
+    pytest.importorskip("fcntl")
+    governors = [
+        ConcurrencyGovernor(2, "acct", lock_dir=str(tmp_path)) for _ in range(3)
+    ]
+    assert run_requests(governors) <= 2
+
+
+def test_slot_reports_wait_time():
+    governor = ConcurrencyGovernor(1, "acct")
+    with governor.slot() as wait:
+        assert wait >= 0
@@ -0,0 +1,62 @@
+"""Tests for the per-stage sync metrics."""
+
+import ast
+import logging
+
+from tap_netsuite.instrumentation import StageStats, record_backoff
+from tap_netsuite.tests.mock_suitetalk import mock_config
+
+
+def test_stage_metrics():
+    stages = StageStats()
+    with stages.timed("network"):
+        pass
+    stages.add("emit", 0.5, calls=10)
+    stages.count(pages=2, page_records=9, bytes_received=100)
+    metrics = {m["metric"]: m for m in stages.metrics("Customer")}
+
+    assert metrics["stage_network"]["tags"] == {"object": "Customer", "calls": 1}
+    assert metrics["stage_emit"]["value"] == 0.5
+    assert metrics["stage_emit"]["tags"]["calls"] == 10
+    assert metrics["records_per_page"]["value"] == 4
+    assert metrics["bytes_received"]["type"] == "counter"
+
+
+def test_record_backoff():
+    class Stream:
+        stages = StageStats()
+
+    record_backoff({"args": (Stream(),), "wait": 1.25})
+    record_backoff({"args": (Stream(),), "wait": 0.5})
+    counts = {m["metric"]: m["value"] for m in Stream.stages.metrics("Customer")}
+    assert counts == {"retries": 2, "backoff_sleep_seconds": 1.75}
+
+
+def test_sync_metrics(mock, tmp_path, caplog, run_tap):
+    config = mock_config(mock.url, str(tmp_path))
+    with caplog.at_level(logging.INFO):
+        run_tap(config, ["Customer", "Currency", "TransactionSearchAdvanced"])
+
+    metrics = {}
+    http_metrics = []
+    for record in caplog.records:
+        message = record.getMessage()
+        if "METRIC: " in message:
+            metric = ast.literal_eval(message.split("METRIC: ", 1)[1])
+            metrics[(metric["tags"].get("object"), metric["metric"])] = metric
+            if metric["metric"].startswith("http_"):
+                http_metrics.append(metric)
+
+    assert metrics[("Customer", "pages")]["value"] == 3
+    assert metrics[("Customer", "records_per_page")]["value"] == 8
+    assert metrics[("Customer", "stage_transform")]["tags"]["calls"] == 25
+    for stage in ["token_signing", "serialize", "network", "xml_parse", "deserialize"]:
+        assert ("Customer", f"stage_{stage}") in metrics
+    assert metrics[("Currency", "stage_deserialize")]["tags"]["calls"] == 7
+    assert metrics[("TransactionSearchAdvanced", "stage_emit")]["tags"]["calls"] == 25
+    assert metrics[("TransactionSearchAdvanced", "bytes_received")]["value"] > 0
+    # shared by the streams, so reported once for the whole tap
+    assert all(m["tags"] == {"scope": "tap"} for m in http_metrics)
+    http_counts = {m["metric"]: m["value"] for m in http_metrics}
+    assert len(http_metrics) == len(http_counts) == 6
+    assert http_counts["http_requests"] > 0
@@ -0,0 +1,246 @@
+"""Tests running the SuiteTalk client and the tap against the mock server."""
+
+import contextlib
+import io
+from collections import Counter
+
+import pytest
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_netsuite.registry import SuiteTalkClient
+from tap_netsuite.tap import TapNetsuite
+from tap_netsuite.tests.mock_suitetalk import START, MockSuiteTalk, mock_config
+
+
+def test_search_pages(mock):
+    suitetalk = SuiteTalkClient("TSTDRV1", cache_wsdl=False, base_url=mock.url)
+    config = mock_config(mock.url, None)
+    headers = {"tokenPassport": suitetalk.token_passport(config)}
+    search = suitetalk.get_type("CustomerSearchBasic")(
+        lastModifiedDate=suitetalk.get_type("SearchDateField")(
+            searchValue=START.replace(minute=5), operator="onOrAfter"
+        )
+    )
+    result = suitetalk.service_proxy.search(
+        searchRecord=search, _soapheaders=headers
+    ).body.searchResult
+    assert (result.totalRecords, result.totalPages) == (20, 2)
+    assert result.recordList.record[0].internalId == "6"
+
+    more = suitetalk.service_proxy.searchMoreWithId(
+        searchId=result.searchId, pageIndex=2, _soapheaders=headers
+    ).body.searchResult
+    assert [r.internalId for r in more.recordList.record][-1] == "25"
+    assert mock.requests["search"] == mock.requests["searchMoreWithId"] == 1
+
+
+def test_sync(mock, tmp_path, run_tap):
+    config = mock_config(mock.url, str(tmp_path))
+    streams = ["Customer", "Currency", "TransactionSearchAdvanced"]
+    messages = run_tap(config, streams)
+    records = Counter(m["stream"] for m in messages if m["type"] == "RECORD")
+    assert records == {"Customer": 25, "Currency": 7, "TransactionSearchAdvanced": 25}
+
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    bookmark = state["bookmarks"]["Customer"]["replication_key_value"]
+    assert bookmark == "2024-01-01T00:24:00.000000Z"
+
+    # the bookmark record is synced again, as the search is onOrAfter
+    messages = run_tap(config, ["Customer"], state=state)
+    assert len([m for m in messages if m["type"] == "RECORD"]) == 1
+
+
+def test_adaptive_page_size(tmp_path, run_tap):
+    with MockSuiteTalk(records=1000) as mock:
+        config = mock_config(
+            mock.url, str(tmp_path), page_size=50, adaptive_page_size=True
+        )
+        messages = run_tap(config, ["Customer", "TransactionSearchAdvanced"])
+        records = Counter(m["stream"] for m in messages if m["type"] == "RECORD")
+        assert records == {"Customer": 1000, "TransactionSearchAdvanced": 1000}
+
+        # fast pages grow the page size, which the next run starts from
+        state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+        learned = state["bookmarks"]["Customer"]["page_size"]["size"]
+        assert learned > 50
+        assert (
+            state["bookmarks"]["TransactionSearchAdvanced"]["page_size"]["size"] == 1000
+        )
+
+        searches = len(mock._searches)
+        run_tap(config, ["Customer"], state=state)
+        assert mock._searches[f"MOCK_SEARCH_{searches + 1}"][3] == learned
+
+
+def test_concurrent_streams(mock, tmp_path, run_tap):
+    streams = ["Customer", "Currency", "State", "TransactionSearchAdvanced"]
+    config = mock_config(mock.url, str(tmp_path))
+    sequential = run_tap(config, streams)
+    messages = run_tap({**config, "stream_concurrency": 3}, streams)
+
+    def records(messages):
+        return Counter(m["stream"] for m in messages if m["type"] == "RECORD")
+
+    assert records(messages) == records(sequential)
+    schemas = {}
+    for index, message in enumerate(messages):
+        if message["type"] == "SCHEMA":
+            schemas[message["stream"]] = index
+        elif message["type"] == "RECORD":
+            assert schemas[message["stream"]] < index
+    assert messages[-1]["value"] == sequential[-1]["value"]
+
+
+def test_id_range_sharding(tmp_path, run_tap):
+    with MockSuiteTalk(records=4000) as mock:
+        config = mock_config(
+            mock.url,
+            str(tmp_path),
+            id_range_sharding=True,
+            id_range_target_records=1000,
+            id_range_concurrency=3,
+        )
+        messages = run_tap(config, ["Customer"])
+        ids = Counter(
+            m["record"]["internalId"] for m in messages if m["type"] == "RECORD"
+        )
+        assert len(ids) == 4000 and set(ids.values()) == {1}
+
+        # the probes ask for the smallest pages
+        page_sizes = [search[3] for search in mock._searches.values()]
+        assert page_sizes.count(5) > 5 and len(page_sizes) - page_sizes.count(5) >= 4
+        state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+        assert "id_range_checkpoint" not in state["bookmarks"]["Customer"]
+
+        # incremental runs search from the bookmark without probing
+        searches = len(mock._searches)
+        run_tap(config, ["Customer"], state=state)
+        assert len(mock._searches) == searches + 1
+
+
+def test_boundary_dedup(mock, tmp_path, run_tap):
+    config = mock_config(mock.url, str(tmp_path), boundary_dedup=True)
+    messages = run_tap(config, ["Customer"])
+    assert len([m for m in messages if m["type"] == "RECORD"]) == 25
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    assert state["bookmarks"]["Customer"]["boundary_seen"]["minute"] == (
+        "2024-01-01T00:24"
+    )
+
+    # the bookmark record is returned by the search again, but not emitted
+    messages = run_tap(config, ["Customer"], state=state)
+    assert not [m for m in messages if m["type"] == "RECORD"]
+    assert [m for m in messages if m["type"] == "STATE"][-1]["value"] == state
+
+
+def test_fingerprint_store(mock, tmp_path, run_tap):
+    config = mock_config(
+        mock.url,
+        str(tmp_path),
+        fingerprint_store=str(tmp_path / "fingerprints.db"),
+        fingerprint_deletes=True,
+    )
+
+    def records(streams):
+        messages = run_tap(config, streams)
+        return [m["record"] for m in messages if m["type"] == "RECORD"]
+
+    def counts():
+        messages = run_tap(config, ["Currency", "Customer"])
+        return Counter(m["stream"] for m in messages if m["type"] == "RECORD")
+
+    assert counts() == {"Currency": 7, "Customer": 25}
+    # Customer has a replication key, so it is not fingerprinted
+    assert counts() == {"Customer": 25}
+
+    mock.get_all_records = 5
+    deleted = records(["Currency"])
+    assert [r["internalId"] for r in deleted] == ["6", "7"]
+    assert all(r["_sdc_deleted_at"] for r in deleted)
+    assert records(["Currency"]) == []
+
+
+@pytest.mark.parametrize("error", [503, "truncate"])
+def test_get_all_retries_unreadable_responses(
+    mock, tmp_path, monkeypatch, error, run_tap
+):
+    monkeypatch.setattr("tap_netsuite.client.sleep", lambda seconds: None)
+    mock.get_all_records = 500
+    mock.fail("getAll", error)
+    messages = run_tap(mock_config(mock.url, str(tmp_path)), ["Currency"])
+    ids = [m["record"]["internalId"] for m in messages if m["type"] == "RECORD"]
+    assert ids == [str(i) for i in range(1, 501)]
+    assert mock.requests["getAll"] == 2
+
+
+def test_get_all_client_errors_are_not_retried(mock, tmp_path, run_tap):
+    mock.fail("getAll", 403)
+    with pytest.raises(FatalAPIError, match="HTTP 403 response of type 'text/html"):
+        run_tap(mock_config(mock.url, str(tmp_path)), ["Currency"])
+    assert mock.requests["getAll"] == 1
+
+
+@pytest.fixture
+def customers(mock, tmp_path):
+    """The Customer stream, searching the mock from ``START``."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tap = TapNetsuite(config=mock_config(mock.url, str(tmp_path)))
+    return tap.streams["Customer"]
+
+
+def search_ids(stream, state, pages=None):
+    """Internal ids of a resumable search, stopped after ``pages`` pages."""
+    ids = []
+    records = stream.search_resumable(START, True, state)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for record in records:
+            checkpoint = state.get("page_checkpoint")
+            if pages and checkpoint and checkpoint["pageIndex"] == pages:
+                records.close()
+                break
+            ids.append(int(record.internalId))
+    return ids
+
+
+def test_search_resumes_from_checkpoint(mock, customers):
+    state = {}
+    assert search_ids(customers, state, pages=1) == list(range(1, 11))
+    assert state["page_checkpoint"]["searchId"]
+    searches = mock.requests["search"]
+
+    # the next run continues with page 2 of the same search
+    assert search_ids(customers, state) == list(range(11, 26))
+    assert mock.requests["search"] == searches
+    assert "page_checkpoint" not in state
+
+
+def test_expired_search_restarts_from_the_start(mock, customers):
+    state = {}
+    search_ids(customers, state, pages=1)
+    mock._searches.clear()
+
+    # the order of a new search is not guaranteed, so every record is searched
+    assert search_ids(customers, state) == list(range(1, 26))
+    assert not customers.search_resumed
+    assert "page_checkpoint" not in state
+
+
+def test_resumed_search_keeps_fingerprints(mock, tmp_path):
+    config = mock_config(
+        mock.url,
+        str(tmp_path),
+        fingerprint_store=str(tmp_path / "fingerprints.db"),
+        fingerprint_deletes=True,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        tap = TapNetsuite(config=config)
+        stream = tap.streams["Customer"]
+        # a search without replication key, synced in full every run
+        stream.replication_key = None
+        assert len(list(stream.get_records(None))) == 25
+
+        search_ids(stream, stream.stream_state, pages=1)
+        # the resumed search misses the records of page 1, none were deleted
+        assert list(stream.get_records(None)) == []
+    assert stream.search_resumed
+    assert len(stream.stream_fingerprints().previous) == 25
@@ -0,0 +1,156 @@
+"""Tests for ordered, concurrent page fetching."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from tap_netsuite.pagination import (
+    MAX_PAGE_SIZE,
+    PageSizer,
+    PipelineStats,
+    fetch_pages_in_order,
+    prefetch,
+)
+
+
+def test_pages_are_yielded_in_order():
+    def fetch(page):
+        time.sleep(random.random() / 100)
+        return page
+
+    assert list(fetch_pages_in_order(fetch, range(2, 30), 4)) == list(range(2, 30))
+
+
+def test_none_pages_are_fetched():
+    pages = [1, 2, None, 3]
+    assert list(fetch_pages_in_order(lambda page: page, pages, 2)) == pages
+
+
+def test_concurrency_is_bounded():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def fetch(page):
+        with lock:
+            in_flight.append(page)
+            peak.append(len(in_flight))
+        time.sleep(0.005)
+        with lock:
+            in_flight.remove(page)
+        return page
+
+    list(fetch_pages_in_order(fetch, range(20), 3))
+    assert max(peak) <= 3
+
+
+def test_errors_surface_in_page_order():
+    def fetch(page):
+        if page == 3:
+            raise ValueError(page)
+        return page
+
+    pages = fetch_pages_in_order(fetch, range(1, 6), 2)
+    assert [next(pages), next(pages)] == [1, 2]
+    with pytest.raises(ValueError):
+        next(pages)
+
+
+def test_prefetch_overlaps_fetching_and_consuming():
+    def pages():
+        for page in range(5):
+            time.sleep(0.02)
+            yield page
+
+    stats = PipelineStats()
+    start = time.perf_counter()
+    for page in prefetch(pages(), 2, stats):
+        time.sleep(0.02)
+    # serially this would take 0.2s
+    assert time.perf_counter() - start < 0.16
+    assert stats.utilization()["fetch"] > 0.5
+    assert stats.utilization()["consume"] > 0.5
+
+
+def test_prefetch_depth_bounds_buffered_pages():
+    produced = []
+
+    def pages():
+        for page in range(20):
+            produced.append(page)
+            yield page
+
+    items = prefetch(pages(), 2)
+    assert next(items) == 0
+    time.sleep(0.05)
+    # the consumed page, two buffered and one waiting to be queued
+    assert len(produced) <= 4
+    items.close()
+
+
+def test_prefetch_raises_producer_errors_in_order():
+    def pages():
+        yield 1
+        yield 2
+        raise ValueError("page 3")
+
+    items = prefetch(pages(), 4)
+    assert [next(items), next(items)] == [1, 2]
+    with pytest.raises(ValueError):
+        next(items)
+
+
+def test_closing_prefetch_closes_the_source():
+    closed = threading.Event()
+
+    def pages():
+        try:
+            for page in range(100):
+                yield page
+        finally:
+            closed.set()
+
+    items = prefetch(pages(), 1)
+    next(items)
+    items.close()
+    assert closed.is_set()
+
+
+def run_pages(sizer, seconds_per_record, bytes_per_record=1000, pages=20):
+    for _ in range(pages):
+        size = sizer.size
+        # a fixed round trip plus the time to build and send each record
+        sizer.observe(0.5 + size * seconds_per_record, size * bytes_per_record, size)
+    return sizer.size
+
+
+def test_page_size_grows_for_narrow_records():
+    sizer = PageSizer(100, target_seconds=30, target_bytes=5000000)
+    assert run_pages(sizer, 0.001) == MAX_PAGE_SIZE
+
+
+def test_page_size_shrinks_to_the_time_and_byte_targets():
+    sizer = PageSizer(1000, target_seconds=30, target_bytes=5000000)
+    assert 140 <= run_pages(sizer, 0.2) <= 160
+    sizer = PageSizer(1000, target_seconds=30, target_bytes=5000000)
+    assert 45 <= run_pages(sizer, 0.001, bytes_per_record=100000) <= 55
+
+
+def test_page_size_backs_off_after_faults():
+    sizer = PageSizer(800, target_seconds=30, target_bytes=5000000)
+    sizer.fault()
+    assert sizer.size == 400
+    # no growth while the fault rate is high, then back to the target
+    assert run_pages(sizer, 0.001, pages=3) == 400
+    assert run_pages(sizer, 0.001, pages=20) == MAX_PAGE_SIZE
+
+
+def test_page_size_state_round_trip():
+    sizer = PageSizer(500, target_seconds=30, target_bytes=5000000)
+    sizer.fault()
+    state = sizer.to_state()
+    restored = PageSizer.from_state(state, 500, 30, 5000000)
+    assert restored.to_state() == state == {"size": 250, "fault_rate": 0.1}
+    assert PageSizer.from_state(None, 2000, 30, 5000000).size == MAX_PAGE_SIZE
@@ -0,0 +1,83 @@
+"""Tests projecting Customer searches onto the selected properties."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from tap_netsuite.client import NetsuiteStream
+from tap_netsuite.tests.mock_suitetalk import mock_config
+
+
+@pytest.fixture
+def sync_customers(selected_tap, sync):
+    """Sync the Customer stream, returning its projection mode and records."""
+
+    def sync_customers(config, properties=None):
+        if properties is not None:
+            # the replication key is needed for the bookmarks
+            properties = [*properties, "lastModifiedDate"]
+        tap = selected_tap(config, ["Customer"], properties=properties)
+        records = [m["record"] for m in sync(tap) if m["type"] == "RECORD"]
+        return tap.streams["Customer"].projection[0], records
+
+    return sync_customers
+
+
+@pytest.fixture
+def full_records(mock, tmp_path, sync_customers):
+    config = mock_config(mock.url, str(tmp_path))
+    mode, records = sync_customers(config)
+    assert mode == "full" and len(records) == 25
+    return config, records
+
+
+def projected(records, properties):
+    return [{k: v for k, v in r.items() if k in properties} for r in records]
+
+
+def test_search_columns_match_full_records(mock, full_records, sync_customers):
+    config, records = full_records
+    searches = len(mock._searches)
+    properties = ["entityId", "email", "balance", "isInactive", "dateCreated"]
+    mode, rows = sync_customers(config, properties)
+
+    assert mode == "search_columns"
+    columns = mock._searches[f"MOCK_SEARCH_{searches + 1}"][4]
+    # the primary key is always searched
+    keys = {*properties, "internalId", "lastModifiedDate"}
+    assert set(columns) == keys
+    assert rows == projected(records, keys)
+
+
+def test_references_are_not_projected_onto_columns(full_records, sync_customers):
+    # a subsidiary column only holds the internalId, records also hold the name
+    config, records = full_records
+    mode, rows = sync_customers(config, ["entityId", "subsidiary"])
+    assert mode == "body_fields_only"
+    assert [r["subsidiary"] for r in rows] == [r["subsidiary"] for r in records]
+    assert rows[0]["subsidiary"]["name"] == "Parent Company"
+
+
+def test_projection_can_be_disabled(full_records, sync_customers):
+    config, records = full_records
+    mode, rows = sync_customers({**config, "field_projection": False}, ["entityId"])
+    assert mode == "full"
+    assert rows == projected(records, rows[0].keys())
+
+
+def test_sublists():
+    items = {"item": {"type": ["array"]}}
+    list_type = {"type": ["object", "null"], "properties": items}
+    stream = SimpleNamespace(
+        schema={
+            "properties": {
+                "itemList": list_type,
+                "customFieldList": list_type,
+                "addressbookList": {"type": ["object"], "properties": {}},
+                "entityId": {"type": ["string"]},
+            }
+        }
+    )
+    names = stream.schema["properties"]
+    sublists = [name for name in names if NetsuiteStream.is_sublist(stream, name)]
+    assert sublists == ["itemList"]
@@ -0,0 +1,68 @@
+"""Tests for the streamed getAll record list."""
+
+import io
+
+import pytest
+
+from tap_netsuite.search_response import RecordListResponse, parse_record
+from tap_netsuite.tests.synthetic import (
+    get_all_response,
+    load_get_all_schema,
+    parse_whole,
+)
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return load_get_all_schema()
+
+
+def open_response(document, schema):
+    return RecordListResponse(
+        io.BytesIO(document), lambda element: parse_record(element, schema)
+    )
+
+
+@pytest.mark.parametrize("type_name", ["Currency", "State"])
+def test_matches_whole_document(schema, type_name):
+    document = get_all_response(type_name, 50)
+    response = open_response(document, schema)
+    assert response.is_success
+    assert response.total_records == 2
+    records = list(response.records())
+    assert len(records) == 50
+    assert records == parse_whole(document, schema)
+
+
+def test_records(schema):
+    document = get_all_response("Currency", 1)
+    record = next(open_response(document, schema).records())
+    assert record.internalId == "1"
+    assert record.symbol == "USD"
+    assert record.isBaseCurrency is True
+    assert record.fxRateUpdateTimezone is None
+
+
+def test_error_status(schema):
+    document = b"""<?xml version="1.0"?>
+<Envelope xmlns:core="urn:core"><Body><getAllResult>
+  <core:status isSuccess="false"><core:statusDetail type="ERROR">
+    <core:code>INSUFFICIENT_PERMISSION</core:code>
+    <core:message>Permission denied</core:message>
+  </core:statusDetail></core:status>
+</getAllResult></Body></Envelope>"""
+    response = open_response(document, schema)
+    assert not response.is_success
+    assert response.status_detail["code"] == "INSUFFICIENT_PERMISSION"
+    assert list(response.records()) == []
+
+
+def test_fault(schema):
+    document = b"""<?xml version="1.0"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+<soapenv:Body><soapenv:Fault><faultcode>soapenv:Server</faultcode>
+<faultstring>An unexpected error occurred.</faultstring></soapenv:Fault>
+</soapenv:Body></soapenv:Envelope>"""
+    response = open_response(document, schema)
+    assert response.fault == "An unexpected error occurred."
+    assert not response.is_success
@@ -0,0 +1,55 @@
+"""Tests for the shared SuiteTalk clients and their HTTP pools."""
+
+import contextlib
+import io
+
+import pytest
+
+from tap_netsuite.exceptions import TypeNotFound
+from tap_netsuite.registry import clear_clients, get_client
+from tap_netsuite.tap import TapNetsuite
+from tap_netsuite.tests.mock_suitetalk import mock_config
+
+CORE = "urn:core_2022_2.platform.webservices.netsuite.com"
+
+
+@pytest.fixture(autouse=True)
+def clients():
+    clear_clients()
+    yield
+    clear_clients()
+
+
+def test_clients_are_shared_per_account(mock):
+    def client(account):
+        return get_client(account, cache_wsdl=False, base_url=mock.url)
+
+    suitetalk = client("TSTDRV_1")
+    assert client("TSTDRV-1") is suitetalk
+    assert suitetalk.service_proxy is client("TSTDRV_1").service_proxy
+    assert client("TSTDRV_2") is not suitetalk
+
+
+def test_types_are_indexed_by_name(mock):
+    suitetalk = get_client("TSTDRV1", cache_wsdl=False, base_url=mock.url)
+    passport = suitetalk.get_type("TokenPassport")
+    assert passport is suitetalk.get_type(f"{{{CORE}}}TokenPassport")
+    with pytest.raises(TypeNotFound):
+        suitetalk.get_type("NoSuchType")
+
+
+@pytest.mark.parametrize(
+    "config, pool_size",
+    [
+        ({}, 10),
+        ({"http_pool_size": 4, "max_concurrent_requests": 2}, 4),
+        ({"http_pool_size": 4, "max_concurrent_requests": 8}, 8),
+    ],
+)
+def test_pool_holds_every_concurrent_request(mock, tmp_path, config, pool_size):
+    with contextlib.redirect_stdout(io.StringIO()):
+        tap = TapNetsuite(config=mock_config(mock.url, str(tmp_path), **config))
+    assert tap.http.pool_size == pool_size
+    adapter = tap.http.session.get_adapter(mock.url)
+    assert adapter._pool_maxsize == pool_size
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == pool_size
@@ -0,0 +1,111 @@
+"""Tests syncing saved searches against the mock SuiteTalk server."""
+
+import contextlib
+
+from tap_netsuite.tests.mock_suitetalk import mock_config
+
+STREAM = "TransactionSearchAdvanced"
+
+
+def tran_ids(messages):
+    return [m["record"]["tranId"] for m in messages if m["type"] == "RECORD"]
+
+
+def last_state(messages):
+    return [m for m in messages if m["type"] == "STATE"][-1]["value"]
+
+
+def test_schema_page_is_replayed(mock, tmp_path, selected_tap, sync):
+    config = mock_config(mock.url, str(tmp_path), discovery_cache=False)
+    tap = selected_tap(config, [STREAM])
+    searches = mock.requests["search"]
+
+    assert tran_ids(sync(tap)) == [f"INV-{i}" for i in range(1, 26)]
+    # the sync searched only once, for the schema, and paged from there
+    assert mock.requests["search"] == searches
+    assert mock.requests["searchMoreWithId"] == 2
+
+
+def test_expired_search_id_restarts_the_search(mock, tmp_path, selected_tap, sync):
+    config = mock_config(mock.url, str(tmp_path), discovery_cache=False)
+    tap = selected_tap(config, [STREAM])
+    searches = mock.requests["search"]
+    # the search id of the replayed page is no longer valid
+    mock._searches.clear()
+
+    assert tran_ids(sync(tap)) == [f"INV-{i}" for i in range(1, 26)]
+    assert mock.requests["search"] == searches + 1
+    # the failed page 2 and the pages 2 and 3 of the new search
+    assert mock.requests["searchMoreWithId"] == 3
+
+
+def test_bookmark_advances(mock, tmp_path, selected_tap, sync):
+    config = mock_config(
+        mock.url, str(tmp_path), saved_search_replication_key="lastModifiedDate"
+    )
+    messages = sync(selected_tap(config, [STREAM]))
+    assert len(tran_ids(messages)) == 25
+    state = last_state(messages)
+    bookmarks = state["bookmarks"][STREAM]["saved_search_bookmarks"]
+    assert bookmarks == {"customsearch1": "2024-01-01T00:24:00+00:00"}
+
+    # the next run searches on or after the bookmark
+    mock.records = 30
+    messages = sync(selected_tap(config, [STREAM], state))
+    assert tran_ids(messages) == [f"INV-{i}" for i in range(25, 31)]
+    bookmarks = last_state(messages)["bookmarks"][STREAM]["saved_search_bookmarks"]
+    assert bookmarks == {"customsearch1": "2024-01-01T00:29:00+00:00"}
+
+
+def test_date_criterion_reaches_the_request(mock, tmp_path, selected_tap, sync):
+    config = mock_config(
+        mock.url, str(tmp_path), saved_search_replication_key="lastModifiedDate"
+    )
+    state = {
+        "bookmarks": {
+            STREAM: {
+                "saved_search_bookmarks": {"customsearch1": "2024-01-01T00:19:30+00:00"}
+            }
+        }
+    }
+    tap = selected_tap(config, [STREAM], state)
+    searches = set(mock._searches)
+
+    assert tran_ids(sync(tap)) == [f"INV-{i}" for i in range(21, 26)]
+    (search_id,) = set(mock._searches) - searches
+    # the mock found the onOrAfter criterion among the saved search's
+    saved, start, end, _, _ = mock._searches[search_id]
+    assert (saved, start, end) == (True, 20, 25)
+
+
+def test_slot_is_held_while_the_body_is_read(
+    mock, tmp_path, monkeypatch, selected_tap, sync
+):
+    config = mock_config(mock.url, str(tmp_path), discovery_cache=False)
+    tap = selected_tap(config, [STREAM])
+    held = []
+    slot = tap.governor.slot
+
+    @contextlib.contextmanager
+    def tracked_slot():
+        with slot() as wait_duration:
+            held.append(True)
+            try:
+                yield wait_duration
+            finally:
+                held.pop()
+
+    monkeypatch.setattr(tap.governor, "slot", tracked_slot)
+    stream = tap.streams[STREAM]
+    parse = stream._parse_response_to_json
+    in_slot = []
+
+    def tracked_parse(search_response, **kwargs):
+        for record in parse(search_response, **kwargs):
+            in_slot.append(bool(held))
+            yield record
+
+    monkeypatch.setattr(stream, "_parse_response_to_json", tracked_parse)
+    assert len(tran_ids(sync(tap))) == 25
+    # pages 2 and 3, the first was parsed for the schema
+    assert in_slot == [True] * 15
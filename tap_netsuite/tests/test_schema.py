@@ -0,0 +1,107 @@
+"""Tests for JSON schema generation from the WSDL types."""
+
+import json
+from pathlib import Path
+
+import pytest
+from lxml import etree
+from zeep.xsd import Schema
+
+from tap_netsuite.discovery_cache import DiscoveryCache
+from tap_netsuite.schema import CUSTOM_FIELD, SchemaBuilder
+
+FIXTURES = Path(__file__).parent / "fixtures"
+NAMESPACE = "urn:schema.test.netsuite.com"
+RECORD_REF = {
+    "internalId": {"type": ["string", "null"]},
+    "externalId": {"type": ["string", "null"]},
+    "type": {"type": ["string", "null"]},
+    "name": {"type": ["string", "null"]},
+}
+
+
+@pytest.fixture(scope="module")
+def types():
+    schema = Schema(etree.parse(str(FIXTURES / "schema_types.xsd")).getroot())
+    return lambda name: schema.get_type(f"{{{NAMESPACE}}}{name}")
+
+
+def test_invoice_properties(types):
+    builder = SchemaBuilder()
+    properties = builder.properties(types("Invoice"))
+
+    assert list(properties)[:3] == ["internalId", "entity", "subsidiary"]
+    assert "nullFieldList" not in properties
+    assert properties["entity"] == {
+        "type": ["object", "null"],
+        "properties": RECORD_REF,
+    }
+    assert properties["tranDate"] == {"type": ["string", "null"], "format": "date-time"}
+    assert properties["total"] == {"type": ["number", "null"]}
+    assert properties["customFieldList"]["properties"]["customField"] == CUSTOM_FIELD
+
+    item = properties["itemList"]["properties"]["item"]
+    assert item["type"] == ["array", "null"]
+    assert item["items"]["properties"]["line"] == {"type": ["integer", "null"]}
+
+
+def test_shared_types_are_built_once(types):
+    builder = SchemaBuilder()
+    invoice = builder.properties(types("Invoice"))
+    # RecordRef, Address, CustomFieldRef, CustomFieldList, InvoiceItem,
+    # InvoiceItemList and Invoice
+    assert builder.built == 7
+
+    assert invoice["entity"]["properties"] is invoice["subsidiary"]["properties"]
+    address = invoice["billingAddress"]["properties"]
+    assert address["country"]["properties"] is invoice["entity"]["properties"]
+    assert builder.properties(types("Invoice")) is invoice
+    assert builder.built == 7
+
+
+def test_recursive_types_are_left_untyped(types):
+    builder = SchemaBuilder()
+    category = builder.properties(types("Category"))
+    assert category["parent"] == {"type": ["object", "null"], "properties": {}}
+    assert category["children"]["items"] == {"type": "object", "properties": {}}
+    assert category["owner"]["properties"] == RECORD_REF
+
+
+def test_discovery_cache_writes_shared_types_once(types, tmp_path):
+    builder = SchemaBuilder()
+    cache = DiscoveryCache(str(tmp_path), "test", ttl=60)
+    schemas = {}
+    for name in ["Invoice", "Category", "Address"]:
+        schema = {"type": "object", "properties": dict(builder.properties(types(name)))}
+        schemas[name] = schema
+        cache.set(f"schema:{name}", {"schema": schema, "replication_key": None})
+    cache.save()
+
+    written = Path(cache.path).read_text()
+    assert len(written) < 0.7 * len(json.dumps(cache._entries))
+    assert json.loads(written)["entries"]["schema:Invoice"]["schema"]["properties"][
+        "entity"
+    ] == {"type": ["object", "null"], "properties": {"$ref": "#/$defs/0"}}
+
+    loaded = DiscoveryCache(str(tmp_path), "test", ttl=60)
+    invoice = loaded.get("schema:Invoice")["schema"]
+    assert invoice == schemas["Invoice"]
+    assert loaded.get("schema:Address")["schema"] == schemas["Address"]
+    assert invoice["properties"]["entity"]["properties"] is (
+        invoice["properties"]["subsidiary"]["properties"]
+    )
+
+
+def test_recursive_types_do_not_depend_on_build_order(types):
+    builder = SchemaBuilder()
+    department = builder.properties(types("Department"))
+    manager = SchemaBuilder().properties(types("Manager"))
+    # the manager is cut off at the same depth whichever was built first
+    assert builder.properties(types("Manager")) == manager
+    assert department["manager"]["properties"]["department"]["properties"] == {}
+    assert manager["department"]["properties"]["manager"]["properties"] == {}
+    # recursive types are built again, the types they hold are still shared
+    again = builder.properties(types("Department"))
+    assert again == department and again is not department
+    owner = again["manager"]["properties"]["owner"]["properties"]
+    assert owner is department["manager"]["properties"]["owner"]["properties"]
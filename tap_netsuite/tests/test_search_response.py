@@ -0,0 +1,65 @@
+"""Tests for the incremental saved-search response parser."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from tap_netsuite.search_response import SearchResponse
+from tap_netsuite.tests.synthetic import parse_xmltodict, saved_search_response
+
+FIXTURE = Path(__file__).parent / "fixtures" / "saved_search_response.xml"
+
+
+def open_response():
+    return SearchResponse(FIXTURE.open("rb"))
+
+
+def test_header():
+    response = open_response()
+    assert response.is_success
+    assert response.total_pages == 1
+    assert response.search_id == "WEBSERVICES_TSTDRV_0101_search"
+    assert response["totalRecords"] == "3"
+
+
+def test_records():
+    records = list(open_response().records())
+    assert len(records) == 3
+    assert records[0] == {
+        "amount": "125.5",
+        "entityId": "42",
+        "lastModifiedDate": "2024-05-01T10:00:00.000-07:00",
+        "tranId": "INV-1",
+        "customFieldList": [
+            {
+                "type": "platformCore:SearchColumnStringCustomField",
+                "scriptId": "custbody_ref",
+                "internalId": "101",
+                "searchValue": "ref-1",
+            },
+            {
+                "type": "platformCore:SearchColumnSelectCustomField",
+                "scriptId": "custbody_region",
+                "internalId": "102",
+                "searchValue": {"@internalId": "7", "@typeId": "12"},
+            },
+        ],
+        "customerJoin.entityId": "ACME",
+        "customerJoin.subsidiary": "3",
+    }
+    assert records[2] == {"tranId": "INV-3"}
+
+
+def test_find_max_returns_widest_record():
+    (record,) = open_response().records(find_max=True)
+    assert record["tranId"] == "INV-1"
+
+
+def test_matches_whole_document_xmltodict():
+    pytest.importorskip("xmltodict")
+    document = saved_search_response(50)
+    expected = list(parse_xmltodict(FIXTURE.read_bytes()))
+    assert list(open_response().records()) == expected
+    expected = list(parse_xmltodict(document))
+    assert list(SearchResponse(io.BytesIO(document)).records()) == expected
@@ -0,0 +1,91 @@
+"""Tests for replication-key window and internal id range planning."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from tap_netsuite.sharding import DateWindowPlanner, IdRangePlanner, run_windows
+
+START = datetime(2020, 1, 1)
+END = datetime(2020, 1, 31)
+
+
+def density(window):
+    # 100 records per day, 5000 per day in the second week
+    days = (window[1] - window[0]) / timedelta(days=1)
+    busy = START + timedelta(days=7) <= window[0] < START + timedelta(days=14)
+    return int(days * (5000 if busy else 100))
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_windows_cover_range_and_adapt(concurrency):
+    planner = DateWindowPlanner(START, END, timedelta(days=7), target_records=1000)
+
+    def fetch_window(window):
+        if not planner.observe(window, density(window)):
+            return None
+        return [window]
+
+    seen = []
+    for window, records in run_windows(planner, fetch_window, concurrency):
+        assert records == [window]
+        assert density(window) <= 2000
+        seen.append(window)
+        planner.complete(window)
+
+    seen.sort()
+    assert seen[0][0] == START and seen[-1][1] == END
+    assert all(a[1] == b[0] for a, b in zip(seen, seen[1:]))
+    assert planner.completed_until() == END
+
+
+def test_windows_meet_on_whole_minutes():
+    start = START + timedelta(seconds=90)
+    planner = DateWindowPlanner(start, END, timedelta(hours=5), target_records=10)
+    first = planner.next_window()
+    assert first == (start, START + timedelta(hours=5, minutes=1))
+    # the split window still meets its halves on a whole minute
+    assert not planner.observe(first, 100)
+    head, tail = planner.next_window(), planner.next_window()
+    assert head == (start, START + timedelta(hours=2, minutes=31))
+    assert tail == (head[1], first[1])
+    assert planner.next_window()[0] == first[1]
+
+
+def test_completed_until_waits_for_earliest_unfinished_window():
+    planner = DateWindowPlanner(START, END, timedelta(days=10), target_records=10)
+    first, second = planner.next_window(), planner.next_window()
+    planner.complete(second)
+    assert planner.completed_until() == first[0]
+    planner.complete(first)
+    assert planner.completed_until() == second[1]
+
+
+def id_density(id_range):
+    # ids 0-50000 are dense, then one id in 100 up to 1000000 is used
+    low, high = id_range
+    dense = max(min(high, 50000) - low, 0)
+    return dense + max(high - max(low, 50000), 0) // 100
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_id_ranges_cover_range_and_adapt(concurrency):
+    planner = IdRangePlanner(0, 1000000, 100000, target_records=2000)
+
+    def fetch_range(id_range):
+        if not planner.observe(id_range, id_density(id_range)):
+            return None
+        return [id_range]
+
+    seen = []
+    for id_range, records in run_windows(planner, fetch_range, concurrency):
+        assert id_density(id_range) <= 4000
+        assert all(isinstance(i, int) for i in id_range)
+        seen.append(id_range)
+        planner.complete(id_range)
+
+    seen.sort()
+    assert seen[0][0] == 0 and seen[-1][1] == 1000000
+    assert all(a[1] == b[0] for a, b in zip(seen, seen[1:]))
+    # about 60000 records, so 30 ranges of 2000 and a few splits
+    assert len(seen) < 50
@@ -0,0 +1,110 @@
+"""Tests for the compiled record transformer."""
+
+from copy import deepcopy
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from singer import Transformer
+from singer.transform import SchemaMismatch
+from zeep.helpers import serialize_object
+
+from tap_netsuite.tests.synthetic import (
+    BOOLEAN,
+    CUSTOM_FIELDS,
+    DATETIME,
+    INTEGER,
+    NUMBER,
+    STRING,
+    object_type,
+    transaction,
+    transaction_schema,
+    zeep_transaction,
+)
+from tap_netsuite.transform import CompiledTransformer, datetime_pre_hook
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": STRING,
+        "count": INTEGER,
+        "amount": NUMBER,
+        "flag": BOOLEAN,
+        "created": DATETIME,
+        "ref": object_type(internalId=STRING),
+        "customFieldList": CUSTOM_FIELDS,
+        "untyped": {},
+    },
+}
+
+
+def singer_transform(record, schema):
+    with Transformer(pre_hook=datetime_pre_hook) as transformer:
+        return transformer.transform(deepcopy(record), deepcopy(schema))
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {"id": 1, "count": "1,234", "amount": "1,234.5", "flag": "False"},
+        {"id": None, "count": None, "amount": Decimal("0.1"), "flag": None},
+        {"count": True, "amount": 3, "flag": "yes", "extra": {"dropped": 1}},
+        {"created": datetime(2023, 5, 1, 8, 0, tzinfo=timezone(timedelta(hours=5)))},
+        {"created": datetime(2023, 5, 1, 8, 0, 0, 120)},
+        {"created": date(2023, 5, 1)},
+        {"created": None, "ref": None, "customFieldList": None},
+        {"ref": {"internalId": 5, "name": "dropped"}, "untyped": [1, {"a": None}]},
+        {
+            "customFieldList": {
+                "customField": [{"scriptId": "x", "value": Decimal("1.5")}]
+            }
+        },
+        {"customFieldList": {"customField": [{"value": [{"internalId": 1}]}]}},
+        {"customFieldList": {"customField": [{"value": {"internalId": 2}}]}},
+    ],
+)
+def test_matches_singer_transformer(record):
+    with CompiledTransformer(SCHEMA) as transformer:
+        assert transformer.transform(deepcopy(record)) == singer_transform(
+            record, SCHEMA
+        )
+
+
+def test_matches_singer_transformer_on_transactions():
+    schema = transaction_schema()
+    transformer = CompiledTransformer(schema)
+    for i in range(20):
+        record = transaction(i, lines=3)
+        assert transformer.transform(record) == singer_transform(record, schema)
+
+
+def test_records_removed_paths():
+    transformer = CompiledTransformer(SCHEMA)
+    transformer.transform({"ref": {"internalId": "1", "name": "x"}, "extra": 1})
+    assert transformer.removed == {"ref.name", "extra"}
+
+
+def test_mismatches_raise_singer_errors():
+    transformer = CompiledTransformer(SCHEMA)
+    with pytest.raises(SchemaMismatch):
+        transformer.transform({"count": "many"})
+
+
+def test_converts_zeep_objects_like_serialize_object():
+    schema = transaction_schema()
+    transformer = CompiledTransformer(schema)
+    for i in range(5):
+        record = zeep_transaction(i, lines=3)
+        expected = singer_transform(serialize_object(record), schema)
+        assert transformer.transform(record) == expected
+
+
+def test_drop_nulls():
+    transformer = CompiledTransformer(transaction_schema(), drop_nulls=True)
+    record = transformer.transform(zeep_transaction(1, lines=1))
+    assert "field4" not in record
+    assert record["field0"] is None
+    assert record["entity"]["externalId"] is None
+    assert record["itemList"]["item"][0]["customFieldList"] is None
+    assert "nullFieldList" not in record
+    assert not any("nullFieldList" in path for path in transformer.removed)
@@ -0,0 +1,103 @@
+"""Tests for the shared HTTP transport."""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tap_netsuite.registry import clear_clients, get_client
+from tap_netsuite.search_response import SearchResponse
+from tap_netsuite.tests.synthetic import saved_search_response
+from tap_netsuite.transport import HttpTransport
+
+BODY = saved_search_response(20)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = BODY
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_reuses_connections_and_counts_compressed_bytes(url):
+    http = HttpTransport()
+    for _ in range(3):
+        response = http.post(url, data="<soap/>", stream=True)
+        response.raw.decode_content = True
+        assert len(list(SearchResponse(response.raw).records())) == 20
+
+    stats = http.stats.snapshot()
+    assert stats["requests"] == 3
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 2
+    assert stats["compressed_responses"] == 3
+    assert stats["bytes_sent"] == 3 * len("<soap/>")
+    # compressed bodies plus response headers
+    assert 3 * len(gzip.compress(BODY)) < stats["bytes_received"] < len(BODY)
+
+
+def test_zeep_transport_shares_the_session(url):
+    http = HttpTransport(read_timeout=5)
+    transport = http.zeep_transport()
+    assert transport.session is http.session
+    transport.post(url, "<soap/>", {})
+    assert http.stats.snapshot()["compressed_responses"] == 1
+
+
+def test_counts_bytes_received_per_thread(url):
+    http = HttpTransport()
+    received = {}
+
+    def post(name):
+        before = http.stats.received_by_thread()
+        http.post(url, data="<soap/>")
+        received[name] = http.stats.received_by_thread() - before
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert http.stats.received_by_thread() == 0
+    assert sum(received.values()) == http.stats.snapshot()["bytes_received"]
+    assert all(size > len(gzip.compress(BODY)) for size in received.values())
+
+
+def test_clients_are_shared_per_transport_settings(mock):
+    def client(**settings):
+        http = HttpTransport(**settings)
+        return get_client("TSTDRV1", cache_wsdl=False, http=http, base_url=mock.url)
+
+    clear_clients()
+    try:
+        suitetalk = client(pool_size=10)
+        assert client(pool_size=10) is suitetalk
+        other = client(pool_size=20, read_timeout=5)
+        assert other is not suitetalk
+        assert other.http.settings == (20, (30, 5))
+    finally:
+        clear_clients()
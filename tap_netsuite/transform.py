@@ -0,0 +1,260 @@
+"""Record conversion compiled once from a stream's JSON schema.
+
+``singer.Transformer`` walks the schema again for every record and calls its
+pre-hook on every node. ``CompiledTransformer`` builds one converter function
+per schema node up front, following the same rules: types are tried in order
+with null last, ``anyOf`` takes the first matching subschema and properties
+missing from the schema are dropped. Records that fail to convert are
+re-run through ``singer.Transformer`` so errors are reported the same way.
+
+Records may be plain dicts or zeep objects, which are read in place rather
+than copied with ``serialize_object`` first.
+"""
+
+from datetime import datetime, timezone
+
+from singer import Transformer
+from singer.transform import LOGGER, string_to_datetime
+from singer.utils import strftime
+from zeep.helpers import serialize_object
+from zeep.xsd.valueobjects import CompoundValue
+
+FAIL = object()
+# zeep's list of fields sent empty, which the schemas leave out
+IGNORED_FIELDS = {"nullFieldList"}
+
+
+def datetime_pre_hook(data, _, schema):
+    """Serialize datetimes from zeep before singer parses them."""
+    if schema.get("format") == "date-time" and data:
+        data = data.isoformat()
+    return data
+
+
+def path_string(path, key):
+    keys = [key]
+    while path:
+        path, parent_key = path
+        keys.append(parent_key)
+    return ".".join(map(str, reversed(keys)))
+
+
+def convert_datetime(data):
+    if isinstance(data, datetime):
+        # same result as formatting data.isoformat() parsed back to UTC
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        return strftime(data.astimezone(timezone.utc))
+    data = datetime_pre_hook(data, None, {"format": "date-time"})
+    if data is None or data == "":
+        return FAIL
+    data = string_to_datetime(data)
+    return FAIL if data is None else data
+
+
+def object_values(data):
+    """Return the values of a zeep object or dict by key, None for others."""
+    if isinstance(data, CompoundValue):
+        return data.__values__
+    return data if isinstance(data, dict) else None
+
+
+def convert_untyped_object(data, path):
+    """Convert an object of a schema without properties, keeping all its keys."""
+    if isinstance(data, (dict, CompoundValue)):
+        return serialize_object(data)
+    return FAIL
+
+
+def convert_string(data):
+    if data is None:
+        return FAIL
+    try:
+        return str(data)
+    except Exception:
+        return FAIL
+
+
+def convert_integer(data):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return int(data)
+    except Exception:
+        return FAIL
+
+
+def convert_number(data):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return float(data)
+    except Exception:
+        return FAIL
+
+
+def convert_boolean(data):
+    if isinstance(data, str) and data.lower() == "false":
+        return False
+    try:
+        return bool(data)
+    except Exception:
+        return FAIL
+
+
+SCALARS = {
+    "string": convert_string,
+    "integer": convert_integer,
+    "number": convert_number,
+    "boolean": convert_boolean,
+}
+
+
+def is_empty(value):
+    return type(value) is dict and all(v is None for v in value.values())
+
+
+class CompiledTransformer:
+    """Convert records to a schema with the result of ``singer.Transformer``.
+
+    With ``drop_nulls``, nested objects holding nothing but nulls and the
+    ``nullFieldList`` are left out of the record instead.
+    """
+
+    def __init__(self, schema, pre_hook=datetime_pre_hook, drop_nulls=False):
+        self.schema = schema
+        self.pre_hook = pre_hook
+        self.drop_nulls = drop_nulls
+        self.removed = set()
+        self._convert = self.compile(schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self.removed:
+            LOGGER.debug(
+                "Removed %s paths during transforms:\n\t%s",
+                len(self.removed),
+                "\n\t".join(sorted(self.removed)),
+            )
+            LOGGER.debug("Removed paths list: %s", sorted(self.removed))
+        # the compiled converters hold on to this set
+        self.removed.clear()
+
+    def transform(self, record):
+        result = self._convert(record, ())
+        if result is FAIL:
+            # let singer raise its SchemaMismatch for the record
+            transformer = Transformer(pre_hook=self.pre_hook)
+            return transformer.transform(serialize_object(record), self.schema)
+        return result
+
+    def compile(self, schema):
+        if "anyOf" in schema:
+            return self.first_match([self.compile(s) for s in schema["anyOf"]])
+        if "type" not in schema:
+            return lambda data, path: serialize_object(data)
+
+        types = schema["type"]
+        if not isinstance(types, list):
+            types = [types]
+        if "null" in types:
+            types = [t for t in types if t != "null"] + ["null"]
+        return self.first_match([self.compile_type(t, schema) for t in types])
+
+    def first_match(self, converters):
+        if len(converters) == 1:
+            return converters[0]
+
+        def convert(data, path):
+            for converter in converters:
+                result = converter(data, path)
+                if result is not FAIL:
+                    return result
+            return FAIL
+
+        return convert
+
+    def compile_type(self, type_name, schema):
+        is_datetime = schema.get("format") == "date-time"
+        if type_name == "null":
+
+            def convert_null(data, path):
+                if is_datetime:
+                    data = datetime_pre_hook(data, type_name, schema)
+                return None if data is None or data == "" else FAIL
+
+            return convert_null
+        if is_datetime:
+            return lambda data, path: convert_datetime(data)
+        if type_name == "object":
+            return self.compile_object(schema)
+        if type_name == "array":
+            return self.compile_array(schema)
+        if type_name in SCALARS:
+            scalar = SCALARS[type_name]
+            return lambda data, path: scalar(data)
+        return lambda data, path: FAIL
+
+    def compile_object(self, schema):
+        properties = schema.get("properties", {})
+        if schema.get("patternProperties"):
+            return self.generic(schema, "object")
+        if properties == {}:
+            return convert_untyped_object
+
+        children = {key: self.compile(sub) for key, sub in properties.items()}
+        removed = self.removed
+        drop_nulls = self.drop_nulls
+
+        def convert_object(data, path):
+            data = object_values(data)
+            if data is None:
+                return FAIL
+            result = {}
+            for key, value in data.items():
+                child = children.get(key)
+                if child is None:
+                    if not (drop_nulls and key in IGNORED_FIELDS):
+                        removed.add(path_string(path, key))
+                    continue
+                value = child(value, (path, key))
+                if value is FAIL:
+                    return FAIL
+                if drop_nulls and is_empty(value):
+                    continue
+                result[key] = value
+            return result
+
+        return convert_object
+
+    def compile_array(self, schema):
+        if "items" not in schema:
+            return self.generic(schema, "array")
+        convert_item = self.compile(schema["items"])
+
+        def convert_array(data, path):
+            if not isinstance(data, list):
+                return FAIL
+            result = []
+            for index, item in enumerate(data):
+                item = convert_item(item, (path, index))
+                if item is FAIL:
+                    return FAIL
+                result.append(item)
+            return result
+
+        return convert_array
+
+    def generic(self, schema, type_name):
+        """Fall back to singer for schema features this module doesn't compile."""
+
+        def convert(data, path):
+            transformer = Transformer(pre_hook=self.pre_hook)
+            data = serialize_object(data)
+            success, result = transformer._transform(data, type_name, schema, [])
+            self.removed.update(transformer.removed)
+            return result if success else FAIL
+
+        return convert
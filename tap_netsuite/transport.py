@@ -0,0 +1,235 @@
+"""Shared HTTP session for all SuiteTalk traffic."""
+
+import http.client
+import threading
+import weakref
+from contextlib import contextmanager
+from time import perf_counter
+
+import requests
+from requests.adapters import HTTPAdapter
+from zeep.transports import Transport
+
+DEFAULT_CONNECT_TIMEOUT = 30
+DEFAULT_READ_TIMEOUT = 300
+
+
+class TransportStats:
+    """Thread-safe counters of requests, connections and body bytes."""
+
+    FIELDS = [
+        "requests",
+        "new_connections",
+        "reused_connections",
+        "bytes_sent",
+        "bytes_received",
+        "compressed_responses",
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen_connections = weakref.WeakSet()
+        self._thread = threading.local()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def increment(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+        if "bytes_received" in counts:
+            self._thread.bytes_received = (
+                self.received_by_thread() + counts["bytes_received"]
+            )
+
+    def received_by_thread(self):
+        """Bytes received so far by requests made from the calling thread."""
+        return getattr(self._thread, "bytes_received", 0)
+
+    def record_connection(self, connection):
+        if connection is None:
+            return
+        with self._lock:
+            if connection in self._seen_connections:
+                self.counts["reused_connections"] += 1
+            else:
+                self._seen_connections.add(connection)
+                self.counts["new_connections"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class CountingReader:
+    """File wrapper counting the bytes read from a connection's socket."""
+
+    def __init__(self, fp, stats):
+        self._fp = fp
+        self._stats = stats
+
+    def _count(self, data):
+        self._stats.increment(bytes_received=len(data))
+        return data
+
+    def read(self, *args):
+        return self._count(self._fp.read(*args))
+
+    def read1(self, *args):
+        return self._count(self._fp.read1(*args))
+
+    def readline(self, *args):
+        return self._count(self._fp.readline(*args))
+
+    def readinto(self, buffer):
+        size = self._fp.readinto(buffer)
+        self._stats.increment(bytes_received=size or 0)
+        return size
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+
+def counting_pool(pool_cls, stats):
+    """Subclass a urllib3 pool so its responses count the bytes they read."""
+
+    class CountingResponse(http.client.HTTPResponse):
+        def __init__(self, sock, *args, **kwargs):
+            super().__init__(sock, *args, **kwargs)
+            self.fp = CountingReader(self.fp, stats)
+
+    connection_cls = type(
+        pool_cls.ConnectionCls.__name__,
+        (pool_cls.ConnectionCls,),
+        {"response_class": CountingResponse},
+    )
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": connection_cls})
+
+
+class CountingAdapter(HTTPAdapter):
+    """Pooled adapter recording connection reuse and bytes on the wire.
+
+    Received bytes are counted as they are read from the socket, headers and
+    compressed body included, so streamed bodies are counted as they are
+    consumed.
+    """
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting_pool(pool_cls, self.stats)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        body = request.body or b""
+        encoding = response.headers.get("Content-Encoding", "")
+        self.stats.increment(
+            requests=1,
+            bytes_sent=len(body.encode() if isinstance(body, str) else body),
+            compressed_responses=int("gzip" in encoding),
+        )
+        self.stats.record_connection(getattr(response.raw, "connection", None))
+        return response
+
+
+class StreamingTransport(Transport):
+    """zeep transport that can leave response bodies to be read by the caller.
+
+    Within ``streaming()``, requests from the calling thread return before the
+    body is downloaded; use it with zeep's ``raw_response`` setting and read
+    ``response.raw``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._thread = threading.local()
+
+    @contextmanager
+    def streaming(self):
+        self._thread.stream = True
+        try:
+            yield
+        finally:
+            self._thread.stream = False
+
+    def post(self, address, message, headers):
+        start = perf_counter()
+        if not getattr(self._thread, "stream", False):
+            response = super().post(address, message, headers)
+        else:
+            response = self.session.post(
+                address,
+                data=message,
+                headers=headers,
+                timeout=self.operation_timeout,
+                stream=True,
+            )
+        self._thread.last_post = (start, perf_counter())
+        return response
+
+    def last_post(self):
+        """Start and end of the calling thread's last post, body included
+        unless streaming."""
+        return getattr(self._thread, "last_post", None)
+
+
+class HttpTransport:
+    """A keep-alive, gzip-enabled session shared by zeep and raw SOAP calls."""
+
+    def __init__(
+        self,
+        pool_size=10,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+    ):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = TransportStats()
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip"
+        self.session.headers["Connection"] = "keep-alive"
+        adapter = CountingAdapter(
+            self.stats, pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def settings(self):
+        """What makes two transports interchangeable."""
+        return (self.pool_size, self.timeout)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def zeep_transport(self, cache=None):
+        return StreamingTransport(
+            cache=cache,
+            timeout=self.timeout[1],
+            operation_timeout=self.timeout,
+            session=self.session,
+        )
+
+    def metrics(self):
+        """Yield the stats so far as Singer counter metrics.
+
+        Streams syncing at the same time share the transport, so the totals
+        are tagged for the whole tap rather than attributed to one stream.
+        """
+        for name, value in self.stats.snapshot().items():
+            yield {
+                "type": "counter",
+                "metric": f"http_{name}",
+                "value": value,
+                "tags": {"scope": "tap"},
+            }
@@ -1,10 +1,20 @@
 import re
 
+
 def config_type(text):
-    return re.sub(r'(?<!^)(?=[A-Z])', '_', text).lower()
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", text).lower()
+
 
 def get_api_version_from_urn(urn: str) -> str:
     matches = re.search(r"_(\d+_\d+).", urn)
     if matches:
         return matches.group(1)
     return "2025_1"
+
+
+def suitetalk_url(config):
+    """Base URL of the account's SuiteTalk endpoints, unless overridden."""
+    if config.get("suitetalk_url"):
+        return config["suitetalk_url"].rstrip("/")
+    account = config["ns_account"].replace("_", "-")
+    return f"https://{account}.suitetalk.api.netsuite.com"